@@ -0,0 +1,306 @@
+# bench.py ─ 오프라인 벤치마크: 저장해 둔 게시판 페이지 + 로컬 HTTP 서버
+# • bench_fixtures/ 의 HTML(원래 인코딩 그대로: UTF-8 · EUC-KR · CP949)을
+#   로컬 서버가 내려주고, 각 봇의 fetch → decode → parse → detect 경로를 그대로 실행
+#   (봇 모듈의 목록 URL 만 로컬 서버로 바꿔 끼움, 디스코드·state.db 는 건드리지 않음)
+# • 서버 지연(--latency ms)·실패율(--fail, 503 응답) 주입 → http_client 재시도까지 포함해 측정
+# • 단계별 p50/p95(ms) · 한 번 실행의 최대 메모리(tracemalloc peak) 출력
+# • 결과는 bench_results/<커밋>.json 에 저장, --compare <커밋> 으로 이전 결과와 비교
+# • 사용법
+#     python bench.py                          # 전체 게시판, 20회
+#     python bench.py -n 50 --latency 80 ee sw # 일부 게시판, 지연 80ms
+#     python bench.py --fail 0.2               # 요청 20%를 503 으로
+#     python bench.py --compare 0c9b64a        # 저장된 결과와 p50 비교
+#     python bench.py --record                 # 실제 사이트 목록을 받아 fixture 갱신
+# • 지금 들어 있는 fixture 는 각 게시판 구조를 본뜬 합성 페이지
+#   (실제 페이지로 바꾸려면 --record)
+
+import os, io, sys, json, time, random, argparse, tempfile, threading, importlib, contextlib
+import statistics, subprocess, tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+HERE         = os.path.dirname(os.path.abspath(__file__))
+FIXTURES     = os.path.join(HERE, "bench_fixtures")
+RESULTS      = os.getenv("BENCH_RESULTS_DIR", os.path.join(HERE, "bench_results"))
+INFOCOM_TOP  = 1500          # 이 idx 까지는 상세 페이지, 위로는 비존재 안내
+
+# 경로 → (fixture 파일, Content-Type)
+# 학과 서버 다수는 charset 없이 내려줘서 봇의 smart_decode 가 판별 → 그대로 재현
+ROUTES = {
+    "/notice":      ("notice.html",         "text/html; charset=UTF-8"),
+    "/notice/view": ("notice_article.html", "text/html; charset=UTF-8"),
+    "/sw":          ("sw.html",             "text/html; charset=utf-8"),
+    "/me":          ("me.html",             "text/html"),
+    "/mse":         ("mse.html",            "text/html"),
+    "/chemeng":     ("chemeng.html",        "text/html"),
+    "/ee":          ("ee.html",             "text/html"),
+    "/np":          ("np.html",             "text/html; charset=UTF-8"),
+}
+
+# ── 로컬 HTTP 서버 ──────────────────────────────────────────
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"            # keep-alive (실제 서버처럼 연결 재사용)
+    disable_nagle_algorithm = True           # 헤더·본문 분할 전송 시 지연 ACK(≈40ms) 방지
+    latency = 0.0                            # 초
+    fail = 0.0                               # 503 비율
+    rng = random.Random(0)
+
+    def log_message(self, *a):
+        pass
+
+    def _reply(self, status: int, body: bytes = b"", ctype: str = "text/html"):
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail and self.rng.random() < self.fail:
+            return self._reply(503)
+        u = urlsplit(self.path)
+        if u.path == "/infocom/view":
+            idx = int(parse_qs(u.query).get("idx", ["0"])[0])
+            name = "infocom_view.html" if 0 < idx <= INFOCOM_TOP else "infocom_missing.html"
+            return self._reply(200, fixture(name), "text/html; charset=UTF-8")
+        if u.path not in ROUTES:
+            return self._reply(404)
+        name, ctype = ROUTES[u.path]
+        base = f"http://{self.headers.get('Host')}".encode()
+        self._reply(200, fixture(name).replace(b"{BASE}", base), ctype)
+
+_fixtures = {}
+def fixture(name: str) -> bytes:
+    if name not in _fixtures:
+        with open(os.path.join(FIXTURES, name), "rb") as f:
+            _fixtures[name] = f.read()
+    return _fixtures[name]
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # infocom 은 제목까지만 읽고 연결을 끊음 → 정상 동작이므로 조용히
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+def start_server(latency_ms: float, fail: float) -> tuple[ThreadingHTTPServer, str]:
+    Handler.latency, Handler.fail = latency_ms / 1000, fail
+    srv = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, f"http://127.0.0.1:{srv.server_address[1]}"
+
+# ── 게시판별 경로 ───────────────────────────────────────────
+# 각 함수는 로컬 서버 주소를 받아 [(단계 이름, 함수)] 를 반환.
+# 단계 함수는 앞 단계 결과를 받아 다음 단계로 넘길 값을 돌려준다.
+def list_board(mod_name: str, path: str):
+    def build(base):
+        import seen_store
+        mod = importlib.import_module(mod_name)
+        mod.LIST_URL = base + path
+        def detect(rows):
+            seen = {r[0] for r in rows[3:]}              # 최신 3건이 새 글인 상황
+            new = seen_store.new_rows(rows, seen)
+            assert len(new) == min(3, len(rows)), f"{mod_name}: 새 글 {len(new)}건"
+            return new
+        return [("fetch+decode", lambda _: mod.fetch_html()),
+                ("parse",        lambda html: mod.parse_notices(html)),
+                ("detect",       detect)]
+    return build
+
+def notice_board(base):
+    import notice_bot
+    notice_bot.NOTICE_URL = base + "/notice"
+    html = notice_bot.http_client.get(notice_bot.NOTICE_URL, timeout=10).text
+    last_id = notice_bot.parse_list(html)[3][0]    # 새 글 3건 → 본문 3개 요청
+    def run(_):
+        posts = notice_bot.fetch_new_notices(last_id)
+        assert len(posts) == 3 and all(p[3] for p in posts), "notice: 본문 누락"
+        return posts
+    return [("fetch_new_notices", run)]
+
+def np_board(base):
+    import np_bot, requests
+    np_bot.LIST_URL = base + "/np"
+    sess = requests.Session()
+    def run(_):
+        latest = np_bot.get_latest(sess)
+        assert latest, "np: 목록 파싱 실패"
+        return latest
+    return [("get_latest", run),
+            ("detect", lambda latest: latest[0] != "0")]
+
+def infocom_board(base):
+    import infocom_bot
+    infocom_bot.WORKER = ""
+    infocom_bot.VIEW_HTTPS = base + "/infocom/view?idx={idx}&m=v"
+    def hit(_):
+        ok, title = infocom_bot.fetch_post(INFOCOM_TOP)
+        assert ok and title, "infocom: 제목 추출 실패"
+    def miss(_):
+        assert infocom_bot.fetch_post(INFOCOM_TOP + 1) == (False, None), "infocom: 비존재 판정 실패"
+    return [("fetch_post(hit)", hit), ("fetch_post(miss)", miss)]
+
+BOARDS = {
+    "notice":  notice_board,
+    "sw":      list_board("sw_bot",        "/sw"),
+    "me":      list_board("me_bot",        "/me"),
+    "mse":     list_board("materials_bot", "/mse"),
+    "chemeng": list_board("chemeng_bot",   "/chemeng"),
+    "ee":      list_board("ee_bot",        "/ee"),
+    "np":      np_board,
+    "infocom": infocom_board,
+}
+
+# ── 측정 ────────────────────────────────────────────────────
+def pct(xs: list[float], q: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, max(0, round(q * len(xs)) - 1))]
+
+def run_once(stages, times: dict | None = None):
+    val = None
+    for name, fn in stages:
+        t0 = time.perf_counter()
+        val = fn(val)
+        if times is not None:
+            times.setdefault(name, []).append(time.perf_counter() - t0)
+
+def bench_board(stages, n: int) -> dict:
+    times = {}
+    with contextlib.redirect_stdout(io.StringIO()):      # 봇 진행 메시지 숨김
+        run_once(stages)                                 # 워밍업 (연결·import)
+        for _ in range(n):
+            run_once(stages, times)
+        tracemalloc.start()
+        run_once(stages)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    total = [sum(ts) for ts in zip(*times.values())]
+    ms = lambda xs: {"p50": statistics.median(xs) * 1000, "p95": pct(xs, 0.95) * 1000}
+    return {"stages": {k: ms(v) for k, v in times.items()},
+            "total": ms(total), "peak_kib": peak / 1024}
+
+# ── 결과 저장·비교 ──────────────────────────────────────────
+def git_rev() -> tuple[str, bool]:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    cwd=HERE, capture_output=True, text=True).stdout.strip())
+        return rev, dirty
+    except Exception:
+        return "nogit", True
+
+def save(result: dict) -> str:
+    os.makedirs(RESULTS, exist_ok=True)
+    name = result["commit"] + ("-dirty" if result["dirty"] else "")
+    path = os.path.join(RESULTS, f"{name}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=1)
+    return path
+
+def load_result(ref: str) -> dict | None:
+    try:
+        names = sorted(n for n in os.listdir(RESULTS) if n.startswith(ref) and n.endswith(".json"))
+    except FileNotFoundError:
+        return None
+    if not names:
+        return None
+    with open(os.path.join(RESULTS, names[0]), encoding="utf-8") as f:
+        return json.load(f)
+
+# ── 실제 사이트 → fixture ──────────────────────────────────
+def record():
+    import http_client
+    live = {
+        "sw.html":      ("sw_bot", "LIST_URL"),
+        "me.html":      ("me_bot", "LIST_URL"),
+        "mse.html":     ("materials_bot", "LIST_URL"),
+        "chemeng.html": ("chemeng_bot", "LIST_URL"),
+        "ee.html":      ("ee_bot", "LIST_URL"),
+        "notice.html":  ("notice_bot", "NOTICE_URL"),
+    }
+    for name, (mod_name, attr) in live.items():
+        url = getattr(importlib.import_module(mod_name), attr)
+        try:
+            r = http_client.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=20)
+            r.raise_for_status()
+        except Exception as e:
+            print(f"⚠️ {name} 받기 실패 – {e}")
+            continue
+        body = r.content
+        if name == "notice.html":                        # 본문 링크를 로컬 서버로
+            body = body.replace(b"https://scatch.ssu.ac.kr/", b"{BASE}/notice/view?u=/")
+        with open(os.path.join(FIXTURES, name), "wb") as f:
+            f.write(body)
+        print(f"💾 {name} ({len(body) / 1024:.0f} KiB)")
+
+def main():
+    ap = argparse.ArgumentParser(description="게시판 봇 오프라인 벤치마크")
+    ap.add_argument("boards", nargs="*", help=f"게시판 (기본 전체: {', '.join(BOARDS)})")
+    ap.add_argument("-n", type=int, default=20, help="반복 횟수")
+    ap.add_argument("--latency", type=float, default=0, help="서버 응답 지연(ms)")
+    ap.add_argument("--fail", type=float, default=0, help="503 응답 비율 (0~1)")
+    ap.add_argument("--compare", metavar="COMMIT", help="bench_results 의 이전 결과와 비교")
+    ap.add_argument("--no-save", action="store_true", help="결과를 저장하지 않음")
+    ap.add_argument("--record", action="store_true", help="실제 사이트 목록으로 fixture 갱신")
+    args = ap.parse_args()
+
+    if args.record:
+        return record()
+    names = args.boards or list(BOARDS)
+    unknown = [b for b in names if b not in BOARDS]
+    if unknown:
+        sys.exit(f"❌ 알 수 없는 게시판: {', '.join(unknown)} (가능: {', '.join(BOARDS)})")
+
+    # 봇 import 전에: 캐시·상태는 임시 폴더로 (실제 cache/ · state.db 보호)
+    tmp = tempfile.mkdtemp(prefix="bench-")
+    os.environ["BOT_CACHE_DIR"] = tmp
+    os.environ["BOT_STATE_DB"] = os.path.join(tmp, "state.db")
+    sys.path.insert(0, HERE)
+    import http_client
+
+    srv, base = start_server(args.latency, args.fail)
+    rev, dirty = git_rev()
+    result = {"commit": rev, "dirty": dirty, "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+              "config": {"n": args.n, "latency_ms": args.latency, "fail": args.fail},
+              "boards": {}}
+
+    print(f"{'board':<8} {'stage':<18} {'p50 ms':>8} {'p95 ms':>8}")
+    for name in names:
+        try:
+            stats = bench_board(BOARDS[name](base), args.n)
+        except Exception as e:
+            print(f"🚫 {name:<8} {type(e).__name__}: {e}")
+            continue
+        result["boards"][name] = stats
+        for stage, s in stats["stages"].items():
+            print(f"{name:<8} {stage:<18} {s['p50']:8.2f} {s['p95']:8.2f}")
+        t = stats["total"]
+        print(f"{name:<8} {'= total':<18} {t['p50']:8.2f} {t['p95']:8.2f}  peak {stats['peak_kib']:.0f} KiB")
+    srv.shutdown()
+
+    reqs = sum(s["requests"] for s in http_client.summary().values())
+    errs = sum(s["errors"] for s in http_client.summary().values())
+    result["http"] = {"requests": reqs, "errors": errs}
+    print(f"🌐 요청 {reqs}회 (503 등 실패 {errs}회)")
+
+    if args.compare:
+        old = load_result(args.compare)
+        if not old:
+            print(f"⚠️ {args.compare} 결과 없음 ({RESULTS})")
+        else:
+            print(f"── {old['commit']} 대비 total p50 ──────────────")
+            for name, s in result["boards"].items():
+                o = old["boards"].get(name)
+                if not o:
+                    continue
+                a, b = o["total"]["p50"], s["total"]["p50"]
+                print(f"{name:<8} {a:8.2f} → {b:8.2f} ms  ({(b - a) / a * 100:+.1f}%)")
+    if not args.no_save:
+        print(f"💾 {save(result)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# catchup.py ─ 장애 뒤 밀린 글 따라잡기 (목록 2페이지 이후)
+# • 1페이지에 이미 본(보낸) 글이 하나도 없으면 2페이지부터 WORKERS 개씩 동시에 받아
+#   본 글이 처음 나오는 페이지에서 멈춤 → 그 위의 글만 1페이지 뒤에 이어 붙여 반환
+# • 페이지 수(MAX_PAGES) · 바이트(MAX_BYTES) · 실행 예산(deadline) 상한. 상한·오류면 받은 데까지만 반환
+#   오류·예산·바이트 상한으로 멈췄으면 이어 받을 위치(받은 가장 오래된 글 id)도 함께 반환
+#   → 호출하는 쪽이 state 에 두었다가 다음 실행에 after 로 넘기면 빈 구간부터 다시 받음
+#   (MAX_PAGES 는 얼마나 과거까지 따라갈지의 상한이라 거기서 멈추면 완료로 봄)
+# • 호출하는 쪽에서 처음 실행(본 글 없음)에는 쓰지 않음 → 예전처럼 최신 글만
+# • 반환 순서는 목록과 같은 최신 → 과거. 전송은 각 봇이 오래된 것부터
+# • 고정 공지는 늘 1페이지(게시판에 따라 모든 페이지) 위에 있고 늘 본 글이라
+#   겹침 판단에 쓰지 않음 → 파서가 Pinned(row) 로 표시 (보통 튜플처럼 쓰임)
+# 환경
+#   BOT_CATCHUP_PAGES   1페이지 포함 최대 페이지 수. 기본 5
+#   BOT_CATCHUP_BYTES   2페이지 이후 받을 최대 바이트. 기본 4 MB
+
+import os, traceback
+import http_client, tracing
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_PAGES = int(os.getenv("BOT_CATCHUP_PAGES", "5"))
+MAX_BYTES = int(os.getenv("BOT_CATCHUP_BYTES", str(4 * 1024 * 1024)))
+WORKERS   = 3                    # 한 번에 받는 페이지 수 (호스트 상한은 http_client 가 따로 적용)
+
+class Pinned(tuple):
+    """고정 공지 행 표시. (id, 제목, 링크) 튜플 그대로 쓰되 겹침 판단에서만 제외"""
+
+def regular(rows: list) -> list:
+    """고정 공지를 뺀 행"""
+    return [row for row in rows if not isinstance(row, Pinned)]
+
+def page_fetcher(board: str, page_url, decode, parse, **kw):
+    """(n, deadline) → (글 목록, 바이트) 함수 만들기. 실패(예외·200 아님)면 None.
+    page_url(n) → URL · decode(Response) → str · parse(str) → [(id, …)]
+    kw 는 http_client.get 으로 전달 (headers, timeout 등)"""
+    def fetch(n: int, deadline=None):
+        url = page_url(n)
+        try:
+            with tracing.span("fetch", board, url=url, page=n) as sp:
+                r = http_client.get(url, deadline=deadline, **kw)
+                sp["status"], sp["bytes"] = r.status_code, len(r.content)
+            if r.status_code != 200:
+                return None
+            with tracing.span("decode", board, bytes=len(r.content)):
+                html = decode(r)
+            with tracing.span("parse", board, chars=len(html), page=n) as sp:
+                rows = parse(html)
+                sp["rows"] = len(rows)
+            return rows, len(r.content)
+        except http_client.DeadlineExceeded:
+            return None
+        except Exception:
+            traceback.print_exc()
+            return None
+    return fetch
+
+def collect(board: str, first: list, fetch_page, known, deadline=None,
+            after: str | None = None) -> tuple[list, str | None]:
+    """first: 1페이지 글 [(id, …)] 최신 → 과거
+    fetch_page(n, deadline) → (글 목록, 바이트) 또는 None · known(id) → 이미 본 글이면 True
+    1페이지 일반 글이 없거나(변화 없음) 그중 아는 글이 있으면 first 그대로,
+    없으면 다음 페이지들을 아는 일반 글 직전까지 이어 붙임 (고정 공지는 판단에서 제외)
+    after: 지난번에 끝나지 못한 따라잡기의 이어 받을 위치. 주면 1페이지와 상관없이 다시 훑되
+      after 글을 지나기 전의 아는 글에서는 멈추지 않고, 바이트 상한도 그 뒤부터 셈
+    반환: (글 목록, 이어 받을 위치) ─ 아는 글·목록 끝·MAX_PAGES 에 닿았으면 None,
+      오류·예산·바이트 상한으로 멈췄으면 다음 실행에 after 로 넘길 id"""
+    head = regular(first)
+    if MAX_PAGES < 2 or (after is None and (not head or any(known(row[0]) for row in head))):
+        return first, None
+    rows, ids = list(first), {row[0] for row in first}
+    passed = after is None
+    total, page, stop = 0, 2, "pages"
+
+    def scan(got: list, fresh: bool) -> bool:
+        """한 페이지 훑기. 멈출 아는 글을 만나면 True"""
+        nonlocal passed
+        for row in got:
+            if isinstance(row, Pinned):
+                pass                                   # 페이지마다 반복되는 고정 공지
+            elif not passed:
+                passed = row[0] == after               # 여기까지는 지난번에 받은 글
+            elif known(row[0]):
+                return True
+            if fresh and row[0] not in ids:
+                ids.add(row[0]); rows.append(row)
+        return False
+
+    if scan(first, False):                             # 이어 받기: 1페이지에서 이미 겹침
+        return first, None
+    with tracing.span("catchup", board, resume=after is not None) as sp, \
+         ThreadPoolExecutor(WORKERS) as pool:
+        n = 1
+        while stop == "pages" and page <= MAX_PAGES and total < MAX_BYTES:
+            if deadline and deadline.expired():
+                stop = "deadline"; break
+            batch = list(range(page, min(page + WORKERS, MAX_PAGES + 1)))
+            page = batch[-1] + 1
+            for n, res in zip(batch, pool.map(lambda i: fetch_page(i, deadline), batch)):
+                if res is None:
+                    stop = "deadline" if deadline and deadline.expired() else "error"; break
+                got, nbytes = res
+                if passed:
+                    total += nbytes
+                if not got:
+                    stop = "end"; break                # 마지막 페이지 너머
+                if scan(got, True):
+                    stop = "found"; break
+                if total >= MAX_BYTES:
+                    stop = "bytes"; break
+            sp["pages"] = n
+        sp["stop"], sp["bytes"], sp["rows"] = stop, total, len(rows)
+    mark = "⏪" if stop == "found" else "⚠️"
+    print(f"{mark} {board}: 밀린 글 따라잡기 {n}페이지까지 · {len(rows)}건 ({stop})")
+    if stop in ("found", "end", "pages"):
+        return rows, None
+    if not passed:
+        return rows, after                             # 지난번 위치까지도 못 감
+    tail = regular(rows)
+    return rows, tail[-1][0] if tail else after
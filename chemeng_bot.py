@@ -1,11 +1,13 @@
 # chemeng_bot.py — 화학공학과(sub03_01) 공지 알림 (링크 패턴 기반)
-import os, re, sys, hashlib, requests, traceback
-from bs4 import BeautifulSoup
+import os, re, sys, hashlib, traceback
+import page_cache, catchup, delivery, tracing, list_bot
+from bs4 import SoupStrainer
+from html_parse import make_soup
 from urllib.parse import urljoin
 
 WEBHOOK  = os.getenv("DISCORD_WEBHOOK_CHEMENG")          # ← Secrets
 LIST_URL = "http://chemeng.ssu.ac.kr/sub/sub03_01.php"
-ID_FILE  = "last_chemeng_id.txt"
+BOARD    = "chemeng"                                     # page_cache · state 키
 
 HEADERS  = {"User-Agent": "Mozilla/5.0"}
 TIMEOUT  = 20
@@ -19,10 +21,15 @@ def smart_decode(b: bytes) -> str:
             continue
     return b.decode("utf-8", "replace")
 
-def fetch_html():
+def fetch_html(deadline=None):
     try:
-        r = requests.get(LIST_URL, headers=HEADERS, timeout=TIMEOUT)
-        return smart_decode(r.content)
+        r = page_cache.get(BOARD, LIST_URL, headers=HEADERS, timeout=TIMEOUT,
+                           deadline=deadline)
+        if r is page_cache.UNCHANGED:
+            return r
+        with tracing.span("decode", BOARD, bytes=len(r.content)):
+            html = smart_decode(r.content)
+        return html
     except Exception:
         traceback.print_exc(); return None
 
@@ -30,16 +37,13 @@ def is_notice(text: str) -> bool:
     """고정 공지 여부: [공지] · '공지' 단어가 제목 앞쪽에 있으면 True"""
     return bool(re.match(r"\s*\[?공지\]?", text))
 
-def get_latest():
-    html = fetch_html()
-    if not html:
-        return None, None, None
-
-    soup = BeautifulSoup(html, "html.parser")
-
+def parse_notices(html: str) -> list:
+    """목록의 일반 글 [(id, 제목, 링크)] 위에서부터(최신 → 과거), 중복 링크 제거"""
     # a href 에 ?idx= 또는 ?num= 가 포함된 링크를 위에서부터 탐색
     pattern = re.compile(r"[?&](idx|num)=\d+", re.I)
+    soup = make_soup(html, SoupStrainer("a", href=pattern))   # 글 링크만 파싱
 
+    rows, ids = [], set()
     for a in soup.find_all("a", href=pattern):
         title = a.get_text(" ", strip=True)
         if is_notice(title):
@@ -48,31 +52,33 @@ def get_latest():
         link = urljoin("http://chemeng.ssu.ac.kr", a["href"])
         m = re.search(pattern, link)
         nid = m.group(0).split("=")[-1] if m else md5(link)
-        return nid, title, link
+        if nid in ids:
+            continue
+        ids.add(nid)
+        rows.append((nid, title, link))
 
-    return None, None, None
+    return rows
 
-def read_last():
-    try: return open(ID_FILE).read().strip()
-    except FileNotFoundError: return None
+def page_url(n: int) -> str:
+    """목록 n페이지 주소 (밀린 글 따라잡기용)"""
+    return f"{LIST_URL}?page={n}"
 
-def write_last(n): open(ID_FILE, "w").write(n)
+fetch_page = catchup.page_fetcher(BOARD, page_url, lambda r: smart_decode(r.content), parse_notices,
+                                  headers=HEADERS, timeout=TIMEOUT)
 
-def send(msg):
-    requests.post(WEBHOOK, json={"content": msg}, timeout=10)
+def get_notices(deadline=None):
+    """목록 글 전체. 실패 시 None, 목록이 지난번과 같으면 []"""
+    return list_bot.get_notices(BOARD, fetch_html, parse_notices, deadline)
+
+def send(rows, deadline=None) -> int:
+    """새 글 [(id, 제목, 링크)]을 묶어 전송. 확인된 글 수 반환"""
+    return delivery.deliver(WEBHOOK, "⚗️ **화학공학과 새 공지**",
+                            [delivery.embed(title, link) for _, title, link in rows], deadline)
 
 def main():
     if not WEBHOOK:
         sys.exit("❌ DISCORD_WEBHOOK_CHEMENG 시크릿이 없습니다")
-
-    nid, title, link = get_latest()
-    if not nid:
-        print("🚫 공지 파싱 실패 — 사이트 구조가 예상과 다른 듯합니다"); return
-    if nid == read_last():
-        print("⏸ 새 글 없음"); return
-
-    send(f"⚗️ **화학공학과 새 공지**\n{title}\n{link}")
-    write_last(nid); print("✅ 새 공지 전송 완료")
+    list_bot.run(BOARD, get_notices, fetch_page, send, "🚫 공지 파싱 실패 — 사이트 구조가 예상과 다른 듯합니다")
 
 if __name__ == "__main__":
-    main()
+    tracing.run(main, BOARD)
@@ -0,0 +1,60 @@
+# conftest.py ─ 테스트 공용 로컬 HTTP 대역(stand-in) 서버
+# • stand_in.reply(status, body, headers) 로 응답을 차례로 예약 (다 쓰면 200 + default)
+# • 받은 요청은 stand_in.calls 에 (경로, 쿼리, JSON 본문, 받은 시각) 으로 쌓임
+#     def test_x(stand_in): stand_in.reply(429, {"retry_after": 0.2}); post(stand_in.url + "/hook", …)
+
+import json, time, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+import pytest
+
+class StandIn:
+    def __init__(self):
+        self.script = []                 # [(status, body, headers)]
+        self.calls = []                  # [(path, query, body, monotonic)]
+        self.default = {}
+        self.respond = None              # (path, body) → body 를 직접 만들 때
+        self._lock = threading.Lock()
+
+    def reply(self, status: int, body=None, headers: dict | None = None):
+        self.script.append((status, body, headers or {}))
+
+    def _next(self, path, body):
+        with self._lock:
+            if self.script:
+                return self.script.pop(0)
+        if self.respond:
+            return 200, self.respond(path, body), {}
+        return 200, self.default, {}
+
+def _handler(stand: StandIn):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            parts = urlsplit(self.path)
+            raw = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+            body = json.loads(raw) if raw else None
+            with stand._lock:
+                stand.calls.append((parts.path, parse_qs(parts.query), body, time.monotonic()))
+            status, out, headers = stand._next(parts.path, body)
+            data = b"" if out is None else json.dumps(out, ensure_ascii=False).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in headers.items():
+                self.send_header(k, str(v))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+    return Handler
+
+@pytest.fixture
+def stand_in():
+    stand = StandIn()
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _handler(stand))
+    threading.Thread(target=srv.serve_forever, args=(0.05,), daemon=True).start()
+    stand.url = f"http://127.0.0.1:{srv.server_address[1]}"
+    yield stand
+    srv.shutdown()
+    srv.server_close()
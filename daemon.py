@@ -0,0 +1,154 @@
+# daemon.py ─ 상주 프로세스로 게시판을 각자 주기에 맞춰 점검
+# • Actions cron 한 번마다 드는 러너 준비 · pip install · 인터프리터 시작 · git push 없이
+#   한 프로세스에서 봇 모듈(파서·공유 HTTP 연결)을 그대로 두고 main()만 반복 실행
+# • 게시판마다 주기(분)와 KST 활동 시간대가 따로 있음 (SCHEDULE)
+#   - every: N분 간격, 자정 기준 격자에 맞춰 실행 (예: 10분 → :00 :10 :20 …)
+#   - from / until: "HH:MM" KST 활동 시간대 (둘 다 포함, 예: 07:00 – 22:30)
+#   - at:    매일 HH:MM 한 번 (날씨)
+# • 같은 게시판은 겹쳐 실행하지 않음 (이전 점검이 아직 돌면 이번 차례는 건너뜀)
+# • 상태는 지금처럼 state.db · cache/ 에 그대로 저장 (커밋·push 는 하지 않음)
+# • BOT_POLL_GATE=1 이면 every 게시판을 poll_gate.FAST_MIN 분 격자로 깨우되
+#   게시 빈도 모델(poll_gate.py)이 새 글 가능성이 높다고 볼 때만 점검
+#   → 글 잦은 시간대는 주기보다 빨리, 드문 시간대는 MAX_GAP_H 까지 느리게
+# • SIGTERM · Ctrl+C 면 실행 중인 점검을 마치고 종료
+# • 사용법
+#     python daemon.py                # 전체 게시판 + 날씨
+#     python daemon.py ee sw          # 일부만
+#     python daemon.py --plan         # 다음 실행 시각만 출력
+# • 환경
+#     BOT_INTERVALS   주기 덮어쓰기 (예: "notice=5,ee=15")
+#     (그 밖의 시크릿·BOT_* 설정은 각 봇과 같음)
+
+import os, sys, time, heapq, signal, threading
+import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
+import runner, poll_gate
+
+KST = dt.timezone(dt.timedelta(hours=9))
+
+# 게시판 → 점검 일정. 활동 시간대는 워크플로 cron 그대로
+#   runner.yml: 정각 07:00 – 23:00, 30분 07:30 – 22:30 은 학사·정보통신만, 23:00 은 둘 제외
+#   kma_weather.yml: 매일 06:40
+SCHEDULE = {
+    "notice":  {"every": 10, "from": "07:00", "until": "22:30"},
+    "sw":      {"every": 10, "from": "07:00", "until": "23:00"},
+    "me":      {"every": 20, "from": "07:00", "until": "23:00"},
+    "mse":     {"every": 30, "from": "07:00", "until": "23:00"},
+    "chemeng": {"every": 30, "from": "07:00", "until": "23:00"},
+    "ee":      {"every": 20, "from": "07:00", "until": "23:00"},
+    "infocom": {"every": 20, "from": "07:00", "until": "22:30"},
+    "np":      {"every": 30, "from": "07:00", "until": "23:00"},
+    "kma":     {"at": "06:40"},
+}
+MODULES = {**runner.BOARDS, "kma": "kma_weather_bot"}
+
+def load_intervals(spec: str) -> dict[str, int]:
+    """"notice=5,ee=15" → {"notice": 5, "ee": 15}"""
+    out = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, minutes = part.partition("=")
+        out[name.strip()] = int(minutes)
+    return out
+
+for _name, _minutes in load_intervals(os.getenv("BOT_INTERVALS", "")).items():
+    if _name in SCHEDULE and "every" in SCHEDULE[_name]:
+        SCHEDULE[_name] = {**SCHEDULE[_name], "every": _minutes}
+
+# ── 일정 계산 ───────────────────────────────────────────────
+def minutes(hhmm: str) -> int:
+    """"22:30" → 자정 이후 분 (1350)"""
+    hh, mm = map(int, hhmm.split(":"))
+    return hh * 60 + mm
+
+def is_active(spec: dict, t: dt.datetime) -> bool:
+    """t 가 활동 시간대 안인지 (from · until 분 단위, 양 끝 포함)"""
+    now = t.hour * 60 + t.minute
+    return minutes(spec.get("from", "00:00")) <= now <= minutes(spec.get("until", "23:59"))
+
+def next_run(spec: dict, after: dt.datetime) -> dt.datetime:
+    """after 이후(after 포함 안 함) 첫 실행 시각 (KST)"""
+    midnight = after.replace(hour=0, minute=0, second=0, microsecond=0)
+    if "at" in spec:
+        hh, mm = divmod(minutes(spec["at"]), 60)
+        t = midnight.replace(hour=hh, minute=mm)
+        return t if t > after else t + dt.timedelta(days=1)
+
+    step = spec["every"] * 60
+    n = int((after - midnight).total_seconds() // step) + 1
+    t = midnight + dt.timedelta(seconds=n * step)
+    if is_active(spec, t):
+        return t
+    hh, mm = divmod(minutes(spec.get("from", "00:00")), 60)
+    t = t.replace(hour=hh, minute=mm, second=0, microsecond=0)
+    return t if t > after else t + dt.timedelta(days=1)
+
+def tick_spec(spec: dict) -> dict:
+    """게이트를 쓰면 깨우는 격자를 FAST_MIN 분으로 (점검 여부는 poll_gate 가 결정)"""
+    if poll_gate.ENABLED and "every" in spec:
+        return {**spec, "every": min(spec["every"], poll_gate.FAST_MIN)}
+    return spec
+
+def first_run(spec: dict, now: dt.datetime) -> dt.datetime:
+    """시작하자마자: 활동 시간대면 바로, 아니면 다음 차례"""
+    if "every" in spec and is_active(spec, now):
+        return now
+    return next_run(spec, now)
+
+# ── 점검 ────────────────────────────────────────────────────
+def check(name: str):
+    results = {}
+    runner.run_board(name, results, MODULES[name])
+    status, sec = results[name]
+    mark = "✅" if status == "ok" else "🚫"
+    print(f"{mark} {name:<8} {status:<12} {sec:6.2f}s", flush=True)
+
+def serve(names: list[str], stop: threading.Event):
+    now = dt.datetime.now(KST)
+    queue = [(first_run(SCHEDULE[n], now), n) for n in names]
+    heapq.heapify(queue)
+    running = {}
+    with ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="board") as pool:
+        while not stop.is_set():
+            when, name = queue[0]
+            wait = (when - dt.datetime.now(KST)).total_seconds()
+            if wait > 0:
+                stop.wait(min(wait, 60))        # 시계가 바뀌어도 1분 안에 다시 계산
+                continue
+            heapq.heappop(queue)
+            spec = SCHEDULE[name]
+            job = running.get(name)
+            if job and not job.done():
+                print(f"⏭ {name}: 이전 점검이 아직 실행 중 – 이번 차례 건너뜀", flush=True)
+            elif not (poll_gate.ENABLED and "every" in spec) or \
+                    poll_gate.due(name, base_min=spec["every"]):   # 새 글 가능성 낮으면 건너뜀
+                running[name] = pool.submit(check, name)
+            # 밀려서(절전 등) 늦게 깼으면 지난 차례는 몰아서 돌리지 않고 다음 격자로
+            heapq.heappush(queue, (next_run(tick_spec(spec), max(when, dt.datetime.now(KST))), name))
+        print("🛑 종료 요청 – 실행 중인 점검을 마치는 중", flush=True)
+
+def main():
+    args = sys.argv[1:]
+    plan = "--plan" in args
+    names = [a for a in args if a != "--plan"] or list(SCHEDULE)
+    unknown = [n for n in names if n not in SCHEDULE]
+    if unknown:
+        sys.exit(f"❌ 알 수 없는 게시판: {', '.join(unknown)} (가능: {', '.join(SCHEDULE)})")
+
+    now = dt.datetime.now(KST)
+    for name in names:
+        spec = SCHEDULE[name]
+        when = "매일 " + spec["at"] if "at" in spec else \
+            f"{spec['every']}분마다 {spec['from']}–{spec['until']}"
+        print(f"🗓 {name:<8} {when:<22} 다음 {first_run(spec, now):%m-%d %H:%M}")
+    if plan:
+        return
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+    t0 = time.monotonic()
+    serve(names, stop)
+    print(f"👋 {time.monotonic() - t0:.0f}s 동안 실행")
+
+if __name__ == "__main__":
+    main()
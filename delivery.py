@@ -0,0 +1,153 @@
+# delivery.py ─ 디스코드 웹훅 전송 계층
+# • 연결은 http_client 의 호스트별 keep-alive Session 을 재사용
+# • X-RateLimit-* 헤더로 버킷별 남은 횟수/리셋 시각을 기억해 미리 대기,
+#   429 면 Retry-After(retry_after) 만큼 쉬고 재시도
+# • 같은 채널로 가는 새 글 여러 개를 embed 최대 10개짜리 메시지로 묶음
+#   (content 2000자 · embed 제목 256자 · 설명 4096자 · 메시지 합계 6000자 제한 준수)
+# • ?wait=true 로 보내 디스코드가 실제로 저장했는지 확인한 결과를 반환
+#   → 봇은 확인된 글만 상태에 기록
+# • deadline(http_client.Deadline)을 주면 남은 시간 안에서만 보내고 기다림
+#   → 예산이 모자라면 거기서 멈추고 못 보낸 글은 다음 주기에
+
+import time, threading, requests
+import http_client
+
+MAX_EMBEDS  = 10
+MAX_CONTENT = 2000
+MAX_TITLE   = 256
+MAX_DESC    = 4096
+MAX_TOTAL   = 6000       # 한 메시지의 embed 글자 수 합계
+MAX_TRIES   = 5
+TIMEOUT     = 10
+
+_lock = threading.Lock()
+_hook_bucket = {}        # webhook → X-RateLimit-Bucket
+_buckets = {}            # bucket → (remaining, reset 시각(monotonic))
+
+def _cut(s: str, n: int) -> str:
+    return s if len(s) <= n else s[:n - 1] + "…"
+
+def embed(title: str, url: str | None = None, description: str | None = None) -> dict:
+    e = {"title": _cut(title or "제목 없음", MAX_TITLE)}
+    if url:
+        e["url"] = url
+    if description:
+        e["description"] = _cut(description, MAX_DESC)
+    return e
+
+# 남은 예산 안에서 delay 초 대기. 예산이 모자라면 기다리지 않고 False
+def _sleep(delay: float, deadline) -> bool:
+    if deadline and deadline.remaining() <= delay:
+        return False
+    time.sleep(delay)
+    return True
+
+# 버킷이 바닥났으면 리셋까지 대기
+def _wait_bucket(webhook: str, deadline=None) -> bool:
+    with _lock:
+        st = _buckets.get(_hook_bucket.get(webhook))
+    if st and st[0] <= 0:
+        delay = st[1] - time.monotonic()
+        if delay > 0:
+            return _sleep(delay, deadline)
+    return True
+
+def _update_bucket(webhook: str, r: requests.Response):
+    h = r.headers
+    bucket = h.get("X-RateLimit-Bucket")
+    if not bucket or "X-RateLimit-Remaining" not in h:
+        return
+    try:
+        remaining = int(h["X-RateLimit-Remaining"])
+        reset_at = time.monotonic() + float(h.get("X-RateLimit-Reset-After", "0"))
+    except ValueError:
+        return
+    with _lock:
+        _hook_bucket[webhook] = bucket
+        _buckets[bucket] = (remaining, reset_at)
+
+def _retry_after(r: requests.Response) -> float:
+    try:
+        return float(r.json().get("retry_after"))
+    except Exception:
+        pass
+    try:
+        return float(r.headers.get("Retry-After", "1"))
+    except ValueError:
+        return 1.0
+
+def post(webhook: str, payload: dict, deadline=None) -> bool:
+    """메시지 하나 전송. 디스코드가 받아들였으면 True"""
+    for attempt in range(MAX_TRIES):
+        if not _wait_bucket(webhook, deadline):
+            break
+        try:
+            # 재시도·429 처리는 버킷 정보를 아는 이 함수가 직접 (retries=0)
+            r = http_client.post(webhook, params={"wait": "true"}, json=payload,
+                                 timeout=TIMEOUT, retries=0, deadline=deadline)
+        except http_client.DeadlineExceeded:
+            break
+        except requests.RequestException as e:
+            print(f"⚠️ 디스코드 연결 오류 (try {attempt + 1}) – {e}")
+            if not _sleep(http_client.backoff_delay(attempt, 1.0), deadline):
+                break
+            continue
+        _update_bucket(webhook, r)
+        if r.status_code == 429:
+            wait = _retry_after(r)
+            print(f"⏳ 디스코드 429 – {wait:.1f}s 대기")
+            if not _sleep(wait, deadline):
+                break
+            continue
+        if r.ok:
+            return True
+        if r.status_code >= 500:
+            if not _sleep(http_client.backoff_delay(attempt, 1.0), deadline):
+                break
+            continue
+        print(f"🚫 디스코드 {r.status_code}: {r.text[:200]}")
+        return False
+    if deadline and deadline.expired():
+        print("⌛ 실행 예산 소진 – 남은 메시지는 다음 주기에")
+    return False
+
+def pack(header: str, embeds: list[dict]) -> list[dict]:
+    """embed 들을 제한에 맞는 메시지 여러 개로 묶기 (순서 유지)"""
+    content = _cut(header, MAX_CONTENT)
+    msgs, cur, size = [], [], 0
+    for e in embeds:
+        n = len(e.get("title", "")) + len(e.get("description", ""))
+        if cur and (len(cur) >= MAX_EMBEDS or size + n > MAX_TOTAL):
+            msgs.append({"content": content, "embeds": cur})
+            cur, size = [], 0
+        cur.append(e)
+        size += n
+    if cur:
+        msgs.append({"content": content, "embeds": cur})
+    return msgs
+
+def deliver(webhook: str, header: str, embeds: list[dict], deadline=None) -> int:
+    """embed 들을 묶어 순서대로 전송. 앞에서부터 확인된 embed 수를 반환
+    (중간에 실패하거나 예산이 떨어지면 거기서 멈춤)"""
+    done = 0
+    for msg in pack(header, embeds):
+        if not post(webhook, msg, deadline):
+            break
+        done += len(msg["embeds"])
+    return done
+
+def send_text(webhook: str, text: str, deadline=None) -> bool:
+    """일반 텍스트 메시지. 2000자를 넘으면 줄 단위로 나눠 전송"""
+    chunks, cur = [], ""
+    for line in text.split("\n"):
+        while len(line) > MAX_CONTENT:
+            if cur:
+                chunks.append(cur); cur = ""
+            chunks.append(line[:MAX_CONTENT]); line = line[MAX_CONTENT:]
+        if cur and len(cur) + 1 + len(line) > MAX_CONTENT:
+            chunks.append(cur); cur = line
+        else:
+            cur = f"{cur}\n{line}" if cur else line
+    if cur:
+        chunks.append(cur)
+    return all(post(webhook, {"content": c}, deadline) for c in chunks)
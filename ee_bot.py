@@ -1,15 +1,17 @@
 # ee_bot.py  ― 전기공학부(sub05_01) 최신 공지 알림
 # 1. 고정 공지([공지], '공지') 제외
-# 2. 링크에 ?idx= / ?num= 값이 있는 첫 글을 최신 글로 간주
-# 3. DUP 방지용 ID 파일(last_ee_id.txt) 저장
+# 2. 링크에 ?idx= / ?num= 값이 있는 글을 목록 전체에서 추출
+# 3. 본 글 ID 목록(state.db)에 없는 글을 모두 오래된 것부터 전송
 
-import os, re, sys, hashlib, traceback, requests
-from bs4 import BeautifulSoup
+import os, re, sys, hashlib, traceback
+import page_cache, catchup, delivery, tracing, list_bot
+from bs4 import SoupStrainer
+from html_parse import make_soup
 from urllib.parse import urljoin
 
 WEBHOOK  = os.getenv("DISCORD_WEBHOOK_EE")                # ← Secrets
 LIST_URL = "http://ee.ssu.ac.kr/sub/sub05_01.php"
-ID_FILE  = "last_ee_id.txt"
+BOARD    = "ee"                                          # page_cache · state 키
 
 HEADERS  = {"User-Agent": "Mozilla/5.0"}
 TIMEOUT  = 20
@@ -22,21 +24,24 @@ def smart_decode(b: bytes) -> str:
         except UnicodeDecodeError: pass
     return b.decode("utf-8", "replace")
 
-def fetch_html():
+def fetch_html(deadline=None):
     try:
-        r = requests.get(LIST_URL, headers=HEADERS, timeout=TIMEOUT)
-        return smart_decode(r.content)
+        r = page_cache.get(BOARD, LIST_URL, headers=HEADERS, timeout=TIMEOUT,
+                           deadline=deadline)
+        if r is page_cache.UNCHANGED: return r
+        with tracing.span("decode", BOARD, bytes=len(r.content)):
+            html = smart_decode(r.content)
+        return html
     except Exception:
         traceback.print_exc(); return None
 
 def is_notice(title: str) -> bool:
     return bool(re.match(r"\s*\[?공지\]?", title))
 
-def get_latest():
-    html = fetch_html()
-    if not html: return None, None, None
-    soup = BeautifulSoup(html, "html.parser")
-
+def parse_notices(html: str) -> list:
+    """목록의 일반 글 [(id, 제목, 링크)] 위에서부터(최신 → 과거), 중복 링크 제거"""
+    soup = make_soup(html, SoupStrainer("a", href=IDX_RE))    # 글 링크만 파싱
+    rows, ids = [], set()
     for a in soup.find_all("a", href=IDX_RE):
         title = a.get_text(" ", strip=True)
         if is_notice(title):
@@ -44,29 +49,30 @@ def get_latest():
         link = urljoin("http://ee.ssu.ac.kr", a["href"])
         m = IDX_RE.search(link)
         nid = m.group(2) if m else md5(link)
-        return nid, title, link
-    return None, None, None
+        if nid in ids: continue
+        ids.add(nid); rows.append((nid, title, link))
+    return rows
+
+def page_url(n: int) -> str:
+    """목록 n페이지 주소 (밀린 글 따라잡기용)"""
+    return f"{LIST_URL}?page={n}"
 
-def read_last():
-    try: return open(ID_FILE).read().strip()
-    except FileNotFoundError: return None
+fetch_page = catchup.page_fetcher(BOARD, page_url, lambda r: smart_decode(r.content), parse_notices,
+                                  headers=HEADERS, timeout=TIMEOUT)
 
-def write_last(n): open(ID_FILE, "w").write(n)
+def get_notices(deadline=None):
+    """목록 글 전체. 실패 시 None, 목록이 지난번과 같으면 []"""
+    return list_bot.get_notices(BOARD, fetch_html, parse_notices, deadline)
 
-def send(msg): requests.post(WEBHOOK, json={"content": msg}, timeout=10)
+def send(rows, deadline=None) -> int:
+    """새 글 [(id, 제목, 링크)]을 묶어 전송. 확인된 글 수 반환"""
+    return delivery.deliver(WEBHOOK, "⚡ **전기공학부 새 공지**",
+                            [delivery.embed(title, link) for _, title, link in rows], deadline)
 
 def main():
     if not WEBHOOK:
         sys.exit("❌ DISCORD_WEBHOOK_EE 시크릿이 없습니다")
-
-    nid, title, link = get_latest()
-    if not nid:
-        print("🚫 공지 파싱 실패"); return
-    if nid == read_last():
-        print("⏸ 새 글 없음"); return
-
-    send(f"⚡ **전기공학부 새 공지**\n{title}\n{link}")
-    write_last(nid); print("✅ 새 공지 전송 완료")
+    list_bot.run(BOARD, get_notices, fetch_page, send, "🚫 공지 파싱 실패")
 
 if __name__ == "__main__":
-    main()
+    tracing.run(main, BOARD)
@@ -0,0 +1,267 @@
+# forecast_rules.py ─ 예보 열(column) 표 + 규칙 식 일괄 평가
+# • 예보 item → Table: ts(epoch 초) 와 항목별 float 열 (POP · PCP · TMP · SKY · WSD …)
+#   없는 값은 NaN (비교하면 항상 거짓)
+# • frame() 으로 여러 지점의 표를 하나로 쌓고 파생 열(loc · hour · ahead · dow)을 붙임
+#   → 규칙 하나를 모든 지점에 대해 한 번의 배열 연산으로 평가
+# • 규칙 식은 파이썬 식 문법의 제한된 부분집합 (ast 화이트리스트, eval 사용 안 함)
+#     POP >= 60 and PCP >= 1 and 0 <= ahead < 24     # 비
+#     TMP >= 33                                      # 폭염
+#     daysum(PCP * between(hour, 7, 10)) >= 5        # 출근 시간대 강수량 합
+#   연산: + - * /  비교  and or not   함수: between · daysum · daymax · daymin · abs
+# • numpy 로 배열 연산 (requirements.txt · kma_weather.yml 에 포함)
+
+import re, ast, math, operator, datetime as dt
+import numpy as np
+
+KST = dt.timezone(dt.timedelta(hours=9))
+NAN = float("nan")
+
+# 숫자로 읽는 예보 항목
+COLUMNS = ("POP", "PCP", "TMP", "SKY", "WSD", "REH", "PTY", "SNO")
+DERIVED = ("loc", "hour", "ahead", "dow", "day")   # day: KST 날짜 번호 (1970-01-01 = 0)
+
+# ── 값 변환 ────────────────────────────────────────────────────────
+_NUM_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+def to_number(raw: str) -> float:
+    """'강수없음' → 0, '1mm 미만' → 0.5, '30.0~50.0mm' → 30, '50.0mm 이상' → 50"""
+    if raw in ("", "강수없음", "적설없음"):
+        return 0.0
+    if "미만" in raw:
+        return 0.5
+    m = _NUM_RE.search(raw)
+    return float(m.group()) if m else NAN
+
+def _array(values):
+    return np.asarray(list(values), dtype=float)
+
+# ── 표 ──────────────────────────────────────────────────────────────
+class Table:
+    """열 이름 → 같은 길이의 float 배열"""
+
+    def __init__(self, cols: dict):
+        self.cols = cols
+        self.n = len(cols["ts"]) if "ts" in cols else 0
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, name):
+        return self.cols[name]
+
+    @classmethod
+    def from_items(cls, items) -> "Table":
+        """예보 item iterable → 표. item 은 한 번만 훑고 값 변환은 서로 다른 문자열마다 한 번"""
+        rows = {}                                        # 'YYYYMMDDHHMM' → {항목: 원문}
+        for it in items:
+            cat = it["category"]
+            if cat in COLUMNS:
+                rows.setdefault(it["fcstDate"] + it["fcstTime"], {})[cat] = it["fcstValue"]
+        keys = sorted(rows)
+
+        # 날짜별 자정 epoch 은 서로 다른 날짜 수(2~4개)만큼만 계산
+        midnight = {}
+        ts = []
+        for k in keys:
+            d = k[:8]
+            if d not in midnight:
+                midnight[d] = dt.datetime.strptime(d, "%Y%m%d").replace(tzinfo=KST).timestamp()
+            ts.append(midnight[d] + int(k[8:10]) * 3600 + int(k[10:12]) * 60)
+
+        conv = {}
+        cols = {"ts": _array(ts)}
+        for c in COLUMNS:
+            vals = []
+            for k in keys:
+                raw = rows[k].get(c)
+                if raw is None:
+                    vals.append(NAN)
+                    continue
+                if raw not in conv:
+                    conv[raw] = to_number(raw)
+                vals.append(conv[raw])
+            cols[c] = _array(vals)
+        return cls(cols)
+
+    def to_json(self) -> dict:
+        return {k: [None if math.isnan(v) else v for v in map(float, col)]
+                for k, col in self.cols.items()}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Table":
+        return cls({k: _array(NAN if v is None else v for v in col) for k, col in data.items()})
+
+def frame(tables: list, now: dt.datetime) -> Table:
+    """지점별 표를 하나로 쌓고 파생 열 추가
+    loc: 지점 번호 · hour: KST 시(0–23) · ahead: now 부터 몇 시간 뒤 · dow: 요일(월=0)"""
+    now_ts = now.timestamp()
+    names = ("ts",) + COLUMNS
+    cols = {k: np.concatenate([t.cols[k] if k in t.cols else np.full(len(t), NAN)
+                               for t in tables] or [np.empty(0)]) for k in names}
+    cols["loc"] = np.concatenate([np.full(len(t), i, dtype=float)
+                                  for i, t in enumerate(tables)] or [np.empty(0)])
+    ts = cols["ts"]
+    local = ts + 9 * 3600                                # KST 기준 시각(초)
+    cols["hour"] = (local // 3600) % 24
+    cols["ahead"] = (ts - now_ts) / 3600
+    cols["dow"] = (local // 86400 + 3) % 7               # 1970-01-01 = 목요일
+    cols["day"] = local // 86400
+    return Table(cols)
+
+# ── 배열 연산 ──────────────────────────────────────────────────────
+def _bool(a):
+    return np.asarray(a, dtype=bool)
+
+def _and(a, b):
+    return np.logical_and(_bool(a), _bool(b))
+
+def _or(a, b):
+    return np.logical_or(_bool(a), _bool(b))
+
+def _between(x, lo, hi):
+    """lo ≤ x < hi"""
+    return _and(np.greater_equal(x, lo), np.less(x, hi))
+
+# 지점·날짜별 집계 → 각 행에 그 그룹 값을 되돌려 줌
+def _grouped(kind):
+    def fn(table, x):
+        n = len(table)
+        x = np.broadcast_to(np.asarray(x, dtype=float), (n,))
+        key = table["loc"] * 100000 + table["day"]
+        _, inv = np.unique(key, return_inverse=True)
+        if kind == "sum":
+            return np.bincount(inv, weights=np.nan_to_num(x))[inv]
+        out = np.full(inv.max() + 1 if n else 0, -np.inf if kind == "max" else np.inf)
+        (np.fmax if kind == "max" else np.fmin).at(out, inv, x)
+        out[np.isinf(out)] = NAN                         # 값이 하나도 없던 그룹
+        return out[inv]
+    return fn
+
+FUNCS = {
+    "between": lambda table, x, lo, hi: _between(x, lo, hi),
+    "abs":     lambda table, x: np.abs(x),
+    "daysum":  _grouped("sum"),
+    "daymax":  _grouped("max"),
+    "daymin":  _grouped("min"),
+}
+
+_BINOPS = {ast.Add: operator.add, ast.Sub: operator.sub,
+           ast.Mult: operator.mul, ast.Div: operator.truediv}
+_CMPOPS = {ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt,
+           ast.GtE: operator.ge, ast.Eq: operator.eq, ast.NotEq: operator.ne}
+
+# ── 규칙 식 컴파일 ──────────────────────────────────────────────────
+class RuleError(ValueError):
+    pass
+
+def compile_expr(src: str):
+    """규칙 식 → fn(table) (행마다 참/거짓인 배열). 허용되지 않은 문법이면 RuleError"""
+    try:
+        tree = ast.parse(src, mode="eval").body
+    except SyntaxError as e:
+        raise RuleError(f"규칙 식 문법 오류: {src!r} – {e.msg}") from None
+    return _compile(tree, src)
+
+def _compile(node, src):
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) \
+            and not isinstance(node.value, bool):
+        v = float(node.value)
+        return lambda t: v
+    if isinstance(node, ast.Name):
+        name = node.id
+        if name not in COLUMNS + DERIVED:
+            raise RuleError(f"알 수 없는 열 {name!r} ({src!r})")
+        return lambda t: t[name]
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINOPS:
+        op, l, r = _BINOPS[type(node.op)], _compile(node.left, src), _compile(node.right, src)
+        return lambda t: op(l(t), r(t))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        x = _compile(node.operand, src)
+        return lambda t: np.negative(x(t))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        x = _compile(node.operand, src)
+        return lambda t: np.logical_not(x(t))
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile(v, src) for v in node.values]
+        join = _and if isinstance(node.op, ast.And) else _or
+        def boolop(t):
+            acc = parts[0](t)
+            for p in parts[1:]:
+                acc = join(acc, p(t))
+            return acc
+        return boolop
+    if isinstance(node, ast.Compare) and all(type(o) in _CMPOPS for o in node.ops):
+        # 7 <= hour < 10 → (7 <= hour) and (hour < 10)
+        terms = [_compile(node.left, src)] + [_compile(c, src) for c in node.comparators]
+        ops = [_CMPOPS[type(o)] for o in node.ops]
+        def compare(t):
+            vals = [f(t) for f in terms]
+            acc = None
+            for op, a, b in zip(ops, vals, vals[1:]):
+                m = op(a, b)
+                acc = m if acc is None else _and(acc, m)
+            return acc
+        return compare
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) \
+            and node.func.id in FUNCS and not node.keywords:
+        fn = FUNCS[node.func.id]
+        args = [_compile(a, src) for a in node.args]
+        def call(t):
+            try:
+                return fn(t, *(a(t) for a in args))
+            except TypeError:
+                raise RuleError(f"{node.func.id}() 인자 개수 오류 ({src!r})") from None
+        return call
+    raise RuleError(f"허용되지 않은 식 {ast.dump(node)[:40]}… ({src!r})")
+
+# ── 규칙 ────────────────────────────────────────────────────────────
+_FIELD_RE = re.compile(r"\{(\w+)(?::([^{}]*))?\}")
+
+class Rule:
+    """name · when(식) · title(머리말) · show(행 문구 틀) · per("row" | "day")"""
+
+    def __init__(self, name, when, title, show, per="row"):
+        if per not in ("row", "day"):
+            raise RuleError(f"{name}: per 는 row / day")
+        self.name, self.when, self.title, self.show, self.per = name, when, title, show, per
+        self.test = compile_expr(when)
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Rule":
+        return cls(d["name"], d["when"], d.get("title", d["name"]),
+                   d.get("show", "{md} {hour:02.0f}시"), d.get("per", "row"))
+
+    def render(self, row: dict) -> str:
+        """show 틀의 {열} · {열:형식} 만 치환 (속성 접근 등은 허용 안 함)"""
+        def field(m):
+            v = row.get(m.group(1))
+            if v is None:
+                return m.group(0)
+            try:
+                return format(v, m.group(2) or "")
+            except (ValueError, TypeError):
+                return str(v)
+        return _FIELD_RE.sub(field, self.show)
+
+def _row(table: Table, i: int) -> dict:
+    row = {k: float(col[i]) for k, col in table.cols.items()}
+    ts = dt.datetime.fromtimestamp(row["ts"], KST)
+    row["md"] = f"{ts:%m월 %d일}"
+    row["end"] = (ts.hour + 3) % 24                      # 단기예보 문구용 3시간 구간 끝
+    return row
+
+def evaluate(rules: list, table: Table, n_locs: int) -> list[dict]:
+    """모든 규칙을 쌓인 표에 한 번씩 평가 → 지점별 {규칙 이름: [문구, …]} (규칙 순서 유지)"""
+    out = [dict() for _ in range(n_locs)]
+    for rule in rules:
+        mask = rule.test(table)
+        hits = np.flatnonzero(np.broadcast_to(_bool(mask), (len(table),)))
+        seen_days = set()
+        for i in hits:
+            loc, day = int(table["loc"][i]), int(table["day"][i])
+            if rule.per == "day":
+                if (loc, day) in seen_days:
+                    continue
+                seen_days.add((loc, day))
+            out[loc].setdefault(rule.name, []).append(rule.render(_row(table, i)))
+    return out
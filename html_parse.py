@@ -0,0 +1,26 @@
+# html_parse.py ─ 목록 페이지 파싱 공통
+# • 설치돼 있으면 lxml, 없으면 html.parser 를 백엔드로 사용
+# • make_soup(html, only=SoupStrainer(...)) 로 게시판 표/목록 영역만 트리로 만든다
+#   (페이지 전체 트리를 만들지 않아 파싱 시간·메모리 절약)
+# 환경
+#   BOT_HTML_PARSER   백엔드 강제 지정 (html.parser / lxml)
+#   BOT_HTML_RESTRICT 0 이면 영역 제한 끔 (비교·디버깅용)
+
+import os
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    _DEFAULT = "lxml"
+except ImportError:
+    _DEFAULT = "html.parser"
+
+PARSER   = os.getenv("BOT_HTML_PARSER", _DEFAULT)
+RESTRICT = os.getenv("BOT_HTML_RESTRICT", "1") != "0"
+
+# 자주 쓰는 영역
+ROWS = SoupStrainer("tr")                                   # 표 형태 게시판의 행
+
+def make_soup(html: str, only: SoupStrainer | None = None) -> BeautifulSoup:
+    """html → BeautifulSoup. only 가 있으면 그 영역만 파싱"""
+    return BeautifulSoup(html, PARSER, parse_only=only if RESTRICT else None)
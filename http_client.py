@@ -0,0 +1,237 @@
+# http_client.py ─ 모든 봇이 함께 쓰는 HTTP 클라이언트
+# • 호스트마다 keep-alive Session 하나 (TCP+TLS 연결 재사용)
+# • 호스트마다 동시 요청 수 상한(HOST_LIMIT) → 학과 서버에 몰아서 보내지 않음
+# • 연결 오류 · 429 · 5xx 는 지수 백오프 + 지터로 재시도
+# • 요청마다 (호스트, 메서드, 상태, 소요 시간, 바이트) 를 TIMINGS 에 기록
+#   (BOT_TRACE 가 있으면 tracing 에 "http" 구간으로도 기록)
+# • Deadline: 봇 main() 이 실행 예산 하나를 만들어 fetch → summarize → send 로 넘기면
+#   요청마다 남은 시간을 timeout 상한으로 쓰고, 다 쓰면 보내지 않고 DeadlineExceeded
+#   (requests.Timeout 의 하위 클래스라 기존 네트워크 오류 처리를 그대로 탐)
+# • hedged GET: 첫 시도가 이 호스트의 평소 응답 시간(p90)보다 늦으면
+#   타임아웃까지 기다리지 않고 같은 요청을 하나 더 보내 먼저 온 응답을 씀
+#   - 성공 기록이 HEDGE_SAMPLES 건 이상인 호스트만 (기록이 적으면 평소 시간을 모름)
+#   - 시간은 호스트 상한 자리를 얻은 뒤부터 잼 (자리 기다리는 요청은 hedge 안 함)
+#   - 두 번째 요청은 호스트 상한에 빈자리가 있을 때만 (바쁜 호스트에 더 보내지 않음)
+# 환경
+#   BOT_HOST_LIMIT   호스트별 동시 요청 수. 기본 4
+#   BOT_BUDGET_SEC   게시판 봇 한 번 실행 예산(초). 기본 80 (runner 의 RUN_BUDGET_SEC 보다 짧게)
+#   BOT_HEDGE        0 이면 hedged GET 끔
+
+import os, time, random, threading, requests
+import tracing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FutureTimeout
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+
+HOST_LIMIT   = int(os.getenv("BOT_HOST_LIMIT", "4"))
+RETRIES      = 2                           # 첫 시도 외 재시도 횟수
+BACKOFF      = 0.5                         # 첫 재시도 대기(초), 이후 2배씩
+BACKOFF_MAX  = 8.0
+RETRY_STATUS = (429, 500, 502, 503, 504)
+BUDGET_SEC   = float(os.getenv("BOT_BUDGET_SEC", "80"))
+MIN_TIMEOUT  = 0.2                         # 남은 시간이 이보다 적으면 요청하지 않음
+
+HEDGE        = os.getenv("BOT_HEDGE", "1") != "0"
+HEDGE_MIN    = 0.3                         # p90 기반 대기 시간 하한·상한
+HEDGE_MAX    = 5.0
+HEDGE_SAMPLES = 8                          # p90 을 믿기 위한 최소 성공 기록 수
+
+TIMINGS = deque(maxlen=2000)               # 최근 요청 기록 (dict)
+
+_lock = threading.Lock()
+_sessions = {}                             # host → Session
+_slots = {}                                # host → BoundedSemaphore
+_hedge_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="http-hedge")
+
+class DeadlineExceeded(requests.Timeout):
+    """실행 예산 소진 ─ 요청을 보내지 않았거나 남은 시간 안에 끝나지 않음"""
+
+class Deadline:
+    """실행 전체 시간 예산. Deadline(초) 하나를 만들어 단계별 함수에 넘긴다"""
+
+    def __init__(self, seconds: float = BUDGET_SEC):
+        self.at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() < MIN_TIMEOUT
+
+    def leave(self, seconds: float) -> "Deadline":
+        """뒤 단계(전송 등)를 위해 seconds 를 남겨 두는 하위 예산"""
+        sub = Deadline(0)
+        sub.at = self.at - seconds
+        return sub
+
+    def cap(self, timeout=None):
+        """timeout(초 또는 (연결, 읽기)) 을 남은 시간으로 자른 값. 남은 시간이 없으면 DeadlineExceeded"""
+        left = self.remaining()
+        if left < MIN_TIMEOUT:
+            raise DeadlineExceeded(f"budget exhausted ({left:.2f}s left)")
+        if timeout is None:
+            return left
+        if isinstance(timeout, tuple):
+            return tuple(min(t, left) for t in timeout)
+        return min(timeout, left)
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+def session_for(url: str) -> requests.Session:
+    """url 호스트의 공유 Session"""
+    host = _host(url)
+    with _lock:
+        s = _sessions.get(host)
+        if s is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(HOST_LIMIT, 1))
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            _sessions[host] = s
+        return s
+
+def _slot(host: str) -> threading.BoundedSemaphore:
+    with _lock:
+        sem = _slots.get(host)
+        if sem is None:
+            sem = _slots[host] = threading.BoundedSemaphore(HOST_LIMIT)
+        return sem
+
+def backoff_delay(attempt: int, base: float = BACKOFF) -> float:
+    """attempt번째 재시도 대기 시간: base·2^attempt 상한 BACKOFF_MAX, full jitter"""
+    return random.uniform(0, min(BACKOFF_MAX, base * (2 ** attempt)))
+
+def _record(host, method, status, sec, nbytes, hedged=False):
+    TIMINGS.append({"host": host, "method": method, "status": status, "sec": round(sec, 4),
+                    "bytes": nbytes, "hedged": hedged, "at": time.time()})
+    if tracing.enabled():
+        tracing.emit({"ts": round(time.time() - sec, 3), "span": "http", "host": host,
+                      "method": method, "status": status, "ms": round(sec * 1000, 2),
+                      "bytes": nbytes, "hedged": int(hedged),
+                      "thread": threading.current_thread().name})
+
+def hedge_delay(host: str) -> float:
+    """두 번째 요청을 보내기까지 기다릴 시간: 이 호스트 최근 성공 GET 의 p90.
+    기록이 HEDGE_SAMPLES 건 미만이면 0 (hedge 안 함)"""
+    secs = sorted(t["sec"] for t in list(TIMINGS)
+                  if t["host"] == host and t["method"] == "GET" and t["status"] == 200)
+    if len(secs) < HEDGE_SAMPLES:
+        return 0.0
+    return min(HEDGE_MAX, max(HEDGE_MIN, secs[int(len(secs) * 0.9)]))
+
+def _once(sess, method, url, host, kw, started=None) -> requests.Response:
+    with _slot(host):
+        if started:
+            started.set()                       # 자리를 얻음 → hedge 타이머 시작
+        return sess.request(method, url, **kw)
+
+def _held(sem, sess, method, url, kw) -> requests.Response:
+    """이미 잡은 호스트 자리(sem)로 보내고 끝나면 반납"""
+    try:
+        return sess.request(method, url, **kw)
+    finally:
+        sem.release()
+
+def _discard(f):
+    if not f.cancelled() and f.exception() is None:
+        f.result().close()
+
+def _send(sess, method, url, host, kw, hedge_after) -> tuple[requests.Response, bool]:
+    """(응답, 두 번째 요청이 이겼는지). 첫 요청이 호스트 자리를 얻은 뒤 hedge_after 초 안에
+    응답이 없고 호스트 상한에 빈자리가 있으면 하나 더 보냄"""
+    if not hedge_after:
+        return _once(sess, method, url, host, kw), False
+    started = threading.Event()
+    first = _hedge_pool.submit(_once, sess, method, url, host, kw, started)
+    while not started.wait(0.1) and not first.done():
+        pass
+    try:
+        return first.result(timeout=hedge_after), False
+    except FutureTimeout:
+        pass
+    sem = _slot(host)
+    if not sem.acquire(blocking=False):         # 빈자리 없음 → 첫 요청만 기다림
+        return first.result(), False
+    second = _hedge_pool.submit(_held, sem, sess, method, url, kw)
+    pending = [first, second]
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for f in done:
+            pending.remove(f)
+            if f.exception() is None:
+                for g in pending:                   # 늦은 쪽 응답은 받는 대로 닫기
+                    g.add_done_callback(_discard)
+                return f.result(), f is second
+            if not pending:
+                raise f.exception()
+    raise AssertionError("unreachable")
+
+def request(method: str, url: str, *, retries: int = RETRIES, backoff: float = BACKOFF,
+            retry_status=RETRY_STATUS, session: requests.Session | None = None,
+            deadline: Deadline | None = None, hedge: bool | None = None,
+            **kw) -> requests.Response:
+    """requests.request 와 같되 공유 Session·호스트 상한·재시도·기록을 거친다.
+    session 을 주면 (로그인 쿠키 등) 그 Session 으로 보낸다.
+    deadline 을 주면 timeout 을 남은 시간으로 자르고 재시도 대기도 그 안에서만.
+    hedge: None 이면 스트리밍이 아닌 GET 만 hedged 요청, False 면 끔.
+    마지막 시도까지 연결 오류면 예외를 그대로 올린다."""
+    host = _host(url)
+    sess = session or session_for(url)
+    timeout = kw.pop("timeout", None)
+    if hedge is None:
+        hedge = method == "GET" and not kw.get("stream")
+    for attempt in range(retries + 1):
+        kw["timeout"] = deadline.cap(timeout) if deadline else timeout
+        hedge_after = hedge_delay(host) if hedge and HEDGE else 0
+        t0 = time.monotonic()
+        try:
+            r, hedged = _send(sess, method, url, host, kw, hedge_after)
+        except requests.RequestException:
+            _record(host, method, None, time.monotonic() - t0, 0)
+            wait_s = backoff_delay(attempt, backoff)
+            if attempt >= retries or (deadline and deadline.remaining() <= wait_s + MIN_TIMEOUT):
+                raise
+            time.sleep(wait_s)
+            continue
+        nbytes = 0 if kw.get("stream") else len(r.content)
+        _record(host, method, r.status_code, time.monotonic() - t0, nbytes, hedged)
+        if r.status_code in retry_status and attempt < retries:
+            wait_s = backoff_delay(attempt, backoff)
+            if r.status_code == 429:
+                try:
+                    wait_s = max(wait_s, float(r.headers.get("Retry-After", "0")))
+                except ValueError:
+                    pass
+            if deadline and deadline.remaining() <= wait_s + MIN_TIMEOUT:
+                return r                            # 기다릴 시간이 없으면 마지막 응답 그대로
+            r.close()
+            time.sleep(wait_s)
+            continue
+        return r
+    return r
+
+def get(url: str, **kw) -> requests.Response:
+    return request("GET", url, **kw)
+
+def post(url: str, **kw) -> requests.Response:
+    return request("POST", url, **kw)
+
+def summary() -> dict[str, dict]:
+    """호스트별 요청 수 · 실패 수 · 중앙값/최대 소요 시간 · 바이트 · hedged 로 이긴 수"""
+    by_host = {}
+    for t in list(TIMINGS):
+        by_host.setdefault(t["host"], []).append(t)
+    out = {}
+    for host, ts in by_host.items():
+        secs = sorted(t["sec"] for t in ts)
+        out[host] = {
+            "requests": len(ts),
+            "errors": sum(1 for t in ts if t["status"] is None or t["status"] >= 400),
+            "p50": secs[len(secs) // 2],
+            "max": secs[-1],
+            "bytes": sum(t["bytes"] for t in ts),
+            "hedged": sum(1 for t in ts if t.get("hedged")),
+        }
+    return out
@@ -2,20 +2,24 @@
 # 전자정보공학부(학부) 공지 봇 – 부트스트랩 포함 경량판
 # 역할
 #   1) last_infocom_id.txt 가 없거나 0, 잘못된 값이면 자동 부트스트랩:
-#      상세페이지를 직접 조회하여 최신 idx를 지수탐색+이분탐색으로 찾고 저장
-#   2) 이후에는 마지막 idx 이후의 새 글만 빠르게 전송
+#      상세페이지를 직접 조회하여 최신 idx를 병렬 사다리탐색+k분탐색으로 찾고 저장
+#   2) 이후에는 마지막 idx 이후의 새 글만 빠르게 전송 (다음 idx 여러 개를 동시에 미리 조회)
 # 특징
 #   목록 페이지를 보지 않으므로 목록 타임아웃에 영향 받지 않음
 #   전체 실행 시간 예산을 두어 액션이 오래 붙잡히지 않음
+#   worker/https/http 경로를 시간차로 경쟁시켜 먼저 성공한 쪽을 쓰고, 그 경로를 기억
 # 환경
 #   DISCORD_WEBHOOK_INFOCOM    필수
 #   INFOCOM_PROXY_URL          선택. 예: https://xxx.workers.dev/?url=
 # 상태파일
-#   last_infocom_id.txt
+#   state.db                   마지막 idx (board = infocom)
+#   cache/infocom_probe.json   idx별 존재·제목 캐시, 확인된 최신 idx 상한, 마지막 성공 경로
 
-import os, sys, time, re, json, requests, traceback
+import os, sys, time, re, json, codecs, threading, requests, traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from bs4 import BeautifulSoup
 from urllib.parse import quote
+import state, delivery, http_client, tracing, search_index
 
 # 디스코드 웹훅 로드
 WEBHOOK = os.getenv("DISCORD_WEBHOOK_INFOCOM")
@@ -24,7 +28,7 @@ if not WEBHOOK:
         with open("config.json", encoding="utf-8") as f:
             WEBHOOK = json.load(f)["DISCORD_WEBHOOK_INFOCOM"]
     except Exception:
-        sys.exit("DISCORD_WEBHOOK_INFOCOM 시크릿 또는 config.json 누락")
+        pass                                    # main()에서 종료
 
 # 선택 프록시 워커. 예: https://<subdomain>.workers.dev/?url=
 WORKER = os.getenv("INFOCOM_PROXY_URL", "").rstrip("/")
@@ -35,12 +39,21 @@ VIEW_HTTPS = "https://infocom.ssu.ac.kr/kor/notice/undergraduate.php?idx={idx}&m
 # 요청 설정
 TIMEOUT = (5, 8)        # 연결 5초, 본문 8초
 RETRY   = 1             # 경로별 재시도 횟수
-SLEEP   = 0.6           # 재시도 간격
+SLEEP   = 0.6           # 재시도 기본 간격 (지수 백오프 + 지터)
+HEDGE_DELAY = 1.5       # 앞 경로가 이 시간 안에 답이 없으면 다음 경로도 동시 출발
 BUDGET_SEC = 70         # 전체 실행 상한
+STREAM_CHUNK = 8192     # 상세페이지 스트리밍 읽기 단위
 
 # 한 번 실행에서 확인할 최대 신규 글 수
 SCAN_MAX = 8
 
+# 동시 조회 수 (부트스트랩 k분 탐색의 k)
+PROBE_K = 8
+_route_pool = None
+# 신규 글 스캔 때 한 번에 미리 조회할 idx 수
+SCAN_WINDOW = PROBE_K
+_pool = None
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
@@ -49,44 +62,129 @@ HEADERS = {
     "Connection": "keep-alive",
 }
 
-ID_FILE = "last_infocom_id.txt"
+BOARD = "infocom"       # state 키
+
+# idx 조회 캐시: 존재하는 글은 계속, 비존재는 TTL 동안만 기억
+PROBE_CACHE = os.path.join(os.getenv("BOT_CACHE_DIR", "cache"), "infocom_probe.json")
+MISS_TTL   = 300        # 상한 위 비존재(아직 안 올라온 글) 유지 시간
+HOLE_TTL   = 86400      # 상한 아래 비존재(삭제된 글) 유지 시간
+PROBE_CACHE_MAX = 4000  # 저장할 최대 idx 수 (큰 idx 우선 보존)
+_cache = None
+_cache_lock = threading.Lock()
 
 # 마지막 idx 읽기
 def read_last() -> int | None:
     try:
-        return int(open(ID_FILE, encoding="utf-8").read().strip())
+        return int(state.get_last(BOARD))
     except Exception:
         return None
 
 # 마지막 idx 기록
 def write_last(idx: int):
-    with open(ID_FILE, "w", encoding="utf-8") as f:
-        f.write(str(idx))
+    state.set_last(BOARD, str(idx))
 
-# 워커 경유 GET
-def fetch_via_worker(url: str) -> requests.Response:
+# 제목 판정에 필요한 앞부분이 다 왔는지 확인하는 패턴
+NOT_FOUND_MARKS = ("없는 게시물", "잘못된 접근")
+VIEW_RE  = re.compile(r"""class=["'][^"']*\b(?:board_view|view)\b""")
+TITLE_RE = re.compile(r"""<(\w+)[^>]*class=["'][^"']*\btitle\b[^"']*["'][^>]*>""")
+
+# 워커 경유 GET (본문은 스트리밍)
+def fetch_via_worker(url: str, deadline=None) -> requests.Response:
     if not WORKER:
         raise RuntimeError("no worker")
     proxied = f"{WORKER}?url={quote(url, safe='')}"
-    return requests.get(proxied, headers=HEADERS, timeout=TIMEOUT)
+    return http_client.get(proxied, headers=HEADERS, timeout=TIMEOUT, stream=True,
+                           retries=RETRY - 1, backoff=SLEEP, deadline=deadline)
 
-# 단일 URL 가져오기. 성공 시 HTML 문자열 반환, 실패 시 None
-def get_html(url_https: str) -> str | None:
+# 앞부분만으로 parse_title / 비존재 판정이 전체 페이지와 같게 나오는지
+def head_complete(html: str) -> bool:
+    if any(m in html for m in NOT_FOUND_MARKS):
+        return True
+    v = VIEW_RE.search(html)
+    if not v:
+        return False
+    t = TITLE_RE.search(html, v.end())
+    if not t or f"</{t.group(1).lower()}" not in html[t.end():].lower():
+        return False
+    # 패턴은 근사치이므로 실제 선택자로 한 번 더 확인
+    soup = BeautifulSoup(html, "html.parser")
+    el = soup.select_one(".board_view .title") or soup.select_one(".view .title")
+    return bool(el and el.get_text(strip=True))
+
+# 본문을 조금씩 읽다가 제목 또는 비존재 문구가 도착하면 중단하고 앞부분만 반환
+def read_head(r: requests.Response) -> str:
+    try:
+        dec = codecs.getincrementaldecoder(r.encoding or "utf-8")(errors="replace")
+    except LookupError:
+        dec = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    parts = []
+    try:
+        for chunk in r.iter_content(STREAM_CHUNK):
+            parts.append(dec.decode(chunk))
+            html = "".join(parts)
+            if head_complete(html):
+                return html
+        parts.append(dec.decode(b"", final=True))
+        return "".join(parts)
+    finally:
+        r.close()
+
+# 경로 하나로 가져오기. 경로별 RETRY회 시도(http_client), 실패 시 None
+def try_route(label: str, url: str, deadline=None) -> str | None:
+    try:
+        if label == "worker":
+            r = fetch_via_worker(url, deadline)
+        else:
+            r = http_client.get(url, headers=HEADERS, timeout=TIMEOUT, stream=True,
+                                retries=RETRY - 1, backoff=SLEEP, deadline=deadline)
+        if r.status_code == 200:
+            html = read_head(r)
+            if html.strip():
+                return html
+        else:
+            r.close()
+    except Exception:
+        pass
+    return None
+
+# 시도할 경로 목록. 지난번 성공한 경로를 맨 앞에
+def route_order(url_https: str) -> list[tuple[str, str]]:
     routes = []
     if WORKER:
         routes.append(("worker", url_https))
     routes.append(("https", url_https))
     routes.append(("http", url_https.replace("https://", "http://", 1)))
+    pref = load_probe_cache().get("route")
+    routes.sort(key=lambda lr: lr[0] != pref)
+    return routes
 
-    for label, url in routes:
-        for _ in range(RETRY):
-            try:
-                r = fetch_via_worker(url) if label == "worker" else requests.get(url, headers=HEADERS, timeout=TIMEOUT)
-                if r.status_code == 200 and r.text.strip():
-                    return r.text
-            except Exception:
-                pass
-            time.sleep(SLEEP)
+# 단일 URL 가져오기. 성공 시 HTML 문자열 반환, 실패 시 None
+# 앞 경로가 HEDGE_DELAY 안에 답이 없거나 실패하면 다음 경로를 함께 출발시키고
+# 가장 먼저 200을 준 경로를 쓴다 (hedged request)
+def get_html(url_https: str, deadline=None) -> str | None:
+    global _route_pool
+    if _route_pool is None:
+        _route_pool = ThreadPoolExecutor(max_workers=PROBE_K * 3, thread_name_prefix="infocom-route")
+    routes = route_order(url_https)
+    pending = {}
+    nxt = 0
+    while nxt < len(routes) or pending:
+        timeout = None
+        if nxt < len(routes):
+            label, url = routes[nxt]
+            nxt += 1
+            pending[_route_pool.submit(try_route, label, url, deadline)] = label
+            if nxt < len(routes):
+                timeout = HEDGE_DELAY
+        done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for f in done:
+            label = pending.pop(f)
+            html = f.result()
+            if html:
+                load_probe_cache()["route"] = label      # 다음 조회·다음 실행도 이 경로부터
+                for g in pending:
+                    g.cancel()
+                return html
     return None
 
 # HTML에서 제목 추출
@@ -109,83 +207,163 @@ def parse_title(html: str) -> str | None:
             return ln.strip()[:120]
     return None
 
-# 상세페이지 존재여부와 제목
-def post_exists_and_title(idx: int) -> tuple[bool, str | None]:
-    html = get_html(VIEW_HTTPS.format(idx=idx))
+# 상세페이지 존재여부와 제목. 네트워크 실패면 None
+def fetch_post(idx: int, deadline=None) -> tuple[bool, str | None] | None:
+    with tracing.span("fetch", BOARD, idx=idx) as sp:
+        html = get_html(VIEW_HTTPS.format(idx=idx), deadline)
+        sp["chars"] = len(html) if html else 0
     if not html:
-        return False, None
+        return None
     # 비존재 안내 문구 필터
-    if "없는 게시물" in html or "잘못된 접근" in html:
+    if any(m in html for m in NOT_FOUND_MARKS):
         return False, None
-    title = parse_title(html)
+    with tracing.span("parse", BOARD, idx=idx):
+        title = parse_title(html)
     return (title is not None), title
 
-# 부트스트랩: 최신 idx 자동 탐색
-def bootstrap_find_latest(start_time: float) -> int | None:
-    # 1단계 지수 탐색: 존재하는 최대 영역 상한을 찾기 위해 hi를 2048부터 2배씩 증가
-    low_exist = 0
-    hi = 2048
-    while time.monotonic() - start_time < BUDGET_SEC * 0.6 and hi <= 131072:
-        ok, _ = post_exists_and_title(hi)
-        if ok:
-            low_exist = hi
-            hi *= 2
-        else:
-            break
-
-    if low_exist == 0:
-        # 혹시 아주 낮은 구간에만 글이 있는 특수 케이스 대비: 1, 2, 4, 8..256 빠른 스캔
-        probe = 1
-        while probe <= 256 and time.monotonic() - start_time < BUDGET_SEC * 0.6:
-            ok, _ = post_exists_and_title(probe)
-            if ok:
-                low_exist = probe
-                hi = max(512, probe * 2)
-                break
-            probe *= 2
+# 조회 캐시 로드 (실행당 한 번)
+def load_probe_cache() -> dict:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            try:
+                with open(PROBE_CACHE, encoding="utf-8") as f:
+                    _cache = json.load(f)
+            except Exception:
+                _cache = {}
+            _cache.setdefault("upper", 0)
+            _cache.setdefault("idx", {})
+        return _cache
+
+# 조회 캐시 저장
+def save_probe_cache():
+    if _cache is None:
+        return
+    with _cache_lock:
+        idx = _cache["idx"]
+        if len(idx) > PROBE_CACHE_MAX:
+            keep = sorted(idx, key=int)[-PROBE_CACHE_MAX:]
+            _cache["idx"] = {k: idx[k] for k in keep}
+        data = json.dumps(_cache, ensure_ascii=False)
+    os.makedirs(os.path.dirname(PROBE_CACHE) or ".", exist_ok=True)
+    with open(PROBE_CACHE + ".tmp", "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(PROBE_CACHE + ".tmp", PROBE_CACHE)
 
-    if low_exist == 0:
-        print("부트스트랩 실패: 존재하는 게시글 구간을 찾지 못했습니다")
+# 캐시된 조회 결과. 없거나 만료면 None
+def cached_probe(idx: int) -> tuple[bool, str | None] | None:
+    c = load_probe_cache()
+    ent = c["idx"].get(str(idx))
+    if not ent:
         return None
+    ok, title, ts = ent
+    if ok:
+        return True, title
+    ttl = HOLE_TTL if idx <= c["upper"] else MISS_TTL
+    return (False, None) if time.time() - ts < ttl else None
 
-    # 2단계 이분 탐색: [low_exist, hi) 범위에서 존재하는 최대 idx 찾기
-    # hi는 현재 '존재하지 않음'이거나 충분히 큰 값
-    if hi <= low_exist:
-        hi = low_exist + 1
-    # hi가 아직 존재한다면 hi를 늘려 비존재 상한을 만든다
-    while time.monotonic() - start_time < BUDGET_SEC * 0.8:
-        ok, _ = post_exists_and_title(hi)
-        if not ok:
-            break
-        low_exist = hi
-        hi *= 2
-        if hi > 131072:
-            break
-
-    lo, hi = low_exist, max(low_exist + 1, hi)
-    while lo + 1 < hi and time.monotonic() - start_time < BUDGET_SEC * 0.95:
-        mid = (lo + hi) // 2
-        ok, _ = post_exists_and_title(mid)
-        if ok:
-            lo = mid
-        else:
-            hi = mid
+# 상세페이지 존재여부와 제목 (캐시 우선)
+def post_exists_and_title(idx: int, deadline=None) -> tuple[bool, str | None]:
+    hit = cached_probe(idx)
+    if hit is not None:
+        return hit
+    res = fetch_post(idx, deadline)
+    if res is None:
+        return False, None          # 네트워크 실패는 캐시하지 않음
+    c = load_probe_cache()
+    with _cache_lock:
+        c["idx"][str(idx)] = [res[0], res[1], time.time()]
+        if res[0] and idx > c["upper"]:
+            c["upper"] = idx
+    return res
+
+# 여러 idx를 동시에 조회. deadline(http_client.Deadline) 안에 끝난 결과만 {idx: (존재, 제목)}
+# 요청마다 timeout 도 남은 시간으로 잘림
+def probe_many(idxs, deadline) -> dict[int, tuple[bool, str | None]]:
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=PROBE_K, thread_name_prefix="infocom-probe")
+    futs = {_pool.submit(post_exists_and_title, i, deadline): i for i in idxs}
+    done, not_done = wait(futs, timeout=deadline.remaining())
+    for f in not_done:
+        f.cancel()
+    out = {}
+    for f in done:
+        try:
+            out[futs[f]] = f.result()
+        except Exception:
+            out[futs[f]] = (False, None)
+    return out
+
+# 부트스트랩: 최신 idx 자동 탐색 (병렬 k분 탐색)
+def bootstrap_find_latest(deadline) -> int | None:
+    ladder_deadline = deadline.leave(BUDGET_SEC * 0.4)    # 사다리 단계는 예산의 60 %까지
+    upper = load_probe_cache()["upper"]
+    if upper and post_exists_and_title(upper, deadline)[0]:
+        # 0단계 캐시에 확인된 상한이 있으면 그 위쪽만 사다리로 조회
+        ladder = [upper + (64 << j) for j in range(8)]
+    else:
+        # 1단계 상한 사다리: 2048, 4096, … 131072 를 한 번에 조회해 존재하는 최대 구간을 찾는다
+        upper = 0
+        ladder = [2048 << j for j in range(7)]
+    res = probe_many(ladder, ladder_deadline)
+    hits = [i for i in ladder if res.get(i, (False,))[0]]
+    if hits or upper:
+        lo = hits[-1] if hits else upper
+        # 사다리 다음 값은 '존재하지 않음'. 꼭대기까지 존재하면 2배를 상한으로 둔다
+        hi = next((i for i in ladder if i > lo), lo * 2)
+    else:
+        # 혹시 아주 낮은 구간에만 글이 있는 특수 케이스 대비: 1, 2, 4 … 256 동시 조회
+        low = [1 << j for j in range(9)]
+        res = probe_many(low, ladder_deadline)
+        hits = [i for i in low if res.get(i, (False,))[0]]
+        if not hits:
+            print("부트스트랩 실패: 존재하는 게시글 구간을 찾지 못했습니다")
+            return None
+        lo, hi = hits[-1], ladder[0]
+
+    # 2단계 k분 탐색: (lo, hi) 구간에 k-1개 점을 동시에 조회해 한 라운드에 log2(k) 비트씩 좁힌다
+    # lo는 '존재', hi는 '존재하지 않음'
+    rounds = 0
+    deadline = deadline.leave(BUDGET_SEC * 0.05)
+    while lo + 1 < hi and not deadline.expired():
+        pts = sorted({lo + (hi - lo) * i // PROBE_K for i in range(1, PROBE_K)} - {lo, hi})
+        if not pts:
+            pts = list(range(lo + 1, hi))
+        res = probe_many(pts, deadline)
+        rounds += 1
+        ok_pts = [i for i in pts if res.get(i, (False,))[0]]
+        if ok_pts:
+            lo = ok_pts[-1]
+        # 응답이 온 '비존재' 점 중 lo보다 큰 가장 작은 값이 새 상한
+        hi = min([i for i in pts if i > lo and i in res and not res[i][0]] + [hi])
 
     # lo가 최신 존재 idx
-    print(f"부트스트랩 완료: 최신 idx 추정 {lo}")
+    print(f"부트스트랩 완료: 최신 idx 추정 {lo} ({rounds}라운드)")
     return lo
 
 # 디스코드 전송
-def send(msg: str):
-    requests.post(WEBHOOK, json={"content": msg}, timeout=10)
+# 새 글 [(idx, 제목, 링크)]을 묶어 전송. 확인된 글 수 반환
+def send(posts, deadline=None) -> int:
+    embeds = [delivery.embed(title, link) for _, title, link in posts]
+    return delivery.deliver(WEBHOOK, "전자정보공학부 새 공지", embeds, deadline)
 
 def main():
-    start = time.monotonic()
+    if not WEBHOOK:
+        sys.exit("DISCORD_WEBHOOK_INFOCOM 시크릿 또는 config.json 누락")
+    try:
+        run()
+    finally:
+        save_probe_cache()
+
+def run():
+    deadline = http_client.Deadline(BUDGET_SEC)
     last_id = read_last()
 
-    # 부트스트랩 조건: last 파일이 없거나 0 이하
+    # 부트스트랩 조건: 저장된 idx가 없거나 0 이하
     if not last_id or last_id <= 0:
-        latest = bootstrap_find_latest(start)
+        with tracing.span("detect", BOARD, what="bootstrap") as sp:
+            latest = sp["latest"] = bootstrap_find_latest(deadline)
         if latest is None:
             print("초기화 실패. 다음 주기에 재시도")
             return
@@ -193,36 +371,62 @@ def main():
         print("최신 idx로 초기화 완료. 이번 주기에는 알림을 보내지 않습니다")
         return
 
-    # 신규 글 스캔
-    found = []
-    idx = last_id + 1
-    # 연속 비존재가 몇 번 나오면 중단
-    gaps = 0
-    while len(found) < SCAN_MAX and time.monotonic() - start < BUDGET_SEC:
-        ok, title = post_exists_and_title(idx)
-        if not ok:
-            gaps += 1
-            if gaps >= 3:
-                break
-            idx += 1
-            continue
-        found.append((idx, title or "제목 없음", VIEW_HTTPS.format(idx=idx)))
-        gaps = 0
-        idx += 1
-
+    with tracing.span("detect", BOARD, start=last_id + 1) as sp:
+        # 스캔은 전송할 시간을 조금 남기고 멈춤
+        found = scan_new(last_id, deadline.leave(BUDGET_SEC * 0.1))
+        sp["new"] = len(found)
+    search_index.add(BOARD, found)
     if not found:
         print("새 공지 없음")
         return
 
     # 오래된 것부터 전송
-    for i, title, link in found:
-        send(f"전자정보공학부 새 공지\n{title}\n{link}")
-        write_last(i)
+    with tracing.span("send", BOARD, posts=len(found)) as sp:
+        sent = sp["sent"] = send(found, deadline)
+    prev = last_id
+    for i, title, link in found[:sent]:
+        # 다른 실행이 먼저 갱신했으면(CAS 실패) 중복 기록을 막기 위해 중단
+        if not state.advance(BOARD, str(prev), str(i), title, link):
+            print("상태가 다른 실행에서 갱신됨. 중단")
+            return
+        prev = i
         print(f"전송 완료: {i} {title}")
+    if sent < len(found):
+        print("전송 실패. 다음 주기에 재시도")
+
+# 신규 글 스캔: 다음 SCAN_WINDOW개 idx를 한 번에 미리 조회하고 순서대로 판정
+# 새 글 [(idx, 제목, 링크)] 오래된 것부터
+def scan_new(last_id: int, deadline) -> list:
+    found = []
+    idx = last_id + 1
+    # 연속 비존재가 몇 번 나오면 중단
+    gaps = 0
+    stop = False
+    while not stop and len(found) < SCAN_MAX and not deadline.expired():
+        window = list(range(idx, idx + SCAN_WINDOW))
+        res = probe_many(window, deadline)
+        for i in window:
+            if i not in res:
+                # 예산 안에 응답이 없으면 여기서 멈추고 다음 주기에 이어서 확인
+                stop = True
+                break
+            ok, title = res[i]
+            if not ok:
+                gaps += 1
+                if gaps >= 3:
+                    stop = True
+                    break
+                continue
+            found.append((i, title or "제목 없음", VIEW_HTTPS.format(idx=i)))
+            gaps = 0
+            if len(found) >= SCAN_MAX:
+                break
+        idx = window[-1] + 1
+    return found
 
 if __name__ == "__main__":
     try:
-        main()
+        tracing.run(main, BOARD)
     except Exception:
         traceback.print_exc()
         print("예상치 못한 오류. 다음 주기에서 재시도")
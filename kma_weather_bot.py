@@ -1,116 +1,302 @@
 # kma_weather_bot.py ─ 기상청 동네예보 우산 알림 (POP ≥ 60 % and PCP ≥ 1 mm)
 # • 24 h 안에 ‘강수확률 ≥ 60 %, 강수량 ≥ 1 mm’ 조건을 만족하는
 #   3 시간 구간(예보 단위)만 골라 디스코드로 상세 전송
+# • 발표(base_date, base_time)·격자별 예보를 cache/kma/ 에 저장
+#   → 다음 발표 전까지 재실행은 API 호출·파싱 없이 재사용,
+#     최신 발표분이 아직 안 올라왔으면 직전 발표분 사용
+# • 여러 지점(격자 + 웹훅) 지원: 격자별로 모든 페이지를 동시에 받아
+#   페이지 단위로 바로 집계 (응답 전체를 모아 두지 않음)
+# • 판정은 forecast_rules 규칙 식으로 (기본: 비. 폭염·강풍·출근길 비 프리셋, 직접 작성 가능)
+#   모든 지점 예보를 한 표로 쌓아 규칙마다 한 번에 평가
 # • 필요 Secrets
 #     KMA_API_KEY              # 기상청 Encoding 인증키
-#     DISCORD_WEBHOOK_UMBRELLA  # 우산 알림용 Discord Webhook
+#     DISCORD_WEBHOOK_UMBRELLA  # 우산 알림용 Discord Webhook (기본 지점)
+#     KMA_LOCATIONS            # 선택. 지점 목록 JSON, 예:
+#       [{"name": "숭실대", "nx": 60, "ny": 127, "webhook": "https://discord.com/api/webhooks/…"},
+#        {"name": "집", "nx": 61, "ny": 125, "webhook_env": "DISCORD_WEBHOOK_HOME"}]
+#     KMA_RULES                # 선택. 규칙 목록 JSON, 예:
+#       ["rain", "heat", {"name": "cold", "title": "🥶 **한파**", "per": "day",
+#                         "when": "daymin(TMP) <= -10 and TMP == daymin(TMP)", "show": "{md} {TMP:.0f}℃"}]
 # --------------------------------------------------------------------
-import os, sys, requests, datetime as dt
+import os, sys, json, math, datetime as dt
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlencode
+import delivery, http_client, tracing, forecast_rules
 
 WEBHOOK = os.getenv("DISCORD_WEBHOOK_UMBRELLA")
 SERVICE_KEY = os.getenv("KMA_API_KEY")
+LOCATIONS_JSON = os.getenv("KMA_LOCATIONS", "")
+RULES_JSON     = os.getenv("KMA_RULES", "")
 
-# 서울 종로구 격자 좌표
+# 기본 지점: 서울 종로구 격자 좌표
 NX, NY = 60, 127
 
+API_URL   = "http://apis.data.go.kr/1360000/VilageFcstInfoService_2.0/getVilageFcst"
+PAGE_ROWS = 500          # 페이지당 item 수
+WORKERS   = 4            # 지점·페이지 동시 요청 수 (호스트 상한은 http_client 가 따로 적용)
+
 POP_THRESHOLD  = 60      # 강수확률 ≥ 60 %
 PCP_THRESHOLD  = 1.0     # 시간당 강수량 ≥ 1 mm
 HOURS_AHEAD    = 24      # 앞으로 24 시간만 검사
 
 KST = dt.timezone(dt.timedelta(hours=9))
 
+BASE_HOURS    = (2, 5, 8, 11, 14, 17, 20, 23)       # 단기예보 발표 시각
+PUBLISH_DELAY = dt.timedelta(minutes=10)           # 발표 시각 → API 반영까지 여유
+CACHE_DIR     = os.path.join(os.getenv("BOT_CACHE_DIR", "cache"), "kma")
+CACHE_KEEP    = dt.timedelta(days=1)               # 이보다 오래된 발표분 캐시는 삭제
+
 
 # ── base_date / base_time 계산 (2,5,8,11,14,17,20,23) ────────────────
+def base_slots(now=None, n=3):
+    """now 이전의 발표 시각 n개 (최신 → 과거)"""
+    now = now or dt.datetime.now(KST)
+    t = now.replace(minute=0, second=0, microsecond=0)
+    slots = []
+    while len(slots) < n:
+        if t.hour in BASE_HOURS:
+            slots.append(t)
+        t -= dt.timedelta(hours=1)
+    return slots
+
 def latest_base():
-    now = dt.datetime.now(KST)
-    for h in (23, 20, 17, 14, 11, 8, 5, 2):
-        if now.hour >= h:
-            return now.strftime("%Y%m%d"), f"{h:02}00"
-    yest = now - dt.timedelta(days=1)
-    return yest.strftime("%Y%m%d"), "2300"
+    base = base_slots(n=1)[0]
+    return base.strftime("%Y%m%d"), base.strftime("%H%M")
 
 
 # ── 기상청 API 호출 ────────────────────────────────────────────────
-def fetch_items():
-    base_date, base_time = latest_base()
+_page_pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="kma-page")
+
+def fetch_page(base_date, base_time, nx, ny, page, deadline=None):
+    """응답 body 한 페이지 (items · totalCount). 아직 발표 전(NO_DATA)이면 None"""
     params = {
         "dataType": "JSON",
-        "numOfRows": 500,
-        "pageNo": 1,
+        "numOfRows": PAGE_ROWS,
+        "pageNo": page,
         "base_date": base_date,
         "base_time": base_time,
-        "nx": NX,
-        "ny": NY,
+        "nx": nx,
+        "ny": ny,
     }
-    url = ("http://apis.data.go.kr/1360000/VilageFcstInfoService_2.0/getVilageFcst"
-           f"?serviceKey={SERVICE_KEY}&{urlencode(params)}")
-    r = requests.get(url, timeout=15)
+    url = f"{API_URL}?serviceKey={SERVICE_KEY}&{urlencode(params)}"
+    r = http_client.get(url, timeout=15, deadline=deadline)
     r.raise_for_status()
-    return r.json()["response"]["body"]["items"]["item"]
+    resp = r.json()["response"]
+    if resp["header"]["resultCode"] != "00":              # 03 = NO_DATA
+        return None
+    body = resp["body"]
+    return body if body["items"] and body["items"]["item"] else None
+
+def fetch_items(base_date, base_time, nx=NX, ny=NY, deadline=None):
+    """발표분 예보 item 전체를 페이지 도착 순서대로 내보내는 iterator.
+    첫 페이지의 totalCount 로 나머지 페이지 수를 정해 동시에 요청.
+    아직 발표 전(NO_DATA)이면 None"""
+    first = fetch_page(base_date, base_time, nx, ny, 1, deadline)
+    if first is None:
+        return None
+    pages = math.ceil(int(first.get("totalCount") or 0) / PAGE_ROWS)
+    futs = {_page_pool.submit(fetch_page, base_date, base_time, nx, ny, p, deadline)
+            for p in range(2, pages + 1)}
+
+    def items():
+        yield from first["items"]["item"]
+        first.clear()                                     # 다 넘긴 페이지는 바로 해제
+        for f in as_completed(futs):
+            futs.discard(f)                               # 꺼낸 페이지는 future 째로 놓아줌
+            body = f.result()
+            del f
+            if body is None:
+                raise RuntimeError("예보 페이지 누락")
+            yield from body["items"]["item"]
+            del body
+    return items()
+
+
+# ── 발표분 캐시 (base_date, base_time, nx, ny) → 파싱된 예보 ──────────
+def cache_path(base, nx, ny):
+    return os.path.join(CACHE_DIR, f"{base:%Y%m%d_%H%M}_{nx}_{ny}.json")
+
+def load_cached(base, nx, ny):
+    """발표분 예보는 바뀌지 않으므로 있으면 그대로. 최신 여부는 get_forecasts 가 발표 시각으로 판단"""
+    try:
+        with open(cache_path(base, nx, ny), encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception:
+        return None
+    try:
+        return forecast_rules.Table.from_json(data["table"])
+    except (KeyError, TypeError):
+        return None                                       # 예전 형식 → 다시 조회
+
+def save_cached(base, nx, ny, forecasts):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    data = {
+        "base_date": f"{base:%Y%m%d}", "base_time": f"{base:%H%M}", "nx": nx, "ny": ny,
+        "table": forecasts.to_json(),
+    }
+    path = cache_path(base, nx, ny)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+def prune_cache(now):
+    try:
+        names = os.listdir(CACHE_DIR)
+    except FileNotFoundError:
+        return
+    for name in names:
+        try:
+            base = dt.datetime.strptime(name[:13], "%Y%m%d_%H%M").replace(tzinfo=KST)
+        except ValueError:
+            continue
+        if base < now - CACHE_KEEP:
+            os.remove(os.path.join(CACHE_DIR, name))
+
+def get_forecasts(nx=NX, ny=NY, now=None, deadline=None):
+    """가장 최신 발표분의 예보 → (발표 시각, 예보 표, 캐시 사용 여부)
+    최신 발표분이 아직 반영 전이면 직전 발표분으로. 모두 실패하면 (None, None, False)"""
+    now = now or dt.datetime.now(KST)
+    for base in base_slots(now):
+        cached = load_cached(base, nx, ny)
+        if cached is not None:
+            return base, cached, True
+        if now < base + PUBLISH_DELAY:
+            continue                                      # 반영 전 → 직전 발표분
+        items = fetch_items(f"{base:%Y%m%d}", f"{base:%H%M}", nx, ny, deadline)
+        if items is None:
+            print(f"⏳  {base:%m-%d %H:%M} 발표분 미반영 → 직전 발표분 사용")
+            continue
+        with tracing.span("parse", "kma", nx=nx, ny=ny):
+            forecasts = parse_forecast(items)             # 페이지가 오는 대로 집계
+        save_cached(base, nx, ny, forecasts)
+        prune_cache(now)
+        return base, forecasts, False
+    return None, None, False
 
 
-# ── 예보 item → (timestamp, POP, PCP_mm) 리스트로 변환 ─────────────
+# ── 예보 item → 열 표 (ts · POP · PCP · TMP · SKY · WSD …) ────────────
 def parse_forecast(items):
-    bucket = {}
-    for item in items:
-        key = item["fcstDate"] + item["fcstTime"]          # 'YYYYMMDDHHMM'
-        bucket.setdefault(key, {})[item["category"]] = item["fcstValue"]
-
-    forecasts = []
-    for k, v in bucket.items():
-        ts = dt.datetime.strptime(k, "%Y%m%d%H%M").replace(tzinfo=KST)
-        pop = int(v.get("POP", "0"))
-        pcp_raw = v.get("PCP", "0")
-        if pcp_raw in ("", "강수없음"):
-            pcp = 0.0
-        elif "mm미만" in pcp_raw:
-            pcp = 0.5
-        else:
-            pcp = float(pcp_raw.replace("mm", ""))
-        forecasts.append((ts, pop, pcp))
-    return sorted(forecasts)
-
-
-# ── 조건(POP ≥ 60, PCP ≥ 1) 만족 구간 계산 ────────────────────────
-def select_rain_segments(forecasts):
-    now = dt.datetime.now(KST)
-    until = now + dt.timedelta(hours=HOURS_AHEAD)
-    segs = []
-    for ts, pop, pcp in forecasts:
-        if not (now <= ts < until):
+    """items: item 을 내보내는 아무 iterable (페이지 iterator 포함)"""
+    return forecast_rules.Table.from_items(items)
+
+
+# ── 알림 규칙 ─────────────────────────────────────────────────────
+# when: forecast_rules 규칙 식 · show: 행 문구 ({열} · {열:형식}, md=월일, end=구간 끝 시)
+# per: "row" 는 해당 예보 시각마다, "day" 는 지점·날짜별 한 줄
+PRESETS = {
+    "rain": {
+        "name": "rain", "title": "☂️ **오늘 비 예보 상세**",
+        "when": f"POP >= {POP_THRESHOLD} and PCP >= {PCP_THRESHOLD} and 0 <= ahead < {HOURS_AHEAD}",
+        "show": "{md} {hour:02.0f}시~{end:02d}시 ☔ {PCP:.1f} mm / 강수확률 {POP:.0f}%",
+    },
+    "heat": {
+        "name": "heat", "title": "🥵 **폭염 주의**", "per": "day",
+        "when": f"daymax(TMP) >= 33 and TMP == daymax(TMP) and 0 <= ahead < {HOURS_AHEAD}",
+        "show": "{md} {hour:02.0f}시 최고 {TMP:.0f}℃",
+    },
+    "wind": {
+        "name": "wind", "title": "💨 **강풍 주의**",
+        "when": f"WSD >= 14 and 0 <= ahead < {HOURS_AHEAD}",
+        "show": "{md} {hour:02.0f}시 풍속 {WSD:.0f} m/s",
+    },
+    "commute_rain": {
+        "name": "commute_rain", "title": "🚇 **출근길 비**", "per": "day",
+        "when": f"daysum(PCP * between(hour, 7, 10)) >= 1 and between(hour, 7, 10) "
+                f"and 0 <= ahead < {HOURS_AHEAD} and dow < 5",
+        "show": "{md} 07–10시 합계 강수 예상",
+    },
+}
+
+def load_rules():
+    """KMA_RULES (JSON 목록: 프리셋 이름 또는 {name, when, title, show, per}), 기본 비 알림만"""
+    spec = json.loads(RULES_JSON) if RULES_JSON else ["rain"]
+    return [forecast_rules.Rule.from_dict(PRESETS[r] if isinstance(r, str) else r) for r in spec]
+
+
+# ── 지점 목록 ─────────────────────────────────────────────────────
+def load_locations():
+    """[{"name", "nx", "ny", "webhook"}]. KMA_LOCATIONS 가 없으면 기본 지점 하나"""
+    if not LOCATIONS_JSON:
+        return [{"name": "", "nx": NX, "ny": NY, "webhook": WEBHOOK}] if WEBHOOK else []
+    locs = []
+    for loc in json.loads(LOCATIONS_JSON):
+        hook = loc.get("webhook") or os.getenv(loc.get("webhook_env", ""), "")
+        if not hook:
+            print(f"⚠️  {loc.get('name', '?')}: 웹훅 없음 – 건너뜀")
             continue
-        if pop >= POP_THRESHOLD and pcp >= PCP_THRESHOLD:
-            segs.append((ts, pop, pcp))
-    return segs
+        locs.append({"name": loc.get("name", ""), "nx": int(loc["nx"]),
+                     "ny": int(loc["ny"]), "webhook": hook})
+    return locs
 
+def grid_forecasts(grid, deadline=None):
+    """격자 하나의 예보 → (발표 시각, 예보 표). 실패 시 (None, None)"""
+    nx, ny = grid
+    with tracing.span("fetch", "kma", nx=nx, ny=ny) as sp:
+        try:
+            base, forecasts, cached = get_forecasts(nx, ny, deadline=deadline)
+        except Exception as e:
+            print(f"🚫  ({nx},{ny}) 예보 조회 오류 – {e}")
+            return None, None
+        sp["cached"] = cached
+    if base is None:
+        print(f"🚫  ({nx},{ny}) 예보 조회 실패 – 최근 발표분 없음")
+        return None, None
+    print(f"{'📦  캐시' if cached else '🌐  API'} ({nx},{ny}) 예보 사용: {base:%m-%d %H:%M} 발표분")
+    return base, forecasts
 
-# ── 메시지 포맷 ───────────────────────────────────────────────────
-def format_segments(segs):
-    lines = []
-    for ts, pop, pcp in segs:
-        end = ts + dt.timedelta(hours=3)   # 동네예보 시간 단위 = 3 h
-        lines.append(f"{ts:%m월 %d일} {ts.hour:02d}시~{end.hour:02d}시 "
-                     f"☔ {pcp:.1f} mm / 강수확률 {pop}%")
-    return "\n".join(lines)
+def notify(loc, rules, hits, deadline=None) -> bool:
+    """지점 하나의 규칙 결과 전송. hits: {규칙 이름: [문구, …]}. 실패하면 False"""
+    name = loc["name"]
+    if not hits:
+        print(f"☀️  {name + ': ' if name else ''}해당 예보 없음 — 알림 생략")
+        return True
+
+    parts = [f"📍 **{name}**"] if name else []
+    for rule in rules:
+        if rule.name in hits:
+            parts.append(rule.title + "\n" + "\n".join(hits[rule.name]))
+    with tracing.span("send", "kma", location=name) as sp:
+        ok = sp["sent"] = delivery.send_text(loc["webhook"], "\n".join(parts), deadline)
+    print(f"{'✅' if ok else '🚫'}  {name + ' ' if name else ''}날씨 알림 전송 {'완료' if ok else '실패'}")
+    return ok
 
 
 # ── 메인 ─────────────────────────────────────────────────────────
 def main():
-    if not (WEBHOOK and SERVICE_KEY):
-        sys.exit("❌  DISCORD_WEBHOOK_UMBRELLA 또는 KMA_API_KEY 누락")
+    if not SERVICE_KEY:
+        sys.exit("❌  KMA_API_KEY 누락")
+    locs = load_locations()
+    if not locs:
+        sys.exit("❌  DISCORD_WEBHOOK_UMBRELLA 또는 KMA_LOCATIONS 누락")
+    try:
+        rules = load_rules()
+    except (ValueError, KeyError) as e:                   # RuleError · JSON 오류 · 없는 프리셋
+        sys.exit(f"❌  KMA_RULES 오류 – {e}")
 
-    items = fetch_items()
-    segs = select_rain_segments(parse_forecast(items))
+    # 같은 격자를 쓰는 지점은 한 번만 조회, 격자끼리는 동시에
+    deadline = http_client.Deadline()                     # 조회 → 전송 전체 예산
+    grids = list(dict.fromkeys((loc["nx"], loc["ny"]) for loc in locs))
+    with ThreadPoolExecutor(max_workers=min(WORKERS, len(grids)),
+                            thread_name_prefix="kma-grid") as pool:
+        by_grid = dict(zip(grids, pool.map(lambda g: grid_forecasts(g, deadline), grids)))
 
-    if not segs:
-        print("☀️  POP < 60% or PCP < 1 mm — 알림 생략")
-        return
+    failed = [loc for loc in locs if by_grid[(loc["nx"], loc["ny"])][0] is None]
+    ready = [loc for loc in locs if loc not in failed]
+
+    # 모든 지점을 한 표로 쌓아 규칙마다 한 번씩 평가
+    with tracing.span("detect", "kma", locations=len(ready), rules=len(rules)) as sp:
+        table = forecast_rules.frame([by_grid[(loc["nx"], loc["ny"])][1] for loc in ready],
+                                     dt.datetime.now(KST))
+        hits = forecast_rules.evaluate(rules, table, len(ready))
+        sp["rows"] = len(table)
 
-    msg = "☂️ **오늘 비 예보 상세**\n" + format_segments(segs)
-    requests.post(WEBHOOK, json={"content": msg}, timeout=10)
-    print("✅  우산 알림 전송 완료")
+    for loc, h in zip(ready, hits):
+        if not notify(loc, rules, h, deadline):
+            failed.append(loc)
+    if failed:
+        names = [loc["name"] or f"({loc['nx']},{loc['ny']})" for loc in failed]
+        sys.exit(f"🚫  날씨 알림 실패: {', '.join(names)}")
 
 
 if __name__ == "__main__":
-    main()
+    tracing.run(main, "kma")
@@ -0,0 +1,58 @@
+# list_bot.py ─ 목록형 학과 게시판 봇(sw · me · mse · chemeng · ee) 공통 실행 흐름
+# • 목록 받기 → (처음이 아니면) 밀린 페이지 따라잡기 → 검색 색인 → 새 글 판별 → 묶어서 전송
+# • 게시판마다 다른 것(목록 받기 · 파싱 · n페이지 받기 · 전송 문구)은 봇 모듈이 함수로 넘김
+#     list_bot.run(BOARD, get_notices, fetch_page, send, "🚫 공지 파싱 실패")
+# • 목록 지문(page_cache)은 전송까지 끝났을 때만 확정 → 실패하면 다음 주기에 다시 파싱
+# • 따라잡기가 오류·예산·바이트 상한으로 중간에 멈추면 받은 글은 보내되 이어 받을 위치를
+#   state 에 두고 지문도 확정하지 않음 → 다음 주기에 빈 구간부터 다시 받음
+
+import state, page_cache, seen_store, catchup, http_client, tracing, search_index
+
+def get_notices(board: str, fetch_html, parse, deadline=None):
+    """목록 글 전체. 실패 시 None, 목록이 지난번과 같으면 []"""
+    html = fetch_html(deadline)
+    if html is page_cache.UNCHANGED:
+        return []                                # 목록 변화 없음 → 새 글 없음
+    if not html:
+        return None
+    with tracing.span("parse", board, chars=len(html)) as sp:
+        rows = parse(html)
+        sp["rows"] = len(rows)
+    return rows or None
+
+def run(board: str, get_notices, fetch_page, send, fail_msg: str = "🚫 공지 파싱 실패"):
+    """봇 한 번 실행: get_notices(deadline) · fetch_page(n, deadline) · send(rows, deadline)"""
+    deadline = http_client.Deadline()            # fetch → send 전체 예산
+    rows = get_notices(deadline)
+    if rows is None:
+        print(fail_msg)
+        return
+
+    seen = seen_store.load(board)
+    after = resume = state.catchup_after(board)
+    if seen:                                     # 처음 실행이 아니면 밀린 페이지까지
+        rows, resume = catchup.collect(board, rows, fetch_page, seen.__contains__, deadline, after)
+    if resume != after:
+        state.set_catchup_after(board, resume)
+    search_index.add(board, rows)                # 본 글 전체를 검색 색인에
+    with tracing.span("detect", board, rows=len(rows)) as sp:
+        new = seen_store.new_rows(rows, seen)
+        sp["new"] = len(new)
+    seen_store.mark_old(rows, seen, new)
+    seen.save()
+    if not new:
+        if resume is None:
+            page_cache.commit(board)
+        print("⏸ 새 글 없음")
+        return
+
+    with tracing.span("send", board, posts=len(new)) as sp:
+        sent = sp["sent"] = send(new, deadline)  # 오래된 글부터 묶어서
+    for nid, title, link in new[:sent]:
+        seen.mark_sent(nid, title, link)
+        print(f"✅ 새 공지 전송 완료: {nid}")
+    if sent < len(new):
+        print("🚫 전송 실패 – 다음 주기에 재시도")
+        return
+    if resume is None:                           # 따라잡기가 끝났을 때만 목록 확정
+        page_cache.commit(board)
@@ -2,16 +2,18 @@
 #  ● 고정 공지(공지 아이콘/텍스트) 건너뛰기
 #  ● 제목 셀(td.subject · td.subj)만 파싱 → 번호·날짜 제외
 #  ● UTF-8 / CP949 / EUC-KR 자동 인코딩 판별
-#  ● 글 ID = idx(또는 num) 값 → 중복 전송 차단
+#  ● 글 ID = idx(또는 num) 값 → 본 글 ID 목록(state.db)과 비교해
+#    안 본 글을 모두 오래된 것부터 전송
 
-import os, re, sys, hashlib, requests, traceback
-from bs4 import BeautifulSoup
+import os, re, sys, hashlib, traceback
+import page_cache, catchup, delivery, tracing, list_bot
+from html_parse import make_soup, ROWS
 from urllib.parse import urljoin
 
 # ── 환경 변수 ───────────────────────────────────────────────────
 WEBHOOK  = os.getenv("DISCORD_WEBHOOK_MSE")          # ← 레포 Secrets
 LIST_URL = "https://materials.ssu.ac.kr/bbs/board.php?tbl=bbs51"
-ID_FILE  = "last_mse_id.txt"
+BOARD    = "mse"                                     # page_cache · state 키
 
 # ── 상수 ────────────────────────────────────────────────────────
 HEADERS  = {"User-Agent": "Mozilla/5.0"}
@@ -27,43 +29,58 @@ def smart_decode(b: bytes) -> str:
             continue
     return b.decode("utf-8", "replace")
 
-def fetch_html() -> str | None:
+def fetch_html(deadline=None):
     try:
-        r = requests.get(LIST_URL, headers=HEADERS, timeout=TIMEOUT)
-        return smart_decode(r.content)
+        r = page_cache.get(BOARD, LIST_URL, headers=HEADERS, timeout=TIMEOUT,
+                           deadline=deadline)
+        if r is page_cache.UNCHANGED:
+            return r
+        with tracing.span("decode", BOARD, bytes=len(r.content)):
+            html = smart_decode(r.content)
+        return html
     except Exception:
         traceback.print_exc()
         return None
 
-# ── 최신 글 추출 ────────────────────────────────────────────────
-def get_latest():
-    html = fetch_html()
-    if not html:
-        return None, None, None
-
-    soup = BeautifulSoup(html, "html.parser")
-
-    # ① 제목 셀(td.subject / td.subj) 순서대로 탐색
-    for td in soup.select("td.subject, td.subj"):
-        tr = td.find_parent("tr")
-
-        # 고정 공지: tr 안에 alt='공지'·'notice' 이미지 또는 '공지' 텍스트
-        if tr and (tr.find("img", alt=lambda v: v and ("공지" in v or "notice" in v.lower()))
-                   or "공지" in tr.get_text(strip=True).split()[0]):
-            continue
-
-        a = td.find("a", href=True)
-        if not a:
-            continue
+# ── 목록 글 추출 ────────────────────────────────────────────────
+def parse_notices(html: str) -> list:
+    """목록의 일반 글 [(id, 제목, 링크)] 위에서부터(최신 → 과거)"""
+    rows, ids = [], set()
 
+    def add(a):
         title = a.get_text(" ", strip=True)
         link  = urljoin("https://materials.ssu.ac.kr", a["href"])
 
         # 글 고유 ID: idx= 또는 num= 값, 없으면 링크 md5
         m = re.search(r"(idx|num)=(\d+)", link)
         nid = m.group(2) if m else md5(link)
-
-        return nid, title, link
+        if nid not in ids:
+            ids.add(nid)
+            rows.append((nid, title, link))
+
+    def subject_rows(soup):
+        for td in soup.select("td.subject, td.subj"):
+            tr = td.find_parent("tr")
+
+            # 고정 공지: tr 안에 alt='공지'·'notice' 이미지 또는 '공지' 텍스트
+            if tr and (tr.find("img", alt=lambda v: v and ("공지" in v or "notice" in v.lower()))
+                       or "공지" in tr.get_text(strip=True).split()[0]):
+                continue
+
+            a = td.find("a", href=True)
+            if a:
+                add(a)
+
+    # ① 제목 셀(td.subject / td.subj) 순서대로 탐색 — 표의 행만 파싱
+    subject_rows(make_soup(html, ROWS))
+    if rows:
+        return rows
+
+    # 표 밖 제목 셀·Fallback 은 페이지 전체 트리로
+    soup = make_soup(html)
+    subject_rows(soup)
+    if rows:
+        return rows
 
     # ② 예외: subject 셀이 없으면 (모바일·리스트형) href 패턴으로 Fallback
     for a in soup.find_all("a", href=True):
@@ -71,44 +88,32 @@ def get_latest():
             continue
         if "공지" in a.get_text(strip=True):
             continue
-        link  = urljoin("https://materials.ssu.ac.kr", a["href"])
-        title = a.get_text(" ", strip=True)
-        m = re.search(r"(idx|num)=(\d+)", link)
-        nid = m.group(2) if m else md5(link)
-        return nid, title, link
+        add(a)
 
-    return None, None, None
+    return rows
 
-# ── 상태 파일 read/write ───────────────────────────────────────
-def read_last():
-    try:
-        return open(ID_FILE).read().strip()
-    except FileNotFoundError:
-        return None
+def page_url(n: int) -> str:
+    """목록 n페이지 주소 (밀린 글 따라잡기용)"""
+    return f"{LIST_URL}&page={n}"
 
-def write_last(nid): open(ID_FILE, "w").write(nid)
+fetch_page = catchup.page_fetcher(BOARD, page_url, lambda r: smart_decode(r.content), parse_notices,
+                                  headers=HEADERS, timeout=TIMEOUT)
+
+def get_notices(deadline=None):
+    """목록 글 전체. 실패 시 None, 목록이 지난번과 같으면 []"""
+    return list_bot.get_notices(BOARD, fetch_html, parse_notices, deadline)
 
 # ── 디스코드 전송 ───────────────────────────────────────────────
-def send(msg):
-    requests.post(WEBHOOK, json={"content": msg}, timeout=10)
+def send(rows, deadline=None) -> int:
+    """새 글 [(id, 제목, 링크)]을 묶어 전송. 확인된 글 수 반환"""
+    return delivery.deliver(WEBHOOK, "🔬 **신소재공학과 새 공지**",
+                            [delivery.embed(title, link) for _, title, link in rows], deadline)
 
 # ── 메인 ───────────────────────────────────────────────────────
 def main():
     if not WEBHOOK:
         sys.exit("❌ DISCORD_WEBHOOK_MSE 시크릿이 없습니다")
-
-    nid, title, link = get_latest()
-    if not nid:
-        print("🚫 공지 파싱 실패 — HTML 구조 확인 필요")
-        return
-
-    if nid == read_last():
-        print("⏸ 새 글 없음")
-        return
-
-    send(f"🔬 **신소재공학과 새 공지**\n{title}\n{link}")
-    write_last(nid)
-    print("✅ 새 공지 전송 완료")
+    list_bot.run(BOARD, get_notices, fetch_page, send, "🚫 공지 파싱 실패 — HTML 구조 확인 필요")
 
 if __name__ == "__main__":
-    main()
+    tracing.run(main, BOARD)
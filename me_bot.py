@@ -1,8 +1,9 @@
-# me_bot.py  ── idx 기반으로 최신 공지 파싱
-import os, re, sys, time, hashlib, requests
-from bs4 import BeautifulSoup
+# me_bot.py  ── idx 기반으로 목록 공지 파싱, 안 본 글을 모두 전송
+import os, re, sys, hashlib, requests
+from html_parse import make_soup, ROWS
 from datetime import datetime
 from urllib.parse import quote_plus, urljoin
+import page_cache, catchup, delivery, tracing, list_bot
 
 WEBHOOK = os.getenv("DISCORD_WEBHOOK_ME")
 
@@ -10,7 +11,7 @@ WORKER  = "https://yellow-unit-fd5c.hyunsoopark4.workers.dev/?url="
 SRC     = "http://me.ssu.ac.kr/notice/notice01.php"
 LIST_URL = WORKER + quote_plus(SRC)
 
-ID_FILE = "last_me_id.txt"
+BOARD   = "me"                      # page_cache · state 키
 HEADERS = {"User-Agent": "Mozilla/5.0"}
 
 TIMEOUT = (5, 60)
@@ -20,25 +21,36 @@ DATE_RE = re.compile(r"\d{4}[.\-]\d{2}[.\-]\d{2}")
 def md5(text: str) -> str:
     return hashlib.md5(text.encode()).hexdigest()
 
-def fetch_html():
-    for i in range(1, RETRY + 1):
-        try:
-            r = requests.get(LIST_URL, headers=HEADERS, timeout=TIMEOUT)
-            if r.status_code == 200:
-                print(f"✅ Worker 200 (try {i})"); return r.text
-            print(f"⚠️ Worker {r.status_code} (try {i})")
-        except requests.RequestException as e:
-            print(f"⚠️ Worker err (try {i}) – {e}")
-        time.sleep(1)
+def fetch_html(deadline=None):
+    # 재시도(지수 백오프 + 지터)는 http_client 가 담당
+    try:
+        r = page_cache.get(BOARD, LIST_URL, headers=HEADERS, timeout=TIMEOUT, retries=RETRY - 1,
+                           deadline=deadline)
+    except requests.RequestException as e:
+        print(f"⚠️ Worker err – {e}"); return None
+    if r is page_cache.UNCHANGED:
+        print("✅ Worker 변화 없음"); return r
+    if r.status_code == 200:
+        print("✅ Worker 200")
+        with tracing.span("decode", BOARD, bytes=len(r.content)):
+            return r.text
+    print(f"⚠️ Worker {r.status_code}")
     return None
 
-def get_latest():
-    html = fetch_html()
-    if not html: return None, None, None
-    soup = BeautifulSoup(html, "html.parser")
+def is_pinned(tr) -> bool:
+    """고정 공지 행 (번호 칸이 '공지' 글자·아이콘)"""
+    num = tr.find("td")
+    if not num:
+        return False
+    return num.get_text(strip=True) == "공지" or \
+        bool(num.find("img", alt=lambda v: v and "공지" in v))
+
+def parse_notices(html: str) -> list:
+    """목록 글 [(id, 제목, 링크)] 최신 → 과거 순. 고정 공지는 catchup.Pinned 로 표시"""
+    soup = make_soup(html, ROWS)                         # 표의 행만 파싱
 
-    # ① 날짜 기반 우선
-    latest_dt, latest_a = datetime.min, None
+    # ① 날짜 기반 우선: 날짜 내림차순(같은 날짜는 목록 순서 유지)
+    dated = []
     for tr in soup.select("tr"):
         d = tr.find("td", string=DATE_RE)
         a = tr.find("a", href=True)
@@ -47,39 +59,48 @@ def get_latest():
             cur = datetime.strptime(d.text.replace(".", "-").strip(), "%Y-%m-%d")
         except ValueError:
             continue
-        if cur >= latest_dt: latest_dt, latest_a = cur, a
-
-    # ② 그래도 못 잡으면 목록 첫 a href 사용
-    if not latest_a:
-        latest_a = soup.find("a", href=True)
-        if not latest_a: return None, None, None
-
-    link = urljoin("https://me.ssu.ac.kr", latest_a["href"])
-    title = latest_a.get_text(strip=True)
-    uid = re.search(r"(idx|wr_id)=(\d+)", link)
-    notice_id = uid.group(2) if uid else md5(link)   # idx 있으면 그 값, 없으면 링크 md5
-    return notice_id, title, link
-
-def read_last():
-    try: return open(ID_FILE).read().strip()
-    except FileNotFoundError: return None
-
-def write_last(wid): open(ID_FILE, "w").write(wid)
-
-def send(msg): requests.post(WEBHOOK, json={"content": msg}, timeout=10)
+        dated.append((cur, a, is_pinned(tr)))
+    dated.sort(key=lambda x: x[0], reverse=True)
+    anchors = [(a, pinned) for _, a, pinned in dated]
+
+    # ② 그래도 못 잡으면 목록 첫 a href 사용 (이때만 페이지 전체 파싱)
+    if not anchors:
+        first = make_soup(html).find("a", href=True)
+        if not first: return []
+        anchors = [(first, False)]
+
+    rows, ids = [], set()
+    for a, pinned in anchors:
+        link = urljoin("https://me.ssu.ac.kr", a["href"])
+        title = a.get_text(strip=True)
+        uid = re.search(r"(idx|wr_id)=(\d+)", link)
+        notice_id = uid.group(2) if uid else md5(link)   # idx 있으면 그 값, 없으면 링크 md5
+        if notice_id in ids: continue
+        ids.add(notice_id)
+        row = (notice_id, title, link)
+        rows.append(catchup.Pinned(row) if pinned else row)
+    return rows
+
+def page_url(n: int) -> str:
+    """목록 n페이지 주소 (밀린 글 따라잡기용)"""
+    return WORKER + quote_plus(f"{SRC}?page={n}")
+
+fetch_page = catchup.page_fetcher(BOARD, page_url, lambda r: r.text, parse_notices,
+                                  headers=HEADERS, timeout=TIMEOUT, retries=RETRY - 1)
+
+def get_notices(deadline=None):
+    """목록 글 전체. 실패 시 None, 목록이 지난번과 같으면 []"""
+    return list_bot.get_notices(BOARD, fetch_html, parse_notices, deadline)
+
+def send(rows, deadline=None) -> int:
+    """새 글 [(id, 제목, 링크)]을 묶어 전송. 확인된 글 수 반환"""
+    return delivery.deliver(WEBHOOK, "🔧 **기계공학부 새 공지**",
+                            [delivery.embed(title, link) for _, title, link in rows], deadline)
 
 def main():
     if not WEBHOOK:
         sys.exit("❌ DISCORD_WEBHOOK_ME 시크릿이 없습니다")
-
-    nid, title, link = get_latest()
-    if not nid:
-        print("🚫 파싱 실패 – 다음 주기 스킵"); return
-    if nid == read_last():
-        print("⏸ 새 글 없음"); return
-
-    send(f"🔧 **기계공학부 새 공지**\n{title}\n{link}")
-    write_last(nid); print("✅ 새 공지 전송 완료")
+    list_bot.run(BOARD, get_notices, fetch_page, send, "🚫 파싱 실패 – 다음 주기 스킵")
 
 if __name__ == "__main__":
-    main()
+    tracing.run(main, BOARD)
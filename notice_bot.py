@@ -1,85 +1,214 @@
-import os, sys, json, re, requests, textwrap, traceback
-from bs4 import BeautifulSoup
+import os, sys, json, re, hashlib, textwrap, itertools, traceback
+import state, catchup, delivery, http_client, tracing, search_index
+from concurrent.futures import ThreadPoolExecutor
+from bs4 import BeautifulSoup, SoupStrainer
+from html_parse import make_soup
 
 # ── 환경변수 ──────────────────────────────────────────────
 WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL")
 OPENAI_KEY  = os.getenv("OPENAI_API_KEY")   # 없으면 요약 생략
+OPENAI_BASE = os.getenv("OPENAI_BASE_URL")  # 선택. 호환 서버(로컬 테스트 등) 주소
 if not WEBHOOK_URL:
     try:
         with open("config.json", encoding="utf-8") as f:
             WEBHOOK_URL = json.load(f)["DISCORD_WEBHOOK_URL"]
     except Exception:
-        sys.exit("❌ DISCORD_WEBHOOK_URL 설정이 없습니다")
+        pass                                    # main()에서 종료
 
 # openai v1.x 클라이언트
 client = None
 if OPENAI_KEY:
     from openai import OpenAI
-    client = OpenAI(api_key=OPENAI_KEY)
+    client = OpenAI(api_key=OPENAI_KEY, base_url=OPENAI_BASE or None)
 
 NOTICE_URL = "https://scatch.ssu.ac.kr/공지사항/"
-LAST_FILE  = "last_notice_id.txt"
+PAGE_URL   = NOTICE_URL + "page/{}/"         # 2페이지 이후 (밀린 글 따라잡기)
+BOARD      = "notice"                        # state 키
 UA_HEADER  = {"User-Agent": "Mozilla/5.0"}
+ARTICLE_WORKERS = 6                          # 본문 동시 요청 수
+
+GPT_MODEL     = "gpt-3.5-turbo"
+SUMMARY_CACHE = os.path.join(os.getenv("BOT_CACHE_DIR", "cache"), "summaries.json")
+SUMMARY_CACHE_MAX = 500                      # 보관할 요약 수 (오래 안 쓴 것부터 삭제)
+BATCH_CHARS   = 8000                         # 한 번에 묶어 요약할 본문 글자 수 상한
+SUMMARY_TIMEOUT = 30                         # 요약 요청 하나의 timeout 상한(초)
+SEND_RESERVE  = 15                           # 요약이 예산을 다 써도 전송에 남겨 둘 시간(초)
 
-# ── 상태 파일 I/O ─────────────────────────────────────────
-read_last  = lambda: open(LAST_FILE).read().strip() if os.path.exists(LAST_FILE) else None
-write_last = lambda x: open(LAST_FILE, "w").write(x)
+# ── 상태 I/O (state.db) ───────────────────────────────────
+read_last  = lambda: state.get_last(BOARD)
 
 # ── GPT 요약 (v1.x 인터페이스) ────────────────────────────
-def summarize(txt: str) -> str:
-    if not client:
+# 요청 하나. deadline 이 있으면 남은 시간을 timeout 으로, SDK 자체 재시도 없이
+def _chat(deadline, **kw):
+    c = client.with_options(timeout=deadline.cap(SUMMARY_TIMEOUT), max_retries=0) if deadline else client
+    return c.chat.completions.create(model=GPT_MODEL, temperature=0.3, **kw)
+
+def summarize(txt: str, deadline=None) -> str:
+    if not client or (deadline and deadline.expired()):
         return ""
     try:
-        res = client.chat.completions.create(
-            model="gpt-3.5-turbo",
+        res = _chat(
+            deadline,
             messages=[{
                 "role": "user",
                 "content": "다음 학사 공지를 한국어로 최대 3줄 핵심 요약:\n" + txt
             }],
             max_tokens=120,
-            temperature=0.3,
         )
         return res.choices[0].message.content.strip()
     except Exception as e:
         print("GPT 요약 실패:", e)
         return ""
 
+# 여러 공지를 한 번에 요약. 응답을 '### 번호' 단위로 나눠 돌려주며, 개수가 안 맞으면 None
+def summarize_batch(txts: list[str], deadline=None) -> list[str] | None:
+    if deadline and deadline.expired():
+        return None
+    prompt = ("다음 학사 공지들을 각각 한국어로 최대 3줄 핵심 요약. "
+              "각 요약은 '### 번호' 줄로 시작하고 번호 순서를 지킬 것:\n")
+    prompt += "".join(f"\n### {i}\n{t}\n" for i, t in enumerate(txts, 1))
+    try:
+        res = _chat(
+            deadline,
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=120 * len(txts),
+        )
+        out = res.choices[0].message.content
+    except Exception as e:
+        print("GPT 일괄 요약 실패:", e)
+        return None
+    parts = re.split(r"^\s*###\s*(\d+)\s*$", out, flags=re.M)
+    found = {int(n): body.strip() for n, body in zip(parts[1::2], parts[2::2])}
+    if sorted(found) != list(range(1, len(txts) + 1)):
+        return None
+    return [found[i] for i in range(1, len(txts) + 1)]
+
+# ── 요약 캐시 (본문 해시 → 요약) ──────────────────────────
+def summary_key(txt: str) -> str:
+    return hashlib.sha256(f"{GPT_MODEL}\n{txt}".encode()).hexdigest()
+
+def load_summaries() -> dict:
+    try:
+        with open(SUMMARY_CACHE, encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def save_summaries(cache: dict):
+    # dict 삽입 순서 = 최근 사용 순서. 넘치면 앞(오래된 것)부터 버림
+    items = list(cache.items())[-SUMMARY_CACHE_MAX:]
+    os.makedirs(os.path.dirname(SUMMARY_CACHE) or ".", exist_ok=True)
+    with open(SUMMARY_CACHE + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(dict(items), f, ensure_ascii=False)
+    os.replace(SUMMARY_CACHE + ".tmp", SUMMARY_CACHE)
+
+def summarize_many(txts: list[str], deadline=None) -> list[str]:
+    """캐시에 없는 본문만 BATCH_CHARS 단위로 묶어 요약. 입력 순서대로 반환
+    deadline 이 지나면 남은 글은 요약 없이 (빈 문자열)"""
+    if not client:
+        return [""] * len(txts)
+    cache = load_summaries()
+    keys = [summary_key(t) for t in txts]
+    todo = [i for i, (t, k) in enumerate(zip(txts, keys)) if t and k not in cache]
+
+    # 본문 길이 기준으로 묶음 만들기
+    batches, cur, size = [], [], 0
+    for i in todo:
+        if cur and size + len(txts[i]) > BATCH_CHARS:
+            batches.append(cur); cur, size = [], 0
+        cur.append(i); size += len(txts[i])
+    if cur:
+        batches.append(cur)
+
+    for batch in batches:
+        got = summarize_batch([txts[i] for i in batch], deadline) if len(batch) > 1 else None
+        if got is None:                                   # 한 건짜리 또는 분리 실패 → 개별 요약
+            got = [summarize(txts[i], deadline) for i in batch]
+        for i, summ in zip(batch, got):
+            if summ:
+                cache[keys[i]] = summ
+
+    out = []
+    for t, k in zip(txts, keys):
+        summ = cache.pop(k, "") if t else ""
+        if summ:
+            cache[k] = summ                               # 최근 사용으로 갱신
+        out.append(summ)
+    save_summaries(cache)
+    return out
+
+# ── 본문 HTML → 텍스트 (실패 시 빈 문자열) ─────────────────
+def fetch_body(link, deadline=None):
+    try:
+        art = http_client.get(link, headers=UA_HEADER, timeout=10, deadline=deadline).text
+        body = BeautifulSoup(art, "html.parser").get_text(" ", strip=True)
+        return textwrap.shorten(body, 4000)
+    except Exception:
+        return ""
+
 # ── 공지 목록 파싱 ─────────────────────────────────────────
-def fetch_new_notices(last_id):
-    html = requests.get(NOTICE_URL, headers=UA_HEADER, timeout=10).text
-    soup = BeautifulSoup(html, "html.parser")
+LIST_AREA = SoupStrainer("ul", class_="notice-lists")   # 목록 영역만 파싱
 
-    posts = []
+def parse_list(html):
+    """목록의 글 [(id, 제목, 링크)] (최신 → 과거)"""
+    soup = make_soup(html, LIST_AREA)
+    items = []
     for a in soup.select("ul.notice-lists li a"):
         link = a["href"]
         if link.startswith("/"):
             link = "https://scatch.ssu.ac.kr" + link
         m = re.search(r"[?&]num=(\d+)", link)
         nid = m.group(1) if m else link
-        if nid == last_id:
-            break
+        items.append((nid, a.get_text(" ", strip=True), link))
+    return items
+
+fetch_page = catchup.page_fetcher(BOARD, PAGE_URL.format, lambda r: r.text,
+                                  parse_list,
+                                  headers=UA_HEADER, timeout=10)
 
-        title = a.get_text(" ", strip=True)
-        # 본문 HTML → 텍스트
-        try:
-            art = requests.get(link, headers=UA_HEADER, timeout=10).text
-            body = BeautifulSoup(art, "html.parser").get_text(" ", strip=True)
-            body = textwrap.shorten(body, 4000)
-        except Exception:
-            body = ""
+def fetch_new_notices(last_id, deadline=None):
+    # 같은 호스트 요청은 http_client 의 keep-alive Session · 동시 요청 상한을 공유
+    with tracing.span("fetch", BOARD, url=NOTICE_URL) as sp:
+        r = http_client.get(NOTICE_URL, headers=UA_HEADER, timeout=10, deadline=deadline)
+        sp["status"], sp["bytes"] = r.status_code, len(r.content)
+    with tracing.span("decode", BOARD, bytes=len(r.content)):
+        html = r.text
+    # 목록에서 last_id 위의 글만 고르므로 parse 가 곧 detect
+    with tracing.span("parse", BOARD, chars=len(html)) as sp:
+        rows = parse_list(html)
+        items = list(itertools.takewhile(lambda it: it[0] != last_id, rows))
+        sp["new"] = len(items)
+    search_index.add(BOARD, rows)                          # 목록에서 본 글 전체를 검색 색인에
+    # 1페이지에 마지막 글이 없으면(장애 뒤) 다음 페이지에서 이어서 찾기
+    if last_id is not None and len(items) == len(rows):
+        # 마지막 id 하나만 아는 게시판이라 이어 받기는 안 함 (다시 훑으면 보낸 글을 가릴 수 없음)
+        items, _ = catchup.collect(BOARD, items, fetch_page, lambda nid: nid == last_id, deadline)
 
-        posts.append((nid, title, link, body))
+    # 본문은 여러 개를 동시에 가져오되 결과 순서는 목록 순서 유지
+    with tracing.span("fetch", BOARD, what="bodies", posts=len(items)), \
+         ThreadPoolExecutor(max_workers=ARTICLE_WORKERS) as pool:
+        bodies = list(pool.map(lambda it: fetch_body(it[2], deadline), items))
 
+    posts = [(nid, title, link, body) for (nid, title, link), body in zip(items, bodies)]
+    search_index.add(BOARD, posts)                         # 새 글은 본문까지
     return list(reversed(posts))  # 오래된 글부터 전송
 
 # ── 디스코드 전송 ─────────────────────────────────────────
-def send(msg):
-    requests.post(WEBHOOK_URL, json={"content": msg}, timeout=10)
+def send(posts, summaries, deadline=None) -> int:
+    """새 글과 요약을 embed 로 묶어 전송. 확인된 글 수 반환"""
+    embeds = [delivery.embed(title, link, summary)
+              for (_, title, link, _), summary in zip(posts, summaries)]
+    return delivery.deliver(WEBHOOK_URL, "📢 **새 학사 공지**", embeds, deadline)
 
 # ── 메인 루틴 ─────────────────────────────────────────────
 def main():
+    if not WEBHOOK_URL:
+        sys.exit("❌ DISCORD_WEBHOOK_URL 설정이 없습니다")
+
+    deadline = http_client.Deadline()                  # fetch → summarize → send 전체 예산
+    last = read_last()
     try:
-        new_posts = fetch_new_notices(read_last())
+        new_posts = fetch_new_notices(last, deadline)
     except Exception:
         traceback.print_exc()
         sys.exit("🚫 공지 파싱 실패")
@@ -87,15 +216,21 @@ def main():
     if not new_posts:
         print("⏸ 새 글 없음"); return
 
-    for nid, title, link, body in new_posts:
-        summary = summarize(body)
-        msg = f"📢 **새 학사 공지**\n{title}"
-        if summary:
-            msg += f"\n{summary}"
-        msg += f"\n{link}"
-        send(msg)
-        write_last(nid)
+    # 요약은 한 번에 (캐시 재사용 + 일괄 요청)
+    with tracing.span("summarize", BOARD, posts=len(new_posts)):
+        summaries = summarize_many([body for _, _, _, body in new_posts],
+                                   deadline.leave(SEND_RESERVE))
+
+    with tracing.span("send", BOARD, posts=len(new_posts)) as sp:
+        sent = sp["sent"] = send(new_posts, summaries, deadline)  # 오래된 글부터 묶어서
+    for nid, title, link, _ in new_posts[:sent]:
+        # 다른 실행이 먼저 갱신했으면(CAS 실패) 중복 기록을 막기 위해 중단
+        if not state.advance(BOARD, last, nid, title, link):
+            print("⚠️ 상태가 다른 실행에서 갱신됨 — 중단"); return
+        last = nid
         print(f"✅ 전송: {nid}")
+    if sent < len(new_posts):
+        print("🚫 전송 실패 – 다음 주기에 재시도")
 
 if __name__ == "__main__":
-    main()
+    tracing.run(main, BOARD)
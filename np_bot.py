@@ -1,84 +1,242 @@
 # np_bot.py
 # ────────── ‘비교과 프로그램’ 최신 글을 확인해
 #            새 글이면 디스코드 웹훅(다른 채널)으로 알림
-
-import os, sys, re, json, requests
-from bs4 import BeautifulSoup
+# • 로그인 쿠키는 cache/np_session.json 에 AES-GCM(cryptography)으로 암호화해 두고 다음 실행에서 재사용
+#   (키는 SSU_PW·SSU_ID 에서 PBKDF2 로 유도, 변조·다른 계정 파일이면 버림)
+# • 목록 응답이 로그인 화면이면 빈 목록으로 보지 않고 한 번만 다시 로그인
+# • 1페이지에 마지막으로 보낸 글이 없으면(장애 뒤) 다음 페이지까지 찾아
+#   밀린 프로그램을 오래된 것부터 모두 전송 (catchup.py)
+
+import os, sys, re, json, time, hashlib, base64, itertools, requests
+import datetime as dt
+import state, catchup, delivery, http_client, tracing, search_index
+from urllib.parse import urlencode
+from bs4 import SoupStrainer
+from html_parse import make_soup
+
+try:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    from cryptography.exceptions import InvalidTag
+except ImportError:                      # 없으면 세션을 저장하지 않고 매번 로그인
+    AESGCM = None
 
 # 필수 시크릿 (레포 Settings → Secrets → Actions)
 ID       = os.getenv("SSU_ID")                 # 학번
 PW       = os.getenv("SSU_PW")                 # 포털 비밀번호
 WEBHOOK  = os.getenv("DISCORD_WEBHOOK_NP")     # 비교과 전용 채널 웹훅
 
-if not all([ID, PW, WEBHOOK]):
-    sys.exit("❌ SSU_ID / SSU_PW / DISCORD_WEBHOOK_NP 시크릿이 필요합니다")
-
 LOGIN_URL = "https://path.ssu.ac.kr/user/login.do"
 LIST_URL  = "https://path.ssu.ac.kr/ptfol/imng/icmpNsbjtPgm/findIcmpNsbjtPgmList.do"
-LAST_FILE = "last_np_id.txt"
+BOARD     = "np"                         # state 키
+
+SESSION_FILE    = os.path.join(os.getenv("BOT_CACHE_DIR", "cache"), "np_session.json")
+SESSION_MAX_AGE = 12 * 3600              # 이보다 오래된 로그인은 만료 전이라도 새로 로그인
+KDF_ROUNDS      = 100_000
+KST             = dt.timezone(dt.timedelta(hours=9))
+
+class LoggedOut(Exception):
+    """목록 대신 로그인 화면이 돌아옴 (세션 만료)"""
 
-def login_session() -> requests.Session:
+def login_session(deadline=None) -> requests.Session:
     """포털 로그인 후 세션 반환(쿠키 기반). 오류 시 종료."""
     s = requests.Session()
-    r = s.post(LOGIN_URL, data={"userId": ID, "userPwd": PW}, timeout=10)
+    with tracing.span("fetch", BOARD, what="login") as sp:
+        r = http_client.post(LOGIN_URL, session=s, data={"userId": ID, "userPwd": PW}, timeout=10,
+                             deadline=deadline)
+        sp["status"] = r.status_code
     if r.status_code != 200 or "로그아웃" not in r.text:
         sys.exit("❌ 로그인 실패 – ID/PW 확인")
+    s.login_at = time.time()
     return s
 
-def get_latest(session):
-    """목록 페이지에서 가장 최신 프로그램 1건의 id·제목·기간·링크 추출."""
-    r = session.get(LIST_URL, params={
-        "paginationInfo.currentPageNo": 1,
+# ── 세션 저장 ───────────────────────────────────────────────
+SESSION_AAD = b"np-session/v2"
+
+def _key() -> bytes:
+    """AES-256 키 ─ 비밀번호·학번에서 유도"""
+    return hashlib.pbkdf2_hmac("sha256", PW.encode(), f"np-session:{ID}".encode(), KDF_ROUNDS, 32)
+
+def save_session(s: requests.Session):
+    """쿠키를 암호화해 SESSION_FILE 에 저장 (권한 0600). cryptography 가 없으면 저장 안 함"""
+    if AESGCM is None:
+        return
+    payload = json.dumps({
+        "login_at": getattr(s, "login_at", time.time()),
+        "cookies": [{"name": c.name, "value": c.value, "domain": c.domain, "path": c.path}
+                    for c in s.cookies],
+    }).encode()
+    nonce = os.urandom(12)
+    ct = AESGCM(_key()).encrypt(nonce, payload, SESSION_AAD)
+    blob = {k: base64.b64encode(v).decode() for k, v in (("nonce", nonce), ("ct", ct))}
+    os.makedirs(os.path.dirname(SESSION_FILE) or ".", exist_ok=True)
+    tmp = SESSION_FILE + ".tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump(blob, f)
+    os.replace(tmp, SESSION_FILE)
+
+def load_session() -> requests.Session | None:
+    """저장된 세션 복원. 없거나 변조·다른 계정·SESSION_MAX_AGE 초과면 None"""
+    if AESGCM is None:
+        return None
+    try:
+        with open(SESSION_FILE, encoding="utf-8") as f:
+            blob = {k: base64.b64decode(v) for k, v in json.load(f).items()}
+        data = json.loads(AESGCM(_key()).decrypt(blob["nonce"], blob["ct"], SESSION_AAD))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError, InvalidTag):
+        print("⚠️ 저장된 세션을 읽을 수 없음 – 새로 로그인")
+        return None
+    if time.time() - data["login_at"] > SESSION_MAX_AGE:
+        return None
+    s = requests.Session()
+    for c in data["cookies"]:
+        s.cookies.set(c["name"], c["value"], domain=c["domain"], path=c["path"])
+    s.login_at = data["login_at"]
+    return s
+
+def open_session(deadline=None) -> tuple[requests.Session, bool]:
+    """(세션, 저장본 재사용 여부) ─ 저장본이 없을 때만 로그인"""
+    s = load_session()
+    if s is not None:
+        return s, True
+    return login_session(deadline), False
+
+def is_logged_out(r: requests.Response) -> bool:
+    """목록 요청이 로그인 화면으로 끝났는지 (리다이렉트 · 401/403 · 로그인 폼)"""
+    if r.status_code in (401, 403):
+        return True
+    if "login" in r.url.lower():
+        return True
+    text = r.text
+    return "로그아웃" not in text and ("userPwd" in text or "login.do" in text)
+
+def oper_year(now: dt.datetime | None = None) -> str:
+    """목록 검색 연도 (KST 기준 올해)"""
+    return str((now or dt.datetime.now(KST)).year)
+
+def list_params(page: int = 1) -> dict:
+    return {
+        "paginationInfo.currentPageNo": page,
         "sort": "0001",
-        "operYySh": "2025",
+        "operYySh": oper_year(),
         "operSemCdSh": "0000",
-    }, timeout=10)
-    soup = BeautifulSoup(r.text, "html.parser")
+    }
+
+def get_rows(session, page: int = 1, deadline=None) -> list:
+    """목록 page 페이지의 프로그램 [(id, 제목, 기간, 링크)] 최신 → 과거.
+    로그인 화면이 돌아오면 LoggedOut"""
+    with tracing.span("fetch", BOARD, url=LIST_URL, page=page) as sp:
+        r = http_client.get(LIST_URL, session=session, params=list_params(page), timeout=10,
+                            deadline=deadline)
+        sp["status"], sp["bytes"] = r.status_code, len(r.content)
+        if is_logged_out(r):
+            sp["logged_out"] = 1
+            raise LoggedOut(r.url)
+    with tracing.span("decode", BOARD, bytes=len(r.content)):
+        html = r.text
+    with tracing.span("parse", BOARD, chars=len(html)) as sp:
+        rows = parse_rows(html)
+        sp["rows"] = len(rows)
+    return rows
 
-    # ※ 실제 구조 맞게 한 번만 확인 후 필요하면 셀렉터 수정
-    row = soup.select_one("ul.notice-lists li")          # 첫 li = 최신
-    if not row:
+def get_latest(session):
+    """목록 페이지에서 가장 최신 프로그램 1건의 id·제목·기간·링크 (없으면 None)"""
+    rows = get_rows(session)
+    return rows[0] if rows else None
+
+def page_fetcher(session):
+    """밀린 글 따라잡기용 n페이지 fetch (로그인 세션 공유)"""
+    return catchup.page_fetcher(BOARD, lambda n: f"{LIST_URL}?{urlencode(list_params(n))}",
+                                lambda r: r.text, parse_rows, session=session, timeout=10)
+
+def _row(li):
+    a = li.select_one(".notice_col4 a")
+    period = li.select_one(".notice_col3")
+    if not (a and a.get("href") and period):
         return None
-
-    title  = row.select_one(".notice_col4 a").get_text(strip=True)
-    period = row.select_one(".notice_col3").get_text(strip=True)
-    link_t = row.select_one(".notice_col4 a")["href"]
+    title  = a.get_text(strip=True)
+    link_t = a["href"]
     link   = "https://path.ssu.ac.kr" + link_t
 
     # 링크에 num=******* 들어 있으니 그걸 고유 id로 사용
     m = re.search(r"num=(\d+)", link_t)
     pid = m.group(1) if m else link      # fallback
+    return pid, title, period.get_text(strip=True), link
 
-    return pid, title, period, link
+def parse_rows(html) -> list:
+    """목록 HTML → [(id, 제목, 기간, 링크)] 위에서부터(최신 → 과거)"""
+    soup = make_soup(html, SoupStrainer("ul", class_="notice-lists"))   # 목록 영역만 파싱
 
-def read_last():
-    try:
-        return open(LAST_FILE, encoding="utf-8").read().strip()
-    except FileNotFoundError:
-        return None
+    # ※ 실제 구조 맞게 한 번만 확인 후 필요하면 셀렉터 수정
+    rows = (_row(li) for li in soup.select("ul.notice-lists li"))      # 첫 li = 최신
+    return [row for row in rows if row]
 
-def write_last(pid):
-    with open(LAST_FILE, "w", encoding="utf-8") as f:
-        f.write(pid)
+def parse_latest(html):
+    """목록 HTML → (id, 제목, 기간, 링크) 또는 None"""
+    rows = parse_rows(html)
+    return rows[0] if rows else None
 
-def send(msg):
-    requests.post(WEBHOOK, json={"content": msg}, timeout=10)
+def read_last():
+    return state.get_last(BOARD)
+
+def send(rows, deadline=None) -> int:
+    """새 프로그램 [(id, 제목, 기간, 링크)]을 묶어 전송. 확인된 글 수 반환"""
+    embeds = [delivery.embed(title, link, f"모집기간: {period}") for _, title, period, link in rows]
+    return delivery.deliver(WEBHOOK, "🎓 **새 비교과 프로그램**", embeds, deadline)
 
 def main():
-    sess      = login_session()
-    latest    = get_latest(sess)
-    if not latest:
+    if not all([ID, PW, WEBHOOK]):
+        sys.exit("❌ SSU_ID / SSU_PW / DISCORD_WEBHOOK_NP 시크릿이 필요합니다")
+
+    deadline = http_client.Deadline()                  # 로그인 → 목록 → 전송 전체 예산
+    sess, reused = open_session(deadline)
+    try:
+        rows = get_rows(sess, deadline=deadline)
+    except LoggedOut:
+        if not reused:
+            sys.exit("❌ 로그인 직후에도 로그인 화면 – 목록 URL 확인 필요")
+        print("🔑 저장된 세션 만료 – 다시 로그인")
+        sess = login_session(deadline)
+        try:
+            rows = get_rows(sess, deadline=deadline)
+        except LoggedOut:
+            sys.exit("❌ 로그인 직후에도 로그인 화면 – 목록 URL 확인 필요")
+    save_session(sess)
+    if not rows:
         print("❌ 목록 파싱 실패 – 셀렉터 확인 필요")
         return
-    pid, title, period, link = latest
 
-    if pid == read_last():
+    last = read_last()
+    with tracing.span("detect", BOARD, rows=len(rows)) as sp:
+        if last is None:
+            new = rows[:1]                                    # 첫 실행: 최신 1건만
+        else:
+            new = list(itertools.takewhile(lambda row: row[0] != last, rows))
+        sp["new"] = len(new)
+    if last is not None and len(new) == len(rows):
+        # 1페이지에 마지막 글이 없음 → 다음 페이지에서 이어서 찾기
+        # 마지막 id 하나만 아는 게시판이라 이어 받기는 안 함 (다시 훑으면 보낸 글을 가릴 수 없음)
+        new, _ = catchup.collect(BOARD, new, page_fetcher(sess), lambda pid: pid == last, deadline)
+    # 검색 색인: 모집기간은 본문 자리에
+    search_index.add(BOARD, [(pid, title, link, period) for pid, title, period, link in rows + new])
+    if not new:
         print("⏸  새 프로그램 없음")
         return
 
-    send(f"🎓 **새 비교과 프로그램**\n제목: {title}\n모집기간: {period}\n바로가기: {link}")
-    write_last(pid)
-    print("✅ 새 프로그램 알림 전송 완료")
+    new.reverse()                                             # 오래된 것부터
+    with tracing.span("send", BOARD, posts=len(new)) as sp:
+        sent = sp["sent"] = send(new, deadline)
+    for pid, title, _, link in new[:sent]:
+        # 다른 실행이 먼저 갱신했으면(CAS 실패) 중복 기록을 막기 위해 중단
+        if not state.advance(BOARD, last, pid, title, link):
+            print("⚠️ 상태가 다른 실행에서 갱신됨")
+            return
+        last = pid
+        print(f"✅ 새 프로그램 알림 전송 완료: {pid}")
+    if sent < len(new):
+        print("🚫 전송 실패 – 다음 주기에 재시도")
 
 if __name__ == "__main__":
-    main()
+    tracing.run(main, BOARD)
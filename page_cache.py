@@ -0,0 +1,65 @@
+# page_cache.py ─ 목록 페이지 조건부 GET + 내용 지문(fingerprint) 캐시
+# • 게시판별로 ETag / Last-Modified / 본문 sha1 을 cache/<board>.json 에 저장
+# • 다음 실행 때 If-None-Match / If-Modified-Since 를 보내고
+#   304 이거나 본문 해시가 같으면 UNCHANGED 반환 → 디코딩·파싱 생략
+# • 저장은 commit(board) 때만 수행
+#   → 전송이 실패한 실행의 지문이 남아 새 글을 놓치는 일 방지
+
+import os, json, hashlib
+import http_client, tracing
+
+CACHE_DIR = os.getenv("BOT_CACHE_DIR", "cache")
+
+UNCHANGED = object()     # 목록이 지난번 처리 이후 바뀌지 않음
+
+_pending = {}            # board → 이번 실행에서 받은 지문 (commit 대기)
+
+def _path(board: str) -> str:
+    return os.path.join(CACHE_DIR, f"{board}.json")
+
+def load(board: str) -> dict:
+    try:
+        with open(_path(board), encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def get(board: str, url: str, headers: dict | None = None, **kw):
+    """조건부 GET. 바뀌지 않았으면 UNCHANGED, 아니면 requests.Response 반환.
+    kw 는 http_client.get 으로 전달 (timeout, retries, deadline 등).
+    네트워크 예외는 그대로 올려 보낸다."""
+    saved = load(board)
+    hdrs = dict(headers or {})
+    if saved.get("etag"):
+        hdrs["If-None-Match"] = saved["etag"]
+    if saved.get("last_modified"):
+        hdrs["If-Modified-Since"] = saved["last_modified"]
+
+    with tracing.span("fetch", board, url=url) as sp:
+        r = http_client.get(url, headers=hdrs, **kw)
+        sp["status"], sp["bytes"] = r.status_code, len(r.content)
+    if r.status_code == 304:
+        return UNCHANGED
+    if r.status_code != 200:
+        return r
+
+    digest = hashlib.sha1(r.content).hexdigest()
+    _pending[board] = {
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "sha1": digest,
+    }
+    if digest == saved.get("sha1"):
+        return UNCHANGED
+    return r
+
+def commit(board: str):
+    """이번 실행에서 받은 지문을 저장. 목록 처리가 끝난 뒤에만 호출"""
+    entry = _pending.pop(board, None)
+    if not entry:
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = _path(board) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    os.replace(tmp, _path(board))
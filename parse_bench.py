@@ -0,0 +1,101 @@
+# parse_bench.py ─ 목록 파싱 방식별 시간·최대 메모리 비교
+# • 기준: html.parser + 페이지 전체 파싱 (예전 방식)
+# • 비교: 영역 제한(SoupStrainer) · lxml 백엔드(설치 시) 조합
+# • 추출 결과가 기준과 같은지도 함께 확인
+# • 사용법
+#     python parse_bench.py                       # 각 게시판 목록을 받아서 비교
+#     python parse_bench.py ee=ee.html sw=sw.html # 저장해 둔 HTML 로 비교
+#     python parse_bench.py -n 50 …               # 반복 횟수 (기본 20)
+
+import sys, time, statistics, tracemalloc, importlib, requests
+import html_parse, http_client
+
+# 게시판 → (모듈, 목록 URL 속성, 파싱 함수 이름)
+BOARDS = {
+    "notice":  ("notice_bot",    "NOTICE_URL", "parse_list"),
+    "sw":      ("sw_bot",        "LIST_URL",   "parse_notices"),
+    "me":      ("me_bot",        "LIST_URL",   "parse_notices"),
+    "mse":     ("materials_bot", "LIST_URL",   "parse_notices"),
+    "chemeng": ("chemeng_bot",   "LIST_URL",   "parse_notices"),
+    "ee":      ("ee_bot",        "LIST_URL",   "parse_notices"),
+    "np":      ("np_bot",        None,         "parse_latest"),   # 로그인 필요 → 파일로만
+}
+
+def smart_decode(b: bytes) -> str:
+    for enc in ("utf-8", "cp949", "euc-kr"):
+        try:
+            return b.decode(enc)
+        except UnicodeDecodeError:
+            pass
+    return b.decode("utf-8", "replace")
+
+def parser_fn(board: str):
+    mod_name, _, fn_name = BOARDS[board]
+    return getattr(importlib.import_module(mod_name), fn_name)
+
+def modes() -> list[tuple[str, bool]]:
+    out = [("html.parser", False), ("html.parser", True)]
+    try:
+        import lxml  # noqa: F401
+        out += [("lxml", False), ("lxml", True)]
+    except ImportError:
+        pass
+    return out
+
+def measure(fn, html: str, parser: str, restrict: bool, n: int):
+    html_parse.PARSER, html_parse.RESTRICT = parser, restrict
+    times = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn(html)
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    result = fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, statistics.median(times) * 1000, peak / 1024
+
+def load_pages(args: list[str]) -> dict[str, str]:
+    pages = {}
+    if args:
+        for arg in args:
+            board, _, path = arg.partition("=")
+            with open(path, "rb") as f:
+                pages[board] = smart_decode(f.read())
+        return pages
+    for board, (mod_name, url_attr, _) in BOARDS.items():
+        if not url_attr:
+            continue
+        url = getattr(importlib.import_module(mod_name), url_attr)
+        try:
+            r = http_client.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=20)
+            pages[board] = smart_decode(r.content)
+        except requests.RequestException as e:
+            print(f"⚠️ {board} 목록 받기 실패 – {e}")
+    return pages
+
+def main():
+    args = sys.argv[1:]
+    n = 20
+    if args[:1] == ["-n"]:
+        n, args = int(args[1]), args[2:]
+    unknown = [a for a in args if a.partition("=")[0] not in BOARDS]
+    if unknown:
+        sys.exit(f"❌ 알 수 없는 게시판: {', '.join(unknown)} (가능: {', '.join(BOARDS)})")
+
+    saved = html_parse.PARSER, html_parse.RESTRICT
+    print(f"{'board':<8} {'parser':<12} {'scope':<6} {'ms(p50)':>8} {'peak KiB':>9}  result")
+    for board, html in load_pages(args).items():
+        fn = parser_fn(board)
+        base = None
+        for parser, restrict in modes():
+            result, ms, kib = measure(fn, html, parser, restrict, n)
+            if base is None:
+                base = result
+            same = "기준" if result is base else ("같음" if result == base else "⚠️ 다름")
+            scope = "영역" if restrict else "전체"
+            print(f"{board:<8} {parser:<12} {scope:<6} {ms:8.2f} {kib:9.0f}  {same}")
+    html_parse.PARSER, html_parse.RESTRICT = saved
+
+if __name__ == "__main__":
+    main()
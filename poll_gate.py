@@ -0,0 +1,159 @@
+# poll_gate.py ─ 게시판별 글 올라오는 빈도(요일 × 시각)로 점검 여부 결정
+# • 모델: 최근 HISTORY_DAYS 일 전송 이력(state.history)의 시각을 KST 요일·시(7×24)로 세어
+#   칸마다 시간당 글 수 λ 를 추정. 표본이 적은 칸은 같은 시각의 요일 평균 쪽으로 당김
+#   (전송 시각 = 감지 시각이라 실제 게시보다 최대 한 주기 늦음)
+# • 게이트: 마지막 점검 이후 예상 새 글 수 m = ∫λ dt, 새 글이 있을 확률 p = 1 − e^(−m)
+#   p ≥ P_MIN 이거나 MAX_GAP_H 시간이 지났으면 점검, 아니면 건너뜀
+#   → 글이 잦은 시간대는 짧게(daemon 은 FAST_MIN 분까지), 드문 게시판·새벽은 길게
+# • 이력이 MIN_POSTS 건 미만이면 모델 없이 기본 주기 그대로
+# • 판단은 state.polls 에 기록 → report() 가 건너뛴 점검 수 · 늦게 받았을 예상 글 수 · 지연 계산
+# • 사용법
+#     python poll_gate.py             # 게시판별 모델 요약 + 최근 7일 점검 리포트
+#     python poll_gate.py -d 30       # 최근 30일
+# 환경
+#   BOT_POLL_GATE   1 이면 runner · daemon 에서 게이트 사용 (기본 끔)
+#   BOT_POLL_P      점검 기준 확률. 기본 0.1
+
+import os, sys, math, time, threading
+import datetime as dt
+import state
+
+ENABLED      = os.getenv("BOT_POLL_GATE", "") not in ("", "0")
+P_MIN        = float(os.getenv("BOT_POLL_P", "0.1"))
+MAX_GAP_H    = 3.0                 # 아무리 드물어도 이 시간 안에는 한 번 점검
+FAST_MIN     = 5                   # daemon 게이트 격자(분) ─ 가장 짧은 점검 간격
+MIN_POSTS    = 5                   # 모델을 믿기 위한 최소 이력 수
+HISTORY_DAYS = 90
+SHRINK_WEEKS = 4.0                 # 요일·시 칸을 시각 평균 쪽으로 당기는 강도(가상 주 수)
+MODEL_TTL    = 3600                # daemon 에서 모델을 다시 만드는 주기(초)
+
+KST = dt.timezone(dt.timedelta(hours=9))
+
+class RateModel:
+    """요일(월=0) × 시(KST) 칸별 시간당 예상 글 수"""
+
+    def __init__(self, rates: list[list[float]], posts: int, weeks: float):
+        self.rates, self.posts, self.weeks = rates, posts, weeks
+
+    @classmethod
+    def fit(cls, times: list[float], now: float) -> "RateModel":
+        counts = [[0] * 24 for _ in range(7)]
+        for t in times:
+            k = dt.datetime.fromtimestamp(t, KST)
+            counts[k.weekday()][k.hour] += 1
+        weeks = max(1.0, (now - min(times)) / (7 * 86400))
+        hourly = [sum(counts[d][h] for d in range(7)) / 7 / weeks for h in range(24)]
+        floor = len(times) / weeks / 168 * 0.1              # 한 번도 없던 칸도 0 은 아니게
+        rates = [[max(floor, (counts[d][h] + SHRINK_WEEKS * hourly[h]) / (weeks + SHRINK_WEEKS))
+                  for h in range(24)] for d in range(7)]
+        return cls(rates, len(times), weeks)
+
+    def rate(self, t: float) -> float:
+        k = dt.datetime.fromtimestamp(t, KST)
+        return self.rates[k.weekday()][k.hour]
+
+    def expected(self, start: float, end: float) -> float:
+        """[start, end) 동안 예상 글 수 (KST 는 UTC+9 정시라 시 경계가 3600 배수)"""
+        m, t = 0.0, start
+        while t < end:
+            nxt = min(end, (t // 3600 + 1) * 3600)
+            m += self.rate(t) * (nxt - t) / 3600
+            t = nxt
+        return m
+
+    def per_week(self) -> float:
+        return sum(map(sum, self.rates))
+
+    def busiest(self, n: int = 3) -> list[tuple[int, int]]:
+        cells = [(self.rates[d][h], d, h) for d in range(7) for h in range(24)]
+        return [(d, h) for _, d, h in sorted(cells, reverse=True)[:n]]
+
+_lock = threading.Lock()
+_models = {}                       # board → (만든 시각, RateModel | None)
+
+def model(board: str, now: float | None = None) -> RateModel | None:
+    now = now or time.time()
+    with _lock:
+        hit = _models.get(board)
+        if hit and now - hit[0] < MODEL_TTL:
+            return hit[1]
+    times = [row[4] for row in state.history(board, since=now - HISTORY_DAYS * 86400)]
+    m = RateModel.fit(times, now) if len(times) >= MIN_POSTS else None
+    with _lock:
+        _models[board] = (now, m)
+    return m
+
+def decide(board: str, now: float | None = None,
+           base_min: float | None = None) -> tuple[bool, float | None]:
+    """(점검할지, 마지막 점검 이후 예상 새 글 수). 모델이 없으면 기본 주기(base_min) 기준"""
+    now = now or time.time()
+    last = state.last_poll(board)
+    if last is None:
+        return True, None
+    elapsed = now - last
+    if elapsed >= MAX_GAP_H * 3600:
+        return True, None
+    m = model(board, now)
+    if m is None:
+        return (base_min is None or elapsed >= base_min * 60 - 30), None
+    expected = m.expected(last, now)
+    return 1 - math.exp(-expected) >= P_MIN, expected
+
+def due(board: str, now: float | None = None, base_min: float | None = None) -> bool:
+    """decide() 결과를 state.polls 에 남기고 점검 여부 반환"""
+    run, expected = decide(board, now, base_min)
+    state.record_poll(board, run, expected)
+    return run
+
+def select(names: list[str]) -> tuple[list[str], list[str]]:
+    """runner 용: (점검할 게시판, 건너뛸 게시판)"""
+    run, skip = [], []
+    for name in names:
+        (run if due(name) else skip).append(name)
+    return run, skip
+
+# ── 리포트 ──────────────────────────────────────────────────
+def report(days: float = 7.0) -> dict[str, dict]:
+    """게시판별 점검/건너뜀 수, 늦게 받았을 예상 글 수, 그 지연(글·분)
+    건너뛴 판단의 expected 는 '마지막 점검 이후 누적'이라 직전 판단과의 차이만 더함"""
+    out = {}
+    rows = state.polls(since=time.time() - days * 86400)
+    for i, (board, at, ran, expected) in enumerate(rows):
+        r = out.setdefault(board, {"ran": 0, "skipped": 0, "late_posts": 0.0, "late_min": 0.0})
+        if ran:
+            r["ran"] += 1
+            continue
+        r["skipped"] += 1
+        prev = rows[i - 1] if i else None
+        inc = expected or 0.0
+        if prev and prev[0] == board and not prev[2]:
+            inc -= prev[3] or 0.0
+        nxt = next((row[1] for row in rows[i + 1:] if row[0] == board and row[2]), time.time())
+        r["late_posts"] += max(inc, 0.0)
+        r["late_min"] += max(inc, 0.0) * (nxt - at) / 60
+    return out
+
+DOW = "월화수목금토일"
+
+def main():
+    args = sys.argv[1:]
+    days = float(args[1]) if args[:1] == ["-d"] else 7.0
+    boards = sorted({row[0] for row in state.history(since=time.time() - HISTORY_DAYS * 86400)})
+    print("── 게시 빈도 모델 ─────────────────────")
+    for board in boards:
+        m = model(board)
+        if m is None:
+            print(f"📉 {board:<8} 이력 부족 (<{MIN_POSTS}건) – 기본 주기")
+            continue
+        peak = ", ".join(f"{DOW[d]} {h:02d}시" for d, h in m.busiest())
+        print(f"📈 {board:<8} 주당 {m.per_week():5.1f}건  ({m.posts}건/{m.weeks:.1f}주)  많은 시간: {peak}")
+
+    print(f"── 최근 {days:g}일 점검 ──────────────────────")
+    for board, r in sorted(report(days).items()):
+        total = r["ran"] + r["skipped"]
+        saved = r["skipped"] / total * 100 if total else 0
+        print(f"🚦 {board:<8} 점검 {r['ran']:4d}  건너뜀 {r['skipped']:4d} ({saved:3.0f}%)  "
+              f"늦게 받은 예상 글 {r['late_posts']:5.2f}건 · 지연 {r['late_min']:7.1f}글·분")
+
+if __name__ == "__main__":
+    main()
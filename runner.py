@@ -0,0 +1,103 @@
+# runner.py ─ 모든 게시판 봇을 한 프로세스에서 동시에 실행
+# • 각 봇 모듈(*_bot.py)을 import 해 main()을 스레드로 병렬 실행
+#   → 전체 점검 시간 ≈ 가장 느린 게시판 하나의 시간
+# • 게시판별 상태는 각 봇이 state.db(state 모듈)에 그대로 관리
+# • 한 게시판이 예외/시크릿 누락으로 죽어도 나머지는 계속 진행
+# • 끝나면 게시판별 결과와 호스트별 요청 통계(http_client) 출력
+# • 사용법
+#     python runner.py              # 전체 게시판
+#     python runner.py ee sw        # 일부만
+# • 환경
+#     RUN_BOARDS       실행할 게시판 (공백 구분, 인자가 없을 때만). runner.yml 이 cron 별로 지정
+#     RUN_BUDGET_SEC   전체 실행 상한(초). 기본 100
+#     BOT_BUDGET_SEC   게시판 하나의 fetch → send 예산(초). 기본 80 (http_client.Deadline)
+#     BOT_TRACE        단계별 구간 기록(JSONL) 파일 (tracing.py)
+#     BOT_PROFILE      게시판별 cProfile · tracemalloc 결과 디렉터리 (게시판을 차례로 실행)
+#     BOT_POLL_GATE    1 이면 게시 빈도 모델(poll_gate.py)로 이번에 점검할 게시판만 고름
+#                      (게시판을 직접 지정하면 게이트 없이 모두 실행)
+
+import os, sys, time, threading, importlib, traceback
+import http_client, tracing, poll_gate
+
+# 게시판 이름 → 봇 모듈
+BOARDS = {
+    "notice":  "notice_bot",
+    "sw":      "sw_bot",
+    "me":      "me_bot",
+    "mse":     "materials_bot",
+    "chemeng": "chemeng_bot",
+    "ee":      "ee_bot",
+    "infocom": "infocom_bot",
+    "np":      "np_bot",
+}
+
+BUDGET_SEC = float(os.getenv("RUN_BUDGET_SEC", "100"))
+
+# 게시판 하나 실행. 결과는 results[name] = (상태, 소요초)
+# module 을 주면 BOARDS 대신 그 모듈 (daemon 의 날씨 봇 등)
+def run_board(name: str, results: dict, module: str | None = None):
+    t0 = time.monotonic()
+    try:
+        mod = importlib.import_module(module or BOARDS[name])
+        # 게시판별 프로파일 (BOT_PROFILE 이면 프로파일러가 하나뿐이라 게시판이 차례로 실행)
+        with tracing.profiled(name), tracing.span("run", name):
+            mod.main()
+        status = "ok"
+    except SystemExit as e:
+        status = f"exit: {e.code}" if e.code not in (None, 0) else "ok"
+    except Exception:
+        traceback.print_exc()
+        status = "error"
+    results[name] = (status, time.monotonic() - t0)
+
+def run_all(names: list[str], budget: float = BUDGET_SEC) -> dict:
+    """names 게시판을 동시에 실행하고 budget 초 안에 끝난 결과를 반환"""
+    results = {}
+    threads = []
+    for name in names:
+        # daemon 스레드: 예산 초과 시 프로세스 종료와 함께 정리
+        t = threading.Thread(target=run_board, args=(name, results),
+                             name=f"board-{name}", daemon=True)
+        t.start()
+        threads.append(t)
+
+    deadline = time.monotonic() + budget
+    for t in threads:
+        t.join(max(0.0, deadline - time.monotonic()))
+
+    for name in names:
+        results.setdefault(name, ("timeout", budget))
+    return results
+
+def main():
+    names = sys.argv[1:] or os.getenv("RUN_BOARDS", "").split() or list(BOARDS)
+    unknown = [n for n in names if n not in BOARDS]
+    if unknown:
+        sys.exit(f"❌ 알 수 없는 게시판: {', '.join(unknown)} (가능: {', '.join(BOARDS)})")
+    skipped = []
+    if poll_gate.ENABLED and not sys.argv[1:]:
+        names, skipped = poll_gate.select(names)
+
+    t0 = time.monotonic()
+    # 프로파일 중에는 게시판이 차례로 실행되므로 예산도 게시판 수만큼
+    results = run_all(names, BUDGET_SEC * (len(names) if tracing.PROFILE_DIR else 1))
+
+    print("── 실행 요약 ──────────────────────────")
+    for name in names:
+        status, sec = results[name]
+        mark = "✅" if status == "ok" else "🚫"
+        print(f"{mark} {name:<8} {status:<12} {sec:6.1f}s")
+    for name in skipped:
+        print(f"⏭ {name:<8} 건너뜀 (새 글 가능성 낮음)")
+    print(f"⏱ 전체 {time.monotonic() - t0:.1f}s")
+
+    print("── 호스트별 요청 ──────────────────────")
+    for host, s in sorted(http_client.summary().items()):
+        print(f"🌐 {host:<40} {s['requests']:3d}회 실패 {s['errors']:2d} hedge {s['hedged']:2d} "
+              f"p50 {s['p50']:5.2f}s max {s['max']:5.2f}s {s['bytes'] / 1024:7.0f} KiB")
+
+    if any(status != "ok" for status, _ in results.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
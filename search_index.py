@@ -0,0 +1,186 @@
+# search_index.py ─ 봇이 본 모든 공지의 전문 검색 색인 (SQLite FTS5, trigram)
+# • notices      : (게시판, id) 하나당 한 행 ─ 제목 · 링크 · 본문(있으면) · 처음 본 시각
+# • notices_fts  : 제목·본문 FTS5 색인 (external content, 트리거로 자동 동기화)
+#   trigram 토크나이저 → 띄어쓰기·조사와 상관없이 한국어 부분 문자열 검색
+# • 봇은 목록에서 본 글을 add() 로 넘기기만 하면 됨 (이미 있는 글은 바뀐 경우만 갱신)
+# • 처음 만들 때 state.db 의 전송 이력(제목·링크)을 가져와 채움
+# • 색인 실패는 경고만 하고 봇 실행은 그대로 진행
+# • 검색
+#     python search_index.py 장학금 마감         # 모든 게시판에서 순위순
+#     python search_index.py -b ee -n 5 캡스톤   # 게시판 · 개수 제한
+#   3글자 이상 단어는 FTS5(bm25, 제목 가중치 10), 1–2글자 단어는 LIKE 로 거름
+# 환경
+#   BOT_SEARCH_DB   색인 파일. 기본 cache/search.db ("0" 이면 색인 끔)
+
+import os, sys, time, sqlite3, threading
+import datetime as dt
+import state
+
+DB_FILE = os.getenv("BOT_SEARCH_DB", os.path.join(os.getenv("BOT_CACHE_DIR", "cache"), "search.db"))
+ENABLED = DB_FILE not in ("", "0")
+TITLE_WEIGHT = 10.0
+MIN_TRIGRAM  = 3                   # 이보다 짧은 검색어는 trigram 이 없어 LIKE 로
+
+KST = dt.timezone(dt.timedelta(hours=9))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notices (
+    id      INTEGER PRIMARY KEY,
+    board   TEXT NOT NULL,
+    nid     TEXT NOT NULL,
+    title   TEXT,
+    link    TEXT,
+    body    TEXT,
+    seen_at REAL NOT NULL,
+    UNIQUE (board, nid)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS notices_fts USING fts5(
+    title, body, content='notices', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS notices_ai AFTER INSERT ON notices BEGIN
+    INSERT INTO notices_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS notices_ad AFTER DELETE ON notices BEGIN
+    INSERT INTO notices_fts (notices_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+END;
+CREATE TRIGGER IF NOT EXISTS notices_au AFTER UPDATE ON notices BEGIN
+    INSERT INTO notices_fts (notices_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body);
+    INSERT INTO notices_fts (rowid, title, body) VALUES (new.id, new.title, new.body);
+END;
+"""
+
+# 새 글은 추가, 있던 글은 제목이 바뀌었거나 새 본문이 생겼을 때만 갱신 (처음 본 시각은 유지)
+UPSERT = """
+INSERT INTO notices (board, nid, title, link, body, seen_at) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (board, nid) DO UPDATE SET
+    title = excluded.title,
+    link  = excluded.link,
+    body  = COALESCE(excluded.body, notices.body)
+WHERE notices.title IS NOT excluded.title
+   OR (excluded.body IS NOT NULL AND notices.body IS NOT excluded.body)
+"""
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_ready = False
+_broken = False                    # FTS5/trigram 미지원 등 → 이번 실행은 색인 생략
+
+def conn() -> sqlite3.Connection:
+    """현재 스레드의 색인 DB 연결 (처음이면 스키마 생성·전송 이력 가져오기)"""
+    global _ready
+    c = getattr(_local, "conn", None)
+    if c is None:
+        os.makedirs(os.path.dirname(DB_FILE) or ".", exist_ok=True)
+        c = sqlite3.connect(DB_FILE, timeout=30, isolation_level=None)
+        c.execute("PRAGMA journal_mode=WAL")
+        c.execute("PRAGMA synchronous=NORMAL")
+        _local.conn = c
+    if not _ready:
+        with _init_lock:
+            if not _ready:
+                c.executescript(SCHEMA)
+                backfill(c)
+                _ready = True
+    return c
+
+def backfill(c: sqlite3.Connection):
+    """색인이 비어 있으면 state.db 전송 이력으로 채움"""
+    if c.execute("SELECT 1 FROM notices LIMIT 1").fetchone():
+        return
+    rows = state.history()
+    if not rows:
+        return
+    c.execute("BEGIN IMMEDIATE")
+    c.executemany("INSERT OR IGNORE INTO notices (board, nid, title, link, body, seen_at) "
+                  "VALUES (?, ?, ?, ?, NULL, ?)", rows)
+    c.execute("COMMIT")
+    print(f"🔎 검색 색인 초기화: 전송 이력 {len(rows)}건")
+
+def add(board: str, rows) -> int:
+    """본 글 [(id, 제목, 링크)] 또는 [(id, 제목, 링크, 본문)] 을 색인에 반영. 바뀐 행 수 반환"""
+    global _broken
+    if not ENABLED or _broken or not rows:
+        return 0
+    now = time.time()
+    params = [(board, str(r[0]), r[1], r[2], (r[3] or None) if len(r) > 3 else None, now)
+              for r in rows]
+    try:
+        c = conn()
+        before = c.total_changes
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            c.executemany(UPSERT, params)
+        except BaseException:
+            c.execute("ROLLBACK")
+            raise
+        c.execute("COMMIT")
+        # 트리거가 바꾼 FTS 행은 빼고 notices 행만 (행마다 트리거 1–2회)
+        return min(len(params), c.total_changes - before)
+    except (sqlite3.Error, OSError) as e:
+        _broken = True
+        print(f"⚠️ 검색 색인 생략 – {e}")
+        return 0
+
+# ── 검색 ────────────────────────────────────────────────────
+def _like(term: str) -> str:
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+def search(query: str, board: str | None = None, limit: int = 20) -> list[tuple]:
+    """[(게시판, id, 제목, 링크, 처음 본 시각, 미리보기)] 관련도순
+    3글자 이상 단어는 모두 FTS5 로(AND), 짧은 단어는 제목·본문 LIKE 로 거름"""
+    terms = query.split()
+    long_ = [t for t in terms if len(t) >= MIN_TRIGRAM]
+    short = [t for t in terms if len(t) < MIN_TRIGRAM]
+    args = []
+    if long_:
+        sql = ("SELECT n.board, n.nid, n.title, n.link, n.seen_at, "
+               "COALESCE(snippet(notices_fts, 1, '[', ']', '…', 12), ''), "
+               f"bm25(notices_fts, {TITLE_WEIGHT}, 1.0) AS score "
+               "FROM notices_fts JOIN notices n ON n.id = notices_fts.rowid "
+               "WHERE notices_fts MATCH ?")
+        args.append(" AND ".join('"' + t.replace('"', '""') + '"' for t in long_))
+    elif short:
+        # 짧은 단어뿐이면 제목에 들어 있는 글을 먼저, 그다음 최근 순
+        sql = ("SELECT n.board, n.nid, n.title, n.link, n.seen_at, substr(COALESCE(n.body, ''), 1, 60), "
+               "CASE WHEN n.title LIKE ? ESCAPE '\\' THEN 0 ELSE 1 END AS score "
+               "FROM notices n WHERE 1")
+        args.append(_like(short[0]))
+    else:
+        return []
+    for t in short:
+        sql += " AND (n.title LIKE ? ESCAPE '\\' OR n.body LIKE ? ESCAPE '\\')"
+        args += [_like(t), _like(t)]
+    if board:
+        sql += " AND n.board = ?"
+        args.append(board)
+    sql += " ORDER BY score, n.seen_at DESC LIMIT ?"
+    args.append(limit)
+    return [row[:6] for row in conn().execute(sql, args)]
+
+def main():
+    args = sys.argv[1:]
+    board, limit = None, 20
+    while args[:1] and args[0] in ("-b", "-n"):
+        if args[0] == "-b":
+            board = args[1]
+        else:
+            limit = int(args[1])
+        args = args[2:]
+    if not args:
+        sys.exit("사용법: python search_index.py [-b 게시판] [-n 개수] 검색어 …")
+    if not ENABLED:
+        sys.exit("❌ BOT_SEARCH_DB=0 – 검색 색인이 꺼져 있습니다")
+
+    t0 = time.perf_counter()
+    rows = search(" ".join(args), board, limit)
+    ms = (time.perf_counter() - t0) * 1000
+    for b, nid, title, link, seen_at, preview in rows:
+        day = dt.datetime.fromtimestamp(seen_at, KST).strftime("%Y-%m-%d")
+        print(f"📄 [{b}] {day}  {title}\n    {link}")
+        if preview and preview.strip():
+            print(f"    {preview.strip()}")
+    total = conn().execute("SELECT COUNT(*) FROM notices").fetchone()[0]
+    print(f"🔎 {len(rows)}건 / 전체 {total}건 · {ms:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# seen_store.py ─ 게시판별 '이미 본 글 id' 집합 (state.db 의 seen 테이블)
+# • 최대 MAX_IDS개만 보관(오래된 것부터 버림), 포함 여부는 dict 기반 O(1)
+# • new_rows()로 목록 전체와 비교해 안 본 글을 모두 골라냄
+#   → 한 주기에 글이 여러 개 올라와도 빠짐없이 전송
+# • 예전 last_*_id.txt 는 state 모듈이 처음 열 때 자동 이전
+
+import state
+
+MAX_IDS = 300
+
+class SeenIds:
+    def __init__(self, board: str):
+        self.board = board
+        self._ids = dict.fromkeys(state.seen_ids(board))   # 삽입 순서 = 본 순서
+        self._new = []
+
+    def __contains__(self, nid) -> bool:
+        return nid in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, nid: str):
+        self._ids.pop(nid, None)
+        self._ids[nid] = None
+        self._new.append(nid)
+
+    def save(self):
+        if self._new:
+            state.add_seen(self.board, self._new, MAX_IDS)
+            self._new = []
+
+    def mark_sent(self, nid: str, title: str, link: str):
+        """전송 완료: 본 글 추가 + 마지막 id·전송 이력을 한 트랜잭션으로 저장"""
+        self._ids.pop(nid, None)
+        self._ids[nid] = None
+        state.add_seen(self.board, self._new + [nid], MAX_IDS, sent=(nid, title, link))
+        self._new = []
+
+def load(board: str) -> SeenIds:
+    return SeenIds(board)
+
+def new_rows(rows: list, seen: SeenIds) -> list:
+    """rows: 목록의 글 [(id, …)] 최신 → 과거 순.
+    전송할 새 글을 오래된 것부터 반환"""
+    if not seen:
+        # 첫 실행: 예전처럼 최신 1건만
+        new = rows[:1]
+    elif len(seen) == 1:
+        # 예전 형식(마지막 id 하나): 그 글보다 위에 있는 글만 새 글
+        new = []
+        for row in rows:
+            if row[0] in seen:
+                break
+            new.append(row)
+    else:
+        new = [row for row in rows if row[0] not in seen]
+    return list(reversed(new))
+
+def mark_old(rows: list, seen: SeenIds, new: list):
+    """전송 대상이 아닌 목록 글을 '본 것'으로 기록 (첫 실행·예전 형식 이전용)"""
+    skip = {row[0] for row in new}
+    for row in reversed(rows):
+        if row[0] not in skip and row[0] not in seen:
+            seen.add(row[0])
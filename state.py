@@ -0,0 +1,254 @@
+# state.py ─ 모든 게시판이 함께 쓰는 상태 저장소 (SQLite, WAL 모드)
+# • board_state : 게시판별 마지막 전송 id (compare-and-set 으로 갱신)
+# • seen        : 게시판별 '이미 본 글 id' 집합 (seen_store 가 사용)
+# • delivered   : 전송 이력 (게시판, id, 제목, 링크, 시각)
+# • polls       : 점검 게이트(poll_gate) 판단 기록 (게시판, 시각, 실행 여부, 예상 새 글 수)
+# • catchup     : 끝나지 못한 밀린 글 따라잡기의 이어 받을 위치 (그때 받은 가장 오래된 글 id)
+# • 처음 열 때 예전 last_*_id.txt 파일을 읽어 자동 이전
+# • 스레드마다 연결 하나. 쓰기는 BEGIN IMMEDIATE 트랜잭션이라
+#   runner 처럼 여러 게시판이 동시에 갱신해도 안전
+# 환경
+#   BOT_STATE_DB   DB 파일 경로. 기본 state.db
+
+import os, time, sqlite3, threading, atexit
+from contextlib import contextmanager
+
+DB_FILE = os.getenv("BOT_STATE_DB", "state.db")
+
+# 예전 상태 파일 → 게시판
+LEGACY_FILES = {
+    "notice":  "last_notice_id.txt",
+    "sw":      "last_sw_id.txt",
+    "me":      "last_me_id.txt",
+    "mse":     "last_mse_id.txt",
+    "chemeng": "last_chemeng_id.txt",
+    "ee":      "last_ee_id.txt",
+    "infocom": "last_infocom_id.txt",
+    "np":      "last_np_id.txt",
+}
+# 파일 한 줄 = 본 글 id 하나인 게시판 (seen_store 방식)
+SEEN_BOARDS = {"sw", "me", "mse", "chemeng", "ee"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS board_state (
+    board      TEXT PRIMARY KEY,
+    last_id    TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS seen (
+    board   TEXT NOT NULL,
+    nid     TEXT NOT NULL,
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (board, nid)
+);
+CREATE TABLE IF NOT EXISTS delivered (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    board        TEXT NOT NULL,
+    nid          TEXT NOT NULL,
+    title        TEXT,
+    link         TEXT,
+    delivered_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS delivered_board_at ON delivered (board, delivered_at);
+CREATE TABLE IF NOT EXISTS polls (
+    board    TEXT NOT NULL,
+    at       REAL NOT NULL,
+    ran      INTEGER NOT NULL,
+    expected REAL
+);
+CREATE INDEX IF NOT EXISTS polls_board_at ON polls (board, at);
+CREATE TABLE IF NOT EXISTS catchup (
+    board      TEXT PRIMARY KEY,
+    after_id   TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_ready = False
+
+def conn() -> sqlite3.Connection:
+    """현재 스레드의 DB 연결 (처음이면 스키마 생성·이전까지)"""
+    global _ready
+    c = getattr(_local, "conn", None)
+    if c is None:
+        c = sqlite3.connect(DB_FILE, timeout=30, isolation_level=None)
+        c.execute("PRAGMA journal_mode=WAL")
+        c.execute("PRAGMA synchronous=NORMAL")
+        _local.conn = c
+    if not _ready:
+        with _init_lock:
+            if not _ready:
+                c.executescript(SCHEMA)
+                migrate(c)
+                _ready = True
+    return c
+
+@contextmanager
+def tx():
+    """쓰기 트랜잭션. 시작할 때 쓰기 잠금을 잡아 다른 쓰기와 직렬화"""
+    c = conn()
+    c.execute("BEGIN IMMEDIATE")
+    try:
+        yield c
+    except BaseException:
+        c.execute("ROLLBACK")
+        raise
+    c.execute("COMMIT")
+
+# ── 이전: last_*_id.txt → DB (게시판 행이 아직 없을 때만) ──────
+def migrate(c: sqlite3.Connection):
+    now = time.time()
+    for board, path in LEGACY_FILES.items():
+        if not os.path.exists(path):
+            continue
+        if c.execute("SELECT 1 FROM board_state WHERE board=?", (board,)).fetchone():
+            continue
+        with open(path, encoding="utf-8") as f:
+            lines = [ln.strip() for ln in f if ln.strip()]
+        if not lines:
+            continue
+        c.execute("BEGIN IMMEDIATE")
+        if board in SEEN_BOARDS:
+            # 파일 순서(오래된 것 → 최근 것)를 seen_at 순서로 보존
+            c.executemany(
+                "INSERT OR IGNORE INTO seen (board, nid, seen_at) VALUES (?, ?, ?)",
+                [(board, nid, now - len(lines) + i) for i, nid in enumerate(lines)])
+        c.execute("INSERT INTO board_state (board, last_id, updated_at) VALUES (?, ?, ?)",
+                  (board, lines[-1], now))
+        c.execute("COMMIT")
+        print(f"📦 상태 이전: {path} → {DB_FILE} ({board})")
+
+# ── 마지막 id ────────────────────────────────────────────────
+def get_last(board: str) -> str | None:
+    row = conn().execute("SELECT last_id FROM board_state WHERE board=?", (board,)).fetchone()
+    return row[0] if row else None
+
+def read_all() -> dict[str, str | None]:
+    """모든 게시판의 마지막 id를 한 번에"""
+    return dict(conn().execute("SELECT board, last_id FROM board_state"))
+
+def set_last(board: str, nid: str):
+    with tx() as c:
+        c.execute("INSERT INTO board_state (board, last_id, updated_at) VALUES (?, ?, ?) "
+                  "ON CONFLICT(board) DO UPDATE SET last_id=excluded.last_id, updated_at=excluded.updated_at",
+                  (board, nid, time.time()))
+
+def _cas(c: sqlite3.Connection, board: str, expected: str | None, new: str) -> bool:
+    now = time.time()
+    cur = c.execute("UPDATE board_state SET last_id=?, updated_at=? WHERE board=? AND last_id IS ?",
+                    (new, now, board, expected))
+    if cur.rowcount:
+        return True
+    if expected is None:
+        cur = c.execute("INSERT OR IGNORE INTO board_state (board, last_id, updated_at) VALUES (?, ?, ?)",
+                        (board, new, now))
+        return bool(cur.rowcount)
+    return False
+
+def cas_last(board: str, expected: str | None, new: str) -> bool:
+    """마지막 id가 expected 일 때만 new 로 바꾼다. 바꿨으면 True"""
+    with tx() as c:
+        return _cas(c, board, expected, new)
+
+def advance(board: str, expected: str | None, nid: str, title: str | None = None,
+            link: str | None = None) -> bool:
+    """전송 완료 기록: 마지막 id compare-and-set + 이력 추가를 한 트랜잭션으로"""
+    with tx() as c:
+        if not _cas(c, board, expected, nid):
+            return False
+        _record(c, board, nid, title, link)
+        return True
+
+# ── 전송 이력 ────────────────────────────────────────────────
+def _record(c, board, nid, title, link):
+    c.execute("INSERT INTO delivered (board, nid, title, link, delivered_at) VALUES (?, ?, ?, ?, ?)",
+              (board, nid, title, link, time.time()))
+
+def record_delivery(board: str, nid: str, title: str | None = None, link: str | None = None):
+    with tx() as c:
+        _record(c, board, nid, title, link)
+
+def history(board: str | None = None, since: float = 0.0) -> list[tuple]:
+    """전송 이력 [(board, id, 제목, 링크, 시각)] 시간순"""
+    sql = "SELECT board, nid, title, link, delivered_at FROM delivered WHERE delivered_at >= ?"
+    args = [since]
+    if board:
+        sql += " AND board = ?"
+        args.append(board)
+    return conn().execute(sql + " ORDER BY delivered_at", args).fetchall()
+
+# ── 점검 기록 ────────────────────────────────────────────────
+POLL_KEEP_SEC = 90 * 86400          # 이보다 오래된 점검 기록은 버림
+
+def record_poll(board: str, ran: bool, expected: float | None = None):
+    now = time.time()
+    with tx() as c:
+        c.execute("INSERT INTO polls (board, at, ran, expected) VALUES (?, ?, ?, ?)",
+                  (board, now, int(ran), expected))
+        c.execute("DELETE FROM polls WHERE board=? AND at < ?", (board, now - POLL_KEEP_SEC))
+
+def last_poll(board: str) -> float | None:
+    """마지막으로 실제 점검한 시각"""
+    row = conn().execute("SELECT MAX(at) FROM polls WHERE board=? AND ran=1", (board,)).fetchone()
+    return row[0]
+
+def polls(board: str | None = None, since: float = 0.0) -> list[tuple]:
+    """점검 기록 [(board, 시각, 실행 여부, 예상 새 글 수)] 시간순"""
+    sql = "SELECT board, at, ran, expected FROM polls WHERE at >= ?"
+    args = [since]
+    if board:
+        sql += " AND board = ?"
+        args.append(board)
+    return conn().execute(sql + " ORDER BY board, at", args).fetchall()
+
+# ── 본 글 집합 ───────────────────────────────────────────────
+def seen_ids(board: str) -> list[str]:
+    """본 글 id 오래된 것 → 최근 것 순"""
+    rows = conn().execute("SELECT nid FROM seen WHERE board=? ORDER BY seen_at", (board,))
+    return [r[0] for r in rows]
+
+def add_seen(board: str, nids: list[str], cap: int, sent: tuple | None = None):
+    """nids 를 본 글로 추가하고 최근 cap개만 남긴다.
+    sent=(id, 제목, 링크) 이면 마지막 id·전송 이력도 같은 트랜잭션에서 갱신"""
+    now = time.time()
+    with tx() as c:
+        c.executemany("INSERT OR REPLACE INTO seen (board, nid, seen_at) VALUES (?, ?, ?)",
+                      [(board, nid, now + i * 1e-6) for i, nid in enumerate(nids)])
+        c.execute("DELETE FROM seen WHERE board=? AND nid NOT IN "
+                  "(SELECT nid FROM seen WHERE board=? ORDER BY seen_at DESC LIMIT ?)",
+                  (board, board, cap))
+        if sent:
+            nid, title, link = sent
+            c.execute("INSERT INTO board_state (board, last_id, updated_at) VALUES (?, ?, ?) "
+                      "ON CONFLICT(board) DO UPDATE SET last_id=excluded.last_id, updated_at=excluded.updated_at",
+                      (board, nid, now))
+            _record(c, board, nid, title, link)
+
+# ── 밀린 글 따라잡기 이어 받기 ──────────────────────────────────
+def catchup_after(board: str) -> str | None:
+    """지난 따라잡기가 끝나지 못했으면 그때 받은 가장 오래된 글 id"""
+    row = conn().execute("SELECT after_id FROM catchup WHERE board=?", (board,)).fetchone()
+    return row[0] if row else None
+
+def set_catchup_after(board: str, nid: str | None):
+    """이어 받을 위치 저장. None 이면 지움 (따라잡기 완료)"""
+    with tx() as c:
+        if nid is None:
+            c.execute("DELETE FROM catchup WHERE board=?", (board,))
+        else:
+            c.execute("INSERT OR REPLACE INTO catchup (board, after_id, updated_at) VALUES (?, ?, ?)",
+                      (board, nid, time.time()))
+
+# ── 종료 시 WAL 을 본 파일에 합쳐 state.db 하나만 커밋되게 ─────
+@atexit.register
+def checkpoint():
+    if not _ready:
+        return
+    try:
+        c = sqlite3.connect(DB_FILE, timeout=30)
+        c.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        c.close()
+    except sqlite3.Error:
+        pass
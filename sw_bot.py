@@ -1,24 +1,38 @@
-# sw_bot.py – 날짜 기준으로 최신 글 판단 + 중복 알림 방지
-import os, re, sys, requests
-from bs4 import BeautifulSoup
+# sw_bot.py – 날짜 기준으로 목록 정렬 + 본 글 ID 목록으로 새 글 모두 전송
+import os, re, sys
+from html_parse import make_soup, ROWS
 from datetime import datetime
+import page_cache, catchup, delivery, tracing, list_bot
 
 WEBHOOK  = os.getenv("DISCORD_WEBHOOK_SW")
 LIST_URL = "https://sw.ssu.ac.kr/bbs/board.php?bo_table=notice"
-ID_FILE  = "last_sw_id.txt"
+BOARD    = "sw"                                  # page_cache · state 키
 
 def parse_date(td_text: str) -> datetime:
     """게시판 날짜 문자열(YYYY-MM-DD) → datetime 객체"""
     return datetime.strptime(td_text.strip(), "%Y-%m-%d")
 
-def get_latest():
-    """표 전체에서 날짜가 가장 최근인 글 1건을 반환"""
-    html = requests.get(LIST_URL, timeout=10).text
-    soup = BeautifulSoup(html, "html.parser")
-
-    latest = None
-    latest_dt = datetime.min
-
+def fetch_html(deadline=None):
+    """목록 HTML. 지난번과 같으면 page_cache.UNCHANGED"""
+    r = page_cache.get(BOARD, LIST_URL, timeout=10, deadline=deadline)
+    if r is page_cache.UNCHANGED:
+        return r
+    with tracing.span("decode", BOARD, bytes=len(r.content)):
+        return r.text
+
+def is_pinned(tr) -> bool:
+    """고정 공지 행 (그누보드 bo_notice · 번호 칸 '공지')"""
+    if "bo_notice" in (tr.get("class") or []):
+        return True
+    num = tr.find("td")
+    return bool(num) and num.get_text(strip=True) == "공지"
+
+def parse_notices(html: str) -> list:
+    """표 전체의 글 [(wr_id, 제목, 링크)] 날짜 최신 → 과거 순 (같은 날짜는 목록 순서)
+    고정 공지도 포함하되 catchup.Pinned 로 표시"""
+    soup = make_soup(html, ROWS)             # 표의 행만 파싱
+
+    dated = []
     for tr in soup.select("tr"):
         # 날짜 셀 찾기 (td에 'date'가 포함된 클래스)
         date_td = tr.find("td", class_=lambda c: c and "date" in c)
@@ -30,50 +44,43 @@ def get_latest():
             cur_dt = parse_date(date_td.get_text())
         except ValueError:
             continue
+        dated.append((cur_dt, link_a, is_pinned(tr)))
+    dated.sort(key=lambda x: x[0], reverse=True)
+
+    rows, ids = [], set()
+    for _, a, pinned in dated:
+        link = a["href"]
+        if link.startswith("/"):
+            link = "https://sw.ssu.ac.kr" + link
+        title = a.get_text(strip=True)
+        wr_id = re.search(r"wr_id=(\d+)", link).group(1)
+        if wr_id in ids:
+            continue
+        ids.add(wr_id)
+        row = (wr_id, title, link)
+        rows.append(catchup.Pinned(row) if pinned else row)
+    return rows
 
-        if cur_dt >= latest_dt:          # 최신 날짜 갱신
-            latest_dt = cur_dt
-            latest    = link_a
-
-    if not latest:
-        return None, None, None
-
-    link = latest["href"]
-    if link.startswith("/"):
-        link = "https://sw.ssu.ac.kr" + link
-    title = latest.get_text(strip=True)
-    wr_id = re.search(r"wr_id=(\d+)", link).group(1)
-    return wr_id, title, link
+def page_url(n: int) -> str:
+    """목록 n페이지 주소 (밀린 글 따라잡기용)"""
+    return f"{LIST_URL}&page={n}"
 
-def read_last():
-    try:
-        return open(ID_FILE).read().strip()
-    except FileNotFoundError:
-        return None
+fetch_page = catchup.page_fetcher(BOARD, page_url, lambda r: r.text, parse_notices,
+                                  timeout=10)
 
-def write_last(wid: str):
-    with open(ID_FILE, "w") as f:
-        f.write(wid)
+def get_notices(deadline=None):
+    """목록 글 전체. 실패 시 None, 목록이 지난번과 같으면 []"""
+    return list_bot.get_notices(BOARD, fetch_html, parse_notices, deadline)
 
-def send(msg: str):
-    requests.post(WEBHOOK, json={"content": msg}, timeout=10)
+def send(rows, deadline=None) -> int:
+    """새 글 [(id, 제목, 링크)]을 묶어 전송. 확인된 글 수 반환"""
+    return delivery.deliver(WEBHOOK, "📝 **소프트웨어학부 새 공지**",
+                            [delivery.embed(title, link) for _, title, link in rows], deadline)
 
 def main():
     if not WEBHOOK:
         sys.exit("❌ DISCORD_WEBHOOK_SW 시크릿이 없습니다")
-
-    wid, title, link = get_latest()
-    if not wid:
-        print("❌ 최신 글 파싱 실패")
-        return
-
-    if wid == read_last():
-        print("⏸  새 글 없음")
-        return
-
-    send(f"📝 **소프트웨어학부 새 공지**\n{title}\n{link}")
-    write_last(wid)
-    print("✅ 새 공지 전송 완료")
+    list_bot.run(BOARD, get_notices, fetch_page, send, "❌ 최신 글 파싱 실패")
 
 if __name__ == "__main__":
-    main()
+    tracing.run(main, BOARD)
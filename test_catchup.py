@@ -0,0 +1,139 @@
+# test_catchup.py ─ 밀린 글 따라잡기(catchup.collect) 겹침 판단 · 중간에 멈췄을 때 이어 받기
+# • bench_fixtures/sw.html: 1페이지 위에 고정 공지 3개(bo_notice 3120–3118) + 일반 글 3117–3101
+# • 2페이지 이후는 같은 표 형식으로 만들어 sw_bot.parse_notices 로 파싱
+#     python -m pytest -q test_catchup.py
+
+import os, datetime as dt
+import pytest
+import catchup, sw_bot
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PINNED = ["3120", "3119", "3118"]
+
+def fixture_rows() -> list:
+    with open(os.path.join(HERE, "bench_fixtures", "sw.html"), encoding="utf-8") as f:
+        return sw_bot.parse_notices(f.read())
+
+def page_html(ids: list[int], pinned: list[str] = PINNED) -> str:
+    """그누보드 목록 표 (고정 공지는 페이지마다 맨 위에 반복)"""
+    def tr(wr_id, cls, num, day):
+        return (f'<tr class="{cls}"><td class="td_num2">{num}</td><td class="td_subject">'
+                f'<a href="/bbs/board.php?bo_table=notice&amp;wr_id={wr_id}">글 {wr_id}</a></td>'
+                f'<td class="td_datetime td_date">{day}</td></tr>')
+    rows = [tr(p, "bo_notice", "공지", "2025-01-01") for p in pinned]
+    day = lambda i: dt.date(2025, 2, 11) - dt.timedelta(days=3101 - i)    # 1페이지 3101 보다 과거
+    rows += [tr(i, "", i, day(i).isoformat()) for i in ids]
+    return f"<table><tbody>{''.join(rows)}</tbody></table>"
+
+def fetcher(pages: dict[int, str], calls: list):
+    def fetch(n, deadline=None):
+        calls.append(n)
+        html = pages.get(n, page_html([], pinned=[]))
+        if html is None:
+            return None                                        # 받기 실패
+        return sw_bot.parse_notices(html), len(html)
+    return fetch
+
+def test_fixture_marks_pinned_rows():
+    rows = fixture_rows()
+    assert sorted(r[0] for r in rows if isinstance(r, catchup.Pinned)) == sorted(PINNED)
+    assert len(catchup.regular(rows)) == 17
+
+def test_pinned_rows_do_not_count_as_overlap():
+    # 장애 뒤: 고정 공지만 본 글이고 일반 글은 3090 까지만 봄
+    seen = set(PINNED) | {"3090"}
+    pages = {2: page_html(list(range(3100, 3080, -1)))}
+    calls = []
+    rows, resume = catchup.collect("sw", fixture_rows(), fetcher(pages, calls), seen.__contains__)
+    assert resume is None
+    ids = [r[0] for r in catchup.regular(rows)]
+    assert ids == [str(i) for i in range(3117, 3090, -1)]      # 3117 … 3091, 순서 유지
+    assert calls[0] == 2
+    assert "3090" not in ids
+
+def test_pinned_repeats_on_later_pages_are_not_a_stop():
+    # 2페이지 고정 공지(본 글)에서 멈추지 않고 3페이지의 본 글까지 감
+    seen = set(PINNED) | {"3075"}
+    pages = {2: page_html(list(range(3100, 3080, -1))),
+             3: page_html(list(range(3080, 3060, -1)))}
+    rows, _ = catchup.collect("sw", fixture_rows(), fetcher(pages, []), seen.__contains__)
+    ids = [r[0] for r in catchup.regular(rows)]
+    assert ids[-1] == "3076"
+    assert len(ids) == 3117 - 3076 + 1
+
+def test_known_regular_row_on_page_one_skips_catchup():
+    seen = set(PINNED) | {"3105"}
+    calls = []
+    first = fixture_rows()
+    rows, resume = catchup.collect("sw", first, fetcher({}, calls), seen.__contains__)
+    assert rows is first and resume is None
+    assert calls == []
+
+def test_only_pinned_rows_changed_skips_catchup():
+    first = [r for r in fixture_rows() if isinstance(r, catchup.Pinned)]
+    calls = []
+    rows, resume = catchup.collect("sw", first, fetcher({}, calls), lambda nid: False)
+    assert rows is first and resume is None
+    assert calls == []
+
+# ── 중간에 멈춘 따라잡기 ──────────────────────────────────────────
+GAP = {2: page_html(list(range(3100, 3080, -1))),           # 본 글 3060 은 4페이지
+       3: page_html(list(range(3080, 3060, -1))),
+       4: page_html(list(range(3060, 3040, -1)))}
+
+def test_fetch_error_returns_resume_point():
+    seen = set(PINNED) | {"3060"}
+    rows, resume = catchup.collect("sw", fixture_rows(), fetcher({**GAP, 3: None}, []),
+                                   seen.__contains__)
+    assert resume == "3081"                                  # 2페이지 마지막 글
+    assert catchup.regular(rows)[-1][0] == "3081"
+
+def test_byte_cap_returns_resume_point(monkeypatch):
+    monkeypatch.setattr(catchup, "MAX_BYTES", 1)
+    seen = set(PINNED) | {"3060"}
+    _, resume = catchup.collect("sw", fixture_rows(), fetcher(GAP, []), seen.__contains__)
+    assert resume is not None
+
+def test_resume_walks_past_known_rows_to_the_gap():
+    # 지난번에 3081 까지 받아 보냈음 → 1페이지는 겹치지만 3080 … 3061 을 마저 받음
+    seen = set(PINNED) | {str(i) for i in range(3117, 3080, -1)} | {"3060"}
+    calls = []
+    rows, resume = catchup.collect("sw", fixture_rows(), fetcher(GAP, calls),
+                                   seen.__contains__, after="3081")
+    assert resume is None
+    assert calls[:2] == [2, 3]
+    missing = [r[0] for r in catchup.regular(rows) if r[0] not in seen]
+    assert missing == [str(i) for i in range(3080, 3060, -1)]
+
+def test_resume_keeps_point_when_it_was_not_reached():
+    seen = set(PINNED) | {str(i) for i in range(3117, 3080, -1)} | {"3060"}
+    _, resume = catchup.collect("sw", fixture_rows(), fetcher({**GAP, 2: None}, []),
+                                seen.__contains__, after="3081")
+    assert resume == "3081"
+
+@pytest.fixture
+def sw_run(tmp_path, monkeypatch):
+    """list_bot.run 을 임시 state.db 로 (전송은 개수만 기록)"""
+    import state, page_cache, list_bot
+    monkeypatch.setattr(state, "DB_FILE", str(tmp_path / "state.db"))
+    monkeypatch.setattr(state, "_ready", False)
+    monkeypatch.setattr(state, "_local", type(state._local)())
+    monkeypatch.setattr(list_bot.search_index, "ENABLED", False)
+    commits, sent = [], []
+    monkeypatch.setattr(page_cache, "commit", commits.append)
+    state.add_seen("sw", PINNED + ["3060"], 300)
+    send = lambda rows, deadline=None: sent.extend(r[0] for r in rows) or len(rows)
+    return lambda pages: list_bot.run("sw", lambda d: fixture_rows(), fetcher(pages, []), send), \
+        commits, sent, state
+
+def test_run_retries_gap_after_partial_catchup(sw_run):
+    run, commits, sent, state = sw_run
+    run({**GAP, 3: None})                                     # 3페이지 실패 → 2페이지까지만
+    assert sent[-1] == "3117" and sent[0] == "3081"
+    assert commits == []                                      # 목록 지문 확정 안 함
+    assert state.catchup_after("sw") == "3081"
+
+    run(GAP)                                                  # 다음 주기: 빈 구간만
+    assert sent[20 + 17:] == [str(i) for i in range(3061, 3081)]
+    assert commits == ["sw"]
+    assert state.catchup_after("sw") is None
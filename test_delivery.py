@@ -0,0 +1,79 @@
+# test_delivery.py ─ 디스코드 웹훅 전송(delivery) ─ 로컬 웹훅 대역(conftest.stand_in)에 전송
+# • embed 10개 · 글자 수 합계 6000자 묶음
+# • 429 의 retry_after(본문) · Retry-After(헤더) 만큼 기다렸다 재시도
+# • X-RateLimit-* 버킷이 바닥나면 리셋까지 미리 대기
+# • 중간에 실패하면 앞에서부터 확인된 embed 수만 반환 (봇은 그만큼만 상태에 기록)
+#     python -m pytest -q test_delivery.py
+
+import time
+import pytest
+import delivery, http_client
+
+@pytest.fixture(autouse=True)
+def fresh_buckets():
+    delivery._hook_bucket.clear()
+    delivery._buckets.clear()
+
+def embeds(n: int, desc: int = 0) -> list[dict]:
+    return [delivery.embed(f"글 {i}", f"https://example.com/{i}", "가" * desc or None)
+            for i in range(n)]
+
+def test_pack_ten_embeds_per_message():
+    msgs = delivery.pack("📝 새 공지", embeds(23))
+    assert [len(m["embeds"]) for m in msgs] == [10, 10, 3]
+    assert all(m["content"] == "📝 새 공지" for m in msgs)
+
+def test_pack_keeps_each_message_under_6000_chars():
+    msgs = delivery.pack("h", embeds(7, desc=2500))          # 2500 + 제목 → 한 메시지에 둘
+    assert [len(m["embeds"]) for m in msgs] == [2, 2, 2, 1]
+    for m in msgs:
+        assert sum(len(e["title"]) + len(e.get("description", "")) for e in m["embeds"]) \
+            <= delivery.MAX_TOTAL
+    big = embeds(1, desc=9000)[0]                            # 설명 4096자로 자름
+    assert len(big["description"]) == delivery.MAX_DESC
+
+def test_deliver_posts_each_message_with_wait(stand_in):
+    hook = stand_in.url + "/api/webhooks/1/t"
+    assert delivery.deliver(hook, "📝 새 공지", embeds(23)) == 23
+    assert [len(c[2]["embeds"]) for c in stand_in.calls] == [10, 10, 3]
+    assert all(c[1] == {"wait": ["true"]} for c in stand_in.calls)
+    assert [e["title"] for c in stand_in.calls for e in c[2]["embeds"]] == \
+        [f"글 {i}" for i in range(23)]                       # 순서 유지
+
+@pytest.mark.parametrize("body, headers", [
+    ({"message": "rate limited", "retry_after": 0.3, "global": False}, {}),
+    (None, {"Retry-After": "0.3"}),
+])
+def test_429_waits_retry_after_then_retries(stand_in, body, headers):
+    stand_in.reply(429, body, headers)
+    assert delivery.deliver(stand_in.url + "/hook", "h", embeds(3)) == 3
+    assert len(stand_in.calls) == 2
+    assert stand_in.calls[1][3] - stand_in.calls[0][3] >= 0.3
+    assert stand_in.calls[0][2] == stand_in.calls[1][2]     # 같은 메시지를 다시
+
+def test_exhausted_bucket_waits_for_reset(stand_in):
+    stand_in.reply(200, {}, {"X-RateLimit-Bucket": "b1", "X-RateLimit-Limit": "5",
+                             "X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "0.4"})
+    assert delivery.deliver(stand_in.url + "/hook", "h", embeds(12)) == 12
+    assert len(stand_in.calls) == 2                          # 429 없이 미리 대기
+    assert stand_in.calls[1][3] - stand_in.calls[0][3] >= 0.35
+
+def test_partial_failure_returns_confirmed_count(stand_in):
+    stand_in.reply(200, {})
+    stand_in.reply(400, {"message": "Invalid Form Body", "code": 50035})
+    assert delivery.deliver(stand_in.url + "/hook", "h", embeds(23)) == 10
+    assert len(stand_in.calls) == 2                          # 실패 뒤 세 번째는 보내지 않음
+
+def test_retry_after_longer_than_budget_stops(stand_in):
+    stand_in.reply(429, {"retry_after": 5})
+    t0 = time.monotonic()
+    assert delivery.deliver(stand_in.url + "/hook", "h", embeds(3), http_client.Deadline(1)) == 0
+    assert time.monotonic() - t0 < 1
+    assert len(stand_in.calls) == 1
+
+def test_send_text_splits_at_2000_chars(stand_in):
+    text = "\n".join("가" * 900 for _ in range(5))
+    assert delivery.send_text(stand_in.url + "/hook", text)
+    sent = [c[2]["content"] for c in stand_in.calls]
+    assert all(len(s) <= delivery.MAX_CONTENT for s in sent)
+    assert "\n".join(sent) == text
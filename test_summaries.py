@@ -0,0 +1,75 @@
+# test_summaries.py ─ 학사공지 GPT 요약(notice_bot.summarize_many) ─ 로컬 완성 API 대역에 요청
+# • conftest.stand_in 이 /v1/chat/completions 에 답함 (OPENAI_BASE_URL 과 같은 경로)
+# • 캐시 키 sha256(모델 + 본문) 적중이면 다시 요청하지 않음 · SUMMARY_CACHE_MAX 넘으면 오래 안 쓴 것부터 삭제
+# • 일괄 요약 응답은 '### 번호' 로 나눔, 개수가 안 맞으면 공지마다 따로 요청
+#     python -m pytest -q test_summaries.py
+
+import re, json, hashlib
+import pytest
+from openai import OpenAI
+import notice_bot
+
+def completion(text: str) -> dict:
+    return {"id": "chatcmpl-test", "object": "chat.completion", "created": 0,
+            "model": notice_bot.GPT_MODEL,
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": text}}]}
+
+def answer(path, body):
+    """일괄 요청이면 '### n' 마다 '요약 <본문>', 한 건이면 '요약 <본문>'"""
+    prompt = body["messages"][0]["content"]
+    parts = re.split(r"^### (\d+)$", prompt, flags=re.M)
+    if len(parts) > 1:
+        return completion("".join(f"### {n}\n요약 {t.strip()}\n" for n, t in zip(parts[1::2], parts[2::2])))
+    return completion("요약 " + prompt.split("\n", 1)[1])
+
+@pytest.fixture
+def gpt(stand_in, tmp_path, monkeypatch):
+    stand_in.respond = answer
+    monkeypatch.setattr(notice_bot, "client",
+                        OpenAI(api_key="test", base_url=stand_in.url + "/v1", max_retries=0))
+    monkeypatch.setattr(notice_bot, "SUMMARY_CACHE", str(tmp_path / "summaries.json"))
+    return stand_in
+
+def cached() -> dict:
+    with open(notice_bot.SUMMARY_CACHE, encoding="utf-8") as f:
+        return json.load(f)
+
+def test_cache_hit_sends_no_second_request(gpt):
+    assert notice_bot.summarize_many(["수강신청 안내"]) == ["요약 수강신청 안내"]
+    assert len(gpt.calls) == 1 and gpt.calls[0][0] == "/v1/chat/completions"
+    key = hashlib.sha256(f"{notice_bot.GPT_MODEL}\n수강신청 안내".encode()).hexdigest()
+    assert cached() == {key: "요약 수강신청 안내"}
+
+    assert notice_bot.summarize_many(["수강신청 안내", ""]) == ["요약 수강신청 안내", ""]
+    assert len(gpt.calls) == 1
+
+def test_cache_keeps_most_recently_used(gpt, monkeypatch):
+    monkeypatch.setattr(notice_bot, "SUMMARY_CACHE_MAX", 3)
+    key = lambda t: notice_bot.summary_key(t)
+    notice_bot.summarize_many(["가", "나", "다"])
+    notice_bot.summarize_many(["가"])                       # 적중 → 최근 사용으로
+    notice_bot.summarize_many(["라"])                       # 넘침 → 가장 오래된 "나" 삭제
+    assert list(cached()) == [key("다"), key("가"), key("라")]
+    n = len(gpt.calls)
+    notice_bot.summarize_many(["나"])
+    assert len(gpt.calls) == n + 1
+
+def test_batch_reply_is_split_on_markers(gpt):
+    txts = ["장학금 신청", "휴학 기간", "졸업 논문"]
+    assert notice_bot.summarize_many(txts) == [f"요약 {t}" for t in txts]
+    assert len(gpt.calls) == 1                              # BATCH_CHARS 안 → 한 번에
+    assert "### 3\n졸업 논문" in gpt.calls[0][2]["messages"][0]["content"]
+
+def test_batch_count_mismatch_falls_back_per_notice(gpt):
+    gpt.reply(200, completion("### 1\n요약 하나뿐\n"))
+    txts = ["장학금 신청", "휴학 기간", "졸업 논문"]
+    assert notice_bot.summarize_many(txts) == [f"요약 {t}" for t in txts]
+    assert len(gpt.calls) == 1 + len(txts)
+    assert [c[2]["messages"][0]["content"].split("\n", 1)[1] for c in gpt.calls[1:]] == txts
+
+def test_batches_split_by_chars(gpt, monkeypatch):
+    monkeypatch.setattr(notice_bot, "BATCH_CHARS", 10)
+    txts = ["가" * 6, "나" * 6, "다" * 3]
+    assert notice_bot.summarize_many(txts) == [f"요약 {t}" for t in txts]
+    assert len(gpt.calls) == 2                              # [가] 한 건 · [나, 다] 일괄
@@ -0,0 +1,118 @@
+# tracing.py ─ 단계별 구간(span) 기록 + 선택적 프로파일링
+# • span("fetch", BOARD) 블록마다 소요 시간·바이트 수 등을 JSON 한 줄로 기록
+#   단계 이름: fetch · decode · parse · detect · summarize · send
+#   (+ http: 요청 하나하나 · catchup: 밀린 페이지 따라잡기 전체)
+# • BOT_TRACE 가 없으면 기록하지 않음 (블록은 그대로 실행, 오버헤드 거의 없음)
+# • BOT_PROFILE 디렉터리를 주면 run()/profiled() 구간을 cProfile + tracemalloc 으로 감싸
+#   <이름>.prof · <이름>.txt(누적 시간 상위) · <이름>.mem.txt(메모리 할당 상위) 저장
+#   ※ cProfile 은 감싼 스레드만 측정 (봇 안의 스레드 풀 작업은 span 으로 확인)
+#   ※ Python 3.12+ 는 프로파일러를 프로세스에 하나만 켤 수 있어 profiled() 구간은 한 번에 하나씩
+#     → runner 에서 BOT_PROFILE 을 주면 게시판이 차례로 실행됨
+# 환경
+#   BOT_TRACE     JSONL 출력 파일 (예: trace.jsonl)
+#   BOT_PROFILE   프로파일 결과 디렉터리 (예: profile)
+
+import os, io, sys, json, time, threading, contextlib, cProfile, pstats, tracemalloc
+
+TRACE_FILE  = os.getenv("BOT_TRACE", "")
+PROFILE_DIR = os.getenv("BOT_PROFILE", "")
+PROFILE_TOP = 40          # 리포트에 남길 상위 항목 수
+
+_lock = threading.Lock()
+_profile_lock = threading.Lock()   # profiled() 구간 직렬화 (cProfile 은 동시에 하나만)
+_mem_users = 0            # tracemalloc 을 쓰는 profiled() 구간 수
+
+def enabled() -> bool:
+    return bool(TRACE_FILE)
+
+def emit(rec: dict):
+    """기록 한 줄 추가 (BOT_TRACE 가 있을 때만)"""
+    if not TRACE_FILE:
+        return
+    line = json.dumps(rec, ensure_ascii=False, default=str)
+    with _lock:
+        with open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+@contextlib.contextmanager
+def span(name: str, board: str | None = None, **attrs):
+    """with span("parse", BOARD) as sp: … sp["bytes"] = n
+    블록에서 sp 에 넣은 값도 함께 기록. 예외는 error 로 남기고 그대로 올림"""
+    sp = dict(attrs)
+    if not TRACE_FILE:
+        yield sp
+        return
+    t0 = time.perf_counter()
+    start = time.time()
+    try:
+        yield sp
+    except BaseException as e:
+        sp["error"] = type(e).__name__
+        raise
+    finally:
+        emit({"ts": round(start, 3), "board": board, "span": name,
+              "ms": round((time.perf_counter() - t0) * 1000, 2),
+              "thread": threading.current_thread().name, **sp})
+
+# ── 프로파일링 ──────────────────────────────────────────────
+def _mem_start():
+    global _mem_users
+    with _lock:
+        if _mem_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+        _mem_users += 1
+
+def _mem_stop() -> tuple[tracemalloc.Snapshot | None, int]:
+    """(끝난 시점에 남아 있는 할당, 추적 시작 이후 최대 사용량 바이트)"""
+    global _mem_users
+    with _lock:
+        snap, peak = None, 0
+        if tracemalloc.is_tracing():
+            snap, peak = tracemalloc.take_snapshot(), tracemalloc.get_traced_memory()[1]
+        _mem_users -= 1
+        if _mem_users == 0:
+            tracemalloc.stop()
+    return snap, peak
+
+@contextlib.contextmanager
+def profiled(name: str):
+    """BOT_PROFILE 이 있으면 블록을 cProfile + tracemalloc 으로 측정해 파일로 저장"""
+    if not PROFILE_DIR:
+        yield
+        return
+    with _profile_lock:
+        prof = cProfile.Profile()
+        mem = on = False
+        try:
+            _mem_start(); mem = True
+            try:
+                prof.enable(); on = True
+            except ValueError as e:          # 다른 프로파일러(디버거 등)가 이미 켜져 있음
+                print(f"⚠️ 프로파일 생략 – {e}", file=sys.stderr)
+            yield
+        finally:
+            if on:
+                prof.disable()
+            snap, peak = _mem_stop() if mem else (None, 0)
+            if on:
+                _save(name, prof, snap, peak)
+
+def _save(name: str, prof: cProfile.Profile, snap, peak: int):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, name)
+    prof.dump_stats(base + ".prof")
+    buf = io.StringIO()
+    pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(PROFILE_TOP)
+    with open(base + ".txt", "w", encoding="utf-8") as f:
+        f.write(buf.getvalue())
+    if snap:
+        with open(base + ".mem.txt", "w", encoding="utf-8") as f:
+            f.write(f"peak {peak / 1024:.0f} KiB\n\n")
+            for st in snap.statistics("lineno")[:PROFILE_TOP]:
+                f.write(f"{st}\n")
+    print(f"📊 프로파일 저장: {base}.prof / .txt / .mem.txt", file=sys.stderr)
+
+def run(main, name: str):
+    """스크립트 진입점: python xxx_bot.py → tracing.run(main, BOARD)"""
+    with profiled(name), span("run", name):
+        main()